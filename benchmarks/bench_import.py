@@ -0,0 +1,63 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : bench_import.py
+# Date   : 2017-08-04 10-05
+# Version: 0.1
+# Description: Import time regression benchmark of `import dataobj`.
+#
+# Usage: python benchmarks/bench_import.py [--runs N] [--max-ms MS]
+#
+# Exit with status 1 if the median import time exceeds `--max-ms`, or if
+# `import dataobj` loads one of the lazily imported modules.
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Modules which must not be imported by `import dataobj`
+LAZY_MODULES = ['pandas', 'dateutil']
+
+SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import dataobj
+used = time.perf_counter() - started
+print(json.dumps({'ms': used * 1000, 'loaded': [m for m in %r if m in sys.modules]}))
+""" % LAZY_MODULES
+
+
+def measure_once():
+    output = subprocess.check_output([sys.executable, '-c', SCRIPT])
+    return json.loads(output.decode('utf-8'))
+
+
+def main():
+    args_parser = argparse.ArgumentParser()
+    args_parser.add_argument('--runs', type=int, default=10)
+    args_parser.add_argument('--max-ms', type=float, default=None)
+    args = args_parser.parse_args()
+
+    results = [measure_once() for _ in range(args.runs)]
+    median = statistics.median(r['ms'] for r in results)
+    loaded = sorted(set(m for r in results for m in r['loaded']))
+
+    print('import dataobj: median {:.1f} ms, min {:.1f} ms, max {:.1f} ms ({} runs)'.format(
+        median, min(r['ms'] for r in results), max(r['ms'] for r in results), args.runs))
+
+    failed = False
+    if loaded:
+        print('Lazily imported modules loaded at import time: {}'.format(', '.join(loaded)))
+        failed = True
+
+    if args.max_ms is not None and median > args.max_ms:
+        print('Import time regression: {:.1f} ms > {:.1f} ms'.format(median, args.max_ms))
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
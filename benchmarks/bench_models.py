@@ -0,0 +1,69 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : bench_models.py
+# Date   : 2017-08-09 10-25
+# Version: 0.1
+# Description: Models of the benchmark suite, defined at module level so that they can be pickled.
+
+import datetime
+
+from dataobj import Model, IntField, StrField, ListField, BoolField, DatetimeField
+
+ROWS = 1000
+
+
+class InMemoryConnection(object):
+    """
+    Fake connection returning the same rows for every query, no database needed
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def query(self, table, **kwargs):
+        # The manager converts some columns in place, hand out copies
+        return [dict(row) for row in self.rows]
+
+    def execute(self, table, **kwargs):
+        return 1, len(self.rows)
+
+
+def make_rows(n=ROWS):
+    """
+    Raw rows of the database, e.g. `tags` is JSON text
+    """
+    return [{'id': i,
+             'name': 'user-{}'.format(i),
+             'age': 20 + i % 50,
+             'email': 'user{}@example.com'.format(i),
+             'tags': '["a", "b", "c"]',
+             'is_active': i % 2,
+             'register_at': '2017-08-{:02d} 10:20:30'.format(i % 28 + 1)} for i in range(n)]
+
+
+def make_user_kwargs(i=0):
+    """
+    Python values of a user, as passed to the model by application code
+    """
+    return {'id': i,
+            'name': 'user-{}'.format(i),
+            'age': 20 + i % 50,
+            'email': 'user{}@example.com'.format(i),
+            'tags': ['a', 'b', 'c'],
+            'is_active': bool(i % 2),
+            'register_at': datetime.datetime(2017, 8, i % 28 + 1, 10, 20, 30)}
+
+
+class BenchUser(Model):
+    id = IntField(primary_key=True)
+    name = StrField(not_null=True, max_length=64)
+    age = IntField()
+    email = StrField(db_column='email')
+    tags = ListField()
+    is_active = BoolField()
+    register_at = DatetimeField(default=datetime.datetime.now)
+
+    class Meta:
+        table_name = 'bench_user'
+        connection = InMemoryConnection(make_rows())
@@ -0,0 +1,43 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : bench_pydatetime_converter.py
+# Date   : 2017-08-03 15-40
+# Version: 0.1
+# Description: Micro-benchmark of `PyDatetimeConverter.convert`.
+#
+# Usage: python benchmarks/bench_pydatetime_converter.py [number]
+
+import datetime
+import sys
+import timeit
+
+from dateutil import parser
+
+from dataobj.converters import pydatetime_converter
+
+CASES = [
+    ('date string', "2018-08-08", 'date'),
+    ('datetime string', "2018-08-08 01:02:03", 'datetime'),
+    ('datetime string with microseconds', "2018-08-08 01:02:03.000004", 'datetime'),
+    ('time string', "10:20:30", 'time'),
+    ('datetime type', datetime.datetime(2018, 8, 8, 1, 2, 3), 'datetime'),
+    ('date type', datetime.date(2018, 8, 8), 'date'),
+    ('free style string', "Aug 8 2018", 'datetime'),
+]
+
+
+def main(number=20000):
+    print('{:<36}{:>16}{:>16}'.format('case', 'convert (us)', 'dateutil (us)'))
+    for name, value, to_what in CASES:
+        used = timeit.timeit(lambda: pydatetime_converter.convert(value, to_what), number=number)
+        if isinstance(value, str):
+            baseline = timeit.timeit(lambda: parser.parse(value), number=number)
+            baseline = '{:.2f}'.format(baseline / number * 1e6)
+        else:
+            baseline = '-'
+        print('{:<36}{:>16.2f}{:>16}'.format(name, used / number * 1e6, baseline))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,23 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : conftest.py
+# Date   : 2017-08-09 10-15
+# Version: 0.1
+# Description: Fixtures of the benchmark suite, see `benchmarks/run.sh`.
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+
+@pytest.fixture(scope='session')
+def user_model():
+    from bench_models import BenchUser
+    return BenchUser
+
+
+@pytest.fixture
+def user(user_model):
+    from bench_models import make_user_kwargs
+    return user_model(**make_user_kwargs())
@@ -0,0 +1,26 @@
+# Run the benchmark suite, requires `pytest-benchmark`
+#
+# Baselines are stored in `benchmarks/.baselines`, per machine and Python version:
+#   Run only:                                  bash benchmarks/run.sh
+#   Save a new baseline:                       bash benchmarks/run.sh save
+#   Compare with the last baseline, fail if
+#   the mean time is 10% (or $THRESHOLD) worse: bash benchmarks/run.sh compare
+# Other arguments are passed to pytest.
+set -e
+
+OPTIONS="--benchmark-only --benchmark-storage=benchmarks/.baselines --benchmark-columns=min,mean,median,stddev,ops"
+
+case "$1" in
+    save)
+        shift
+        exec python -m pytest benchmarks $OPTIONS --benchmark-autosave "$@"
+        ;;
+    compare)
+        shift
+        exec python -m pytest benchmarks $OPTIONS --benchmark-compare \
+            --benchmark-compare-fail=mean:${THRESHOLD:-10%} "$@"
+        ;;
+    *)
+        exec python -m pytest benchmarks $OPTIONS "$@"
+        ;;
+esac
@@ -0,0 +1,31 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : test_bench_converters.py
+# Date   : 2017-08-09 11-30
+# Version: 0.1
+# Description: Benchmarks of `PyDatetimeConverter`.
+
+import datetime
+
+import pytest
+
+
+@pytest.mark.parametrize('value, to_what',
+                         [("2017-08-09", 'date'),
+                          ("2017-08-09 10:20:30", 'datetime'),
+                          ("10:20:30", 'time'),
+                          ("Aug 9 2017", 'datetime'),
+                          (datetime.datetime(2017, 8, 9, 10, 20, 30), 'datetime'),
+                          (datetime.date(2017, 8, 9), 'date')],
+                         ids=['date string', 'datetime string', 'time string', 'free style string',
+                              'datetime type', 'date type'])
+def test_convert(benchmark, value, to_what):
+    from dataobj.converters import pydatetime_converter
+    benchmark(pydatetime_converter.convert, value, to_what)
+
+
+def test_convert_many(benchmark):
+    from dataobj.converters import pydatetime_converter
+    values = ['2017-08-{:02d} 10:20:30'.format(i % 28 + 1) for i in range(1000)]
+    benchmark(pydatetime_converter.convert_many, values, 'datetime')
@@ -0,0 +1,34 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : test_bench_manager.py
+# Date   : 2017-08-09 11-05
+# Version: 0.1
+# Description: Benchmarks of the `DataObjectsManager` hot paths, rows come from an in-memory connection.
+
+import pickle
+
+
+def test_select_now_row_translation(benchmark, user_model):
+    benchmark(lambda: list(user_model.objects.all()._select_now()))
+
+
+def test_iter_objects_hydration(benchmark, user_model):
+    benchmark(lambda: list(user_model.objects.all()._iter_objects()))
+
+
+def test_collect_updated_content(benchmark, user_model, user):
+    manager = user_model.objects
+    setattr(user, manager._get_pk_name(user), pickle.dumps(user))
+    user.name = 'new name'
+    user.tags.append('d')
+    benchmark(lambda: manager._collect_updated_content(user))
+
+
+def test_chained_query_building(benchmark, user_model):
+    benchmark(lambda: user_model.objects.filter(age__gt=10, name__startswith='user')
+              .order_by('id', descending=True).limit(10, 20))
+
+
+def test_to_dicts(benchmark, user_model):
+    benchmark(lambda: user_model.objects.all().to_dicts())
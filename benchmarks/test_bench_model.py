@@ -0,0 +1,30 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : test_bench_model.py
+# Date   : 2017-08-09 10-40
+# Version: 0.1
+# Description: Benchmarks of the `Model` hot paths.
+
+from bench_models import make_user_kwargs
+
+
+def test_model_construction(benchmark, user_model):
+    kwargs = make_user_kwargs()
+    benchmark(lambda: user_model(**kwargs))
+
+
+def test_attribute_reads(benchmark, user_model, user):
+    field_names = list(user_model.__mappings__)
+
+    def read_all():
+        for field_name in field_names:
+            getattr(user, field_name)
+
+    benchmark(read_all)
+
+
+def test_dict_data(benchmark, user):
+    # Decoded values are cached after the first read, as with instances used by the application
+    user.dict_data
+    benchmark(lambda: user.dict_data)
@@ -8,3 +8,5 @@
 
 from dataobj.model import Model
 from dataobj.fields import *
+from dataobj.expressions import *
+from dataobj.indexes import Index
@@ -0,0 +1,340 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: Apache License
+# File   : connections.py
+# Date   : 2017-08-10 09-30
+# Version: 0.0.1
+# Description: Built-in connections implementing the `execute(table, **kwargs)` and
+#              `query(table, **kwargs)` interfaces used by `DataObjectsManager`.
+
+import datetime
+import decimal
+import re
+import sqlite3
+import threading
+
+__version__ = '0.0.1'
+__author__ = 'Chris'
+
+__all__ = ['QueryCompiler', 'SQLiteConnection', 'mysql_compiler', 'sqlite_compiler']
+
+# Plain column names are quoted, anything else (e.g. `COUNT(1) AS cnt`) is kept as it is
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+class QueryCompiler(object):
+    """
+    Compile the keyword arguments of `execute` and `query` to SQL with parameters
+
+    Supported keyword arguments:
+    1. `select`: list of columns
+    2. `where`: dict of `column__condition` (eq, ne, lt, lte, gt, gte, in,
+        contains, startswith, endswith, isnull) to values, `column` alone means `eq`
+    3. `limit`: how many rows, or a tuple `(how_many, offset)`
+    4. `ascending_order_by` or `descending_order_by`: list of columns
+    5. `insert`: dict of column to value
+    6. `update`: dict of column to value, together with `where`
+    7. `delete`: together with `where`
+
+    Multi-row statements are compiled by `compile_upsert`, with `upsert_syntax`
+    `on_duplicate_key` (MySQL) or `on_conflict` (SQLite, PostgreSQL).
+    They are split into batches of `rows_per_statement`, within `max_parameters`.
+    """
+
+    operators = {
+        'eq': '=',
+        'ne': '!=',
+        'lt': '<',
+        'lte': '<=',
+        'gt': '>',
+        'gte': '>='
+    }
+
+    like_conditions = {
+        'contains': '%{}%',
+        'startswith': '{}%',
+        'endswith': '%{}'
+    }
+
+    upsert_syntaxes = ('on_duplicate_key', 'on_conflict')
+
+    def __init__(self, placeholder='%s', quote='`', like_escape='', upsert_syntax='on_duplicate_key',
+                 max_parameters=65535):
+        if upsert_syntax not in self.upsert_syntaxes:
+            raise ValueError('Unknown upsert syntax `{}`, choices are {}'.format(upsert_syntax, self.upsert_syntaxes))
+
+        self.placeholder = placeholder
+        self.quote = quote
+        # Appended to LIKE, backslash is the escape character of MySQL already
+        self.like_escape = like_escape
+        self.upsert_syntax = upsert_syntax
+        # Most parameters bound to one statement
+        self.max_parameters = max_parameters
+
+    def __repr__(self):
+        return '<QueryCompiler placeholder={} quote={}>'.format(self.placeholder, self.quote)
+
+    def quote_name(self, name):
+        if _IDENTIFIER.match(name):
+            return '{0}{1}{0}'.format(self.quote, name)
+        return name
+
+    def split_condition(self, key):
+        column, _, condition = key.rpartition('__')
+        if column and (condition in self.operators or condition in self.like_conditions or
+                       condition in ('in', 'isnull')):
+            return column, condition
+        return key, 'eq'
+
+    def compile_where(self, where):
+        if not where:
+            return '', []
+
+        clauses, args = [], []
+        for key, value in where.items():
+            column, condition = self.split_condition(key)
+            column = self.quote_name(column)
+
+            if condition == 'isnull':
+                clauses.append('{} IS {}NULL'.format(column, '' if value else 'NOT '))
+            elif condition == 'in':
+                value = list(value)
+                if not value:
+                    # Nothing could be matched
+                    clauses.append('1 = 0')
+                    continue
+                clauses.append('{} IN ({})'.format(column, ', '.join([self.placeholder] * len(value))))
+                args.extend(value)
+            elif condition in self.like_conditions:
+                escaped = str(value).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                clauses.append('{} LIKE {}{}'.format(column, self.placeholder, self.like_escape))
+                args.append(self.like_conditions[condition].format(escaped))
+            elif value is None and condition in ('eq', 'ne'):
+                clauses.append('{} IS {}NULL'.format(column, '' if condition == 'eq' else 'NOT '))
+            else:
+                clauses.append('{} {} {}'.format(column, self.operators[condition], self.placeholder))
+                args.append(value)
+
+        return ' WHERE ' + ' AND '.join(clauses), args
+
+    def compile_select(self, table, select=None, where=None, limit=None,
+                       ascending_order_by=None, descending_order_by=None,
+                       group_by=None, **kwargs):
+        columns = ', '.join(self.quote_name(c) for c in select) if select else '*'
+        where_sql, args = self.compile_where(where)
+        sql = 'SELECT {} FROM {}{}'.format(columns, self.quote_name(table), where_sql)
+
+        if group_by:
+            sql += ' GROUP BY ' + ', '.join(self.quote_name(c) for c in group_by)
+
+        if ascending_order_by:
+            sql += ' ORDER BY ' + ', '.join('{} ASC'.format(self.quote_name(c)) for c in ascending_order_by)
+        elif descending_order_by:
+            sql += ' ORDER BY ' + ', '.join('{} DESC'.format(self.quote_name(c)) for c in descending_order_by)
+
+        if limit is not None:
+            how_many, offset = limit if isinstance(limit, (tuple, list)) else (limit, 0)
+            sql += ' LIMIT {0} OFFSET {0}'.format(self.placeholder)
+            args.extend([how_many, offset or 0])
+
+        return sql, args
+
+    def compile_insert(self, table, insert):
+        columns = list(insert)
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(self.quote_name(table),
+                                                      ', '.join(self.quote_name(c) for c in columns),
+                                                      ', '.join([self.placeholder] * len(columns)))
+        return sql, [insert[c] for c in columns]
+
+    def compile_update(self, table, update, where=None):
+        """
+        Values of `update` may be expressions with `as_sql(compiler)`, e.g. `col + 1`
+        """
+        assignments, args = [], []
+        for column, value in update.items():
+            if hasattr(value, 'as_sql'):
+                value_sql, value_args = value.as_sql(self)
+                assignments.append('{} = {}'.format(self.quote_name(column), value_sql))
+                args.extend(value_args)
+            else:
+                assignments.append('{} = {}'.format(self.quote_name(column), self.placeholder))
+                args.append(value)
+
+        where_sql, where_args = self.compile_where(where)
+        sql = 'UPDATE {} SET {}{}'.format(self.quote_name(table), ', '.join(assignments), where_sql)
+        return sql, args + where_args
+
+    def compile_delete(self, table, where=None):
+        where_sql, args = self.compile_where(where)
+        return 'DELETE FROM {}{}'.format(self.quote_name(table), where_sql), args
+
+    def rows_per_statement(self, parameters_per_row, batch_size=None):
+        """
+        How many rows fit in one multi-row statement
+
+        :param parameters_per_row: most parameters bound by one row
+        :param batch_size: optional upper limit of the rows
+        """
+        rows = max(1, self.max_parameters // max(1, parameters_per_row))
+        return min(rows, batch_size) if batch_size else rows
+
+    def compile_upsert(self, table, columns, rows, key_columns, update_columns):
+        """
+        Insert many rows at once, rows with duplicate keys update `update_columns` instead
+
+        :param rows: list of value lists, in the order of `columns`
+        :param key_columns: unique key of the conflicts, used by `on_conflict` only
+        """
+        row_sql = '({})'.format(', '.join([self.placeholder] * len(columns)))
+        sql = 'INSERT INTO {} ({}) VALUES {}'.format(self.quote_name(table),
+                                                    ', '.join(self.quote_name(c) for c in columns),
+                                                    ', '.join([row_sql] * len(rows)))
+
+        if self.upsert_syntax == 'on_duplicate_key':
+            # Updating the key with itself is a no-op, which keeps the existing rows
+            assignments = ['{0} = VALUES({0})'.format(self.quote_name(c)) for c in update_columns] or \
+                          ['{0} = {0}'.format(self.quote_name(key_columns[0]))]
+            sql += ' ON DUPLICATE KEY UPDATE ' + ', '.join(assignments)
+        else:
+            sql += ' ON CONFLICT ({}) '.format(', '.join(self.quote_name(c) for c in key_columns))
+            if update_columns:
+                sql += 'DO UPDATE SET ' + ', '.join('{0} = excluded.{0}'.format(self.quote_name(c))
+                                                    for c in update_columns)
+            else:
+                sql += 'DO NOTHING'
+
+        return sql, [value for row in rows for value in row]
+
+    def compile_bulk_update(self, table, key_column, rows):
+        """
+        Update many rows with different values in one statement
+
+        :param rows: list of `(key value, dict of column to value)`, columns may differ per row
+        """
+        key = self.quote_name(key_column)
+        columns = []
+        for _, content in rows:
+            columns.extend(c for c in content if c not in columns)
+
+        assignments, args = [], []
+        for column in columns:
+            cases = []
+            for key_value, content in rows:
+                if column in content:
+                    cases.append('WHEN {0} THEN {0}'.format(self.placeholder))
+                    args.extend([key_value, content[column]])
+
+            # Rows without a new value of the column keep the old one
+            assignments.append('{0} = CASE {1} {2} ELSE {0} END'.format(self.quote_name(column), key, ' '.join(cases)))
+
+        sql = 'UPDATE {} SET {} WHERE {} IN ({})'.format(self.quote_name(table), ', '.join(assignments), key,
+                                                        ', '.join([self.placeholder] * len(rows)))
+        return sql, args + [key_value for key_value, _ in rows]
+
+    def compile_execute(self, table, **kwargs):
+        """
+        Compile the keyword arguments of `execute`
+        """
+        if 'insert' in kwargs:
+            return self.compile_insert(table, kwargs['insert'])
+
+        if 'update' in kwargs:
+            return self.compile_update(table, kwargs['update'], kwargs.get('where'))
+
+        if 'delete' in kwargs:
+            return self.compile_delete(table, kwargs.get('where'))
+
+        raise ValueError('Unsupported execute arguments: {}'.format(sorted(kwargs)))
+
+
+mysql_compiler = QueryCompiler('%s', '`')
+# SQLITE_MAX_VARIABLE_NUMBER is 999 before SQLite 3.32
+sqlite_compiler = QueryCompiler('?', '"', like_escape=" ESCAPE '\\'", upsert_syntax='on_conflict',
+                                max_parameters=999)
+
+
+def _adapt_sqlite_value(value):
+    """
+    Store time values as ISO formatted strings, which the fields parse back
+    """
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(' ')
+
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+
+    return value
+
+
+class SQLiteConnection(object):
+    """
+    Connection backed by the standard library `sqlite3`, usable as `Meta.connection`
+
+    It's thread safe, statements are serialized by a lock and committed at once.
+
+    Usage:
+    >>> conn = SQLiteConnection(':memory:')
+    >>> conn.executescript('CREATE TABLE user (id INTEGER PRIMARY KEY, name TEXT)')
+    >>> class User(Model):
+    >>>     ...
+    >>>     class Meta:
+    >>>         connection = conn
+    """
+    dialect = 'sqlite'
+    compiler = sqlite_compiler
+
+    def __init__(self, database=':memory:', **kwargs):
+        self._database = database
+        self._lock = threading.RLock()
+        kwargs.setdefault('check_same_thread', False)
+        # Autocommit mode
+        kwargs.setdefault('isolation_level', None)
+        self._conn = sqlite3.connect(database, **kwargs)
+
+    def __repr__(self):
+        return '<SQLiteConnection database={}>'.format(self._database)
+
+    def execute(self, table, **kwargs):
+        """
+        :return: `(affected_rows, lastrowid)`
+        """
+        return self.execute_sql(*self.compiler.compile_execute(table, **kwargs))
+
+    def query(self, table, **kwargs):
+        """
+        :return: list of rows, each row is a dict
+        """
+        return self.query_sql(*self.compiler.compile_select(table, **kwargs))
+
+    def execute_sql(self, sql, args=None):
+        with self._lock:
+            cursor = self._conn.execute(sql, [_adapt_sqlite_value(v) for v in args or []])
+            return cursor.rowcount, cursor.lastrowid
+
+    def query_sql(self, sql, args=None):
+        with self._lock:
+            cursor = self._conn.execute(sql, [_adapt_sqlite_value(v) for v in args or []])
+            columns = [d[0] for d in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def explain(self, sql, args=None):
+        """
+        :return: rows of `EXPLAIN QUERY PLAN`
+        """
+        return self.query_sql('EXPLAIN QUERY PLAN ' + sql, args)
+
+    def executescript(self, script):
+        with self._lock:
+            self._conn.executescript(script)
+
+    def disconnect(self):
+        """
+        Close the underlying sqlite3 connection
+
+        Not named `close`, which is called by the manager after every operation.
+        """
+        with self._lock:
+            self._conn.close()
@@ -6,15 +6,36 @@
 # Version: 0.0.1
 # Description: description of this file.
 
-import pandas as pd
 import datetime
+import sys
+import warnings
 
-from dateutil import parser
+# NOTE: `pandas` and `dateutil` are imported only when a conversion needs them,
+# importing them costs hundreds of milliseconds
 
 __version__ = '0.0.1'
 __author__ = 'Chris'
 
 
+# Fixed formats of MySQL date/datetime/time strings, keyed by length of the string
+_DATETIME_FORMATS = {
+    10: '%Y-%m-%d',
+    16: '%Y-%m-%d %H:%M',
+    19: '%Y-%m-%d %H:%M:%S',
+    26: '%Y-%m-%d %H:%M:%S.%f'
+}
+
+_TIME_FORMATS = {
+    5: '%H:%M',
+    8: '%H:%M:%S',
+    15: '%H:%M:%S.%f'
+}
+
+# Available since Python 3.7
+_fromisoformat = getattr(datetime.datetime, 'fromisoformat', None)
+_time_fromisoformat = getattr(datetime.time, 'fromisoformat', None)
+
+
 class PyDatetimeConverter(object):
     """
     Try to convert any given time to python datetime.
@@ -22,6 +43,23 @@ class PyDatetimeConverter(object):
     Output can be datetime.date, datetime.datetime, datetime.time
     """
 
+    # Type of the input value -> name of the method converting it to `datetime.datetime`
+    _converters = {
+        str: '_str_to_pydatetime',
+        datetime.date: '_pydate_to_pydatetime',
+        datetime.time: '_pytime_to_pydatetime',
+        datetime.timedelta: '_pytimedelta_to_pydatetime'
+    }
+
+    # Converters of pandas types, resolved without importing pandas
+    _pandas_converters = {
+        'Timedelta': '_pdtimedelta_to_pydatetime',
+        'Timestamp': '_pdtimestamp_to_pydatetime'
+    }
+
+    # Shorter columns are converted value by value, not worth a round trip through pandas
+    vectorize_threshold = 64
+
     def __init__(self, info=None):
         self._info = info
 
@@ -39,43 +77,138 @@ class PyDatetimeConverter(object):
         if isinstance(tm, datetime.datetime):
             return self._to_what_kind(tm, to_what)
 
-        converter = {
-            str: self._str_to_pydatetime,
-            datetime.date: self._pydate_to_pydatetime,
-            datetime.time: self._pytime_to_pydatetime,
-            datetime.timedelta: self._pytimedelta_to_pydatetime,
-            pd.Timedelta: self._pdtimedelta_to_pydatetime,
-            pd.Timestamp: self._pdtimestamp_to_pydatetime
-        }.get(type(tm))
-
-        if converter and callable(converter):
-            return self._to_what_kind(converter(tm), to_what)
-        else:
+        converter = self._converters.get(type(tm)) or self._get_pandas_converter(type(tm))
+        if converter is None:
             raise ValueError('Unsupported type for PyDateTimeConverter: {}({})'.format(tm,
                                                                                        type(tm)))
 
+        return self._to_what_kind(getattr(self, converter)(tm), to_what)
+
+    def convert_many(self, values, to_what='datetime'):
+        """
+        Convert a column of time values to the specified `to_what` type
+
+        A column of strings is parsed by pandas at once, values pandas failed to parse
+        are converted one by one, same as `convert`
+
+        :param values: iterable of values accepted by `convert`
+        :param to_what: str, choices: date, datetime, time
+        :return: list
+        """
+        values = list(values)
+        strings = [value for value in values if value is not None]
+
+        if len(strings) < self.vectorize_threshold or to_what not in ('date', 'datetime', 'time') or \
+                any(type(value) is not str for value in strings):
+            return [self.convert(value, to_what) for value in values]
+
+        try:
+            import pandas as pd
+        except ImportError:
+            return [self.convert(value, to_what) for value in values]
+
+        timedelta = all('days' in value for value in strings)
+        if not timedelta and any('days' in value for value in strings):
+            return [self.convert(value, to_what) for value in values]
+
+        try:
+            with warnings.catch_warnings():
+                # pandas warns when it can't infer a common format
+                warnings.simplefilter('ignore')
+                if timedelta:
+                    parsed = pd.to_timedelta(strings, errors='coerce')
+                    failed = parsed.isna()
+                    # Same as `_pdtimedelta_to_pydatetime`, only time of the day is kept
+                    parsed = [None if f else self._pdtimedelta_to_pydatetime(td) for f, td in zip(failed, parsed)]
+                else:
+                    parsed = pd.to_datetime(strings, errors='coerce')
+                    failed = parsed.isna()
+                    parsed = parsed.to_pydatetime()
+        except (ValueError, TypeError, OverflowError):
+            # e.g. mixed time zones
+            return [self.convert(value, to_what) for value in values]
+
+        parsed = iter(zip(strings, failed, parsed))
+        results = []
+        for value in values:
+            if value is None:
+                results.append(None)
+                continue
+
+            s, is_failed, dt = next(parsed)
+            if is_failed:
+                results.append(self.convert(s, to_what))
+            else:
+                results.append(self._to_what_kind(dt, to_what))
+
+        return results
+
+    @classmethod
+    def _get_pandas_converter(cls, tp):
+        # No need to import pandas, its objects exist only if it was imported already
+        pd = sys.modules.get('pandas')
+        if pd is None:
+            return None
+
+        for name, converter in cls._pandas_converters.items():
+            if tp is getattr(pd, name, None):
+                cls._converters[tp] = converter
+                return converter
+
+        return None
+
     @staticmethod
     def _to_what_kind(dt, to_what):
-        factory = {
-            'date': dt.date,
-            'datetime': dt,
-            'time': dt.time
-        }.get(to_what)
+        if to_what == 'datetime':
+            return dt
 
-        if factory is None:
-            raise ValueError('Unsupported datetime factory: {}, '
-                             'choices are `date`, `datetime`, `time`'.format(to_what))
+        if to_what == 'date':
+            return dt.date()
 
-        if callable(factory):
-            return factory()
+        if to_what == 'time':
+            return dt.time()
 
-        return factory
+        raise ValueError('Unsupported datetime factory: {}, '
+                         'choices are `date`, `datetime`, `time`'.format(to_what))
 
     def _str_to_pydatetime(self, s):
         if 'days' in s:
+            import pandas as pd
             return self._pdtimedelta_to_pydatetime(pd.to_timedelta(s))
-        else:
-            return parser.parse(s)
+
+        dt = self._parse_fixed_format(s)
+        if dt is not None:
+            return dt
+
+        from dateutil import parser
+        return parser.parse(s)
+
+    @staticmethod
+    def _parse_fixed_format(s):
+        """
+        Fast path for strings formatted by MySQL, return None for any other format
+        """
+        length = len(s)
+        try:
+            if length >= 10 and s[4] == '-' and s[7] == '-':
+                if _fromisoformat is not None:
+                    return _fromisoformat(s)
+
+                fmt = _DATETIME_FORMATS.get(length)
+                if fmt is not None:
+                    return datetime.datetime.strptime(s, fmt)
+            elif length >= 5 and s[2] == ':':
+                if _time_fromisoformat is not None:
+                    return datetime.datetime.combine(datetime.date.today(), _time_fromisoformat(s))
+
+                fmt = _TIME_FORMATS.get(length)
+                if fmt is not None:
+                    return datetime.datetime.combine(datetime.date.today(),
+                                                     datetime.datetime.strptime(s, fmt).time())
+        except ValueError:
+            pass
+
+        return None
 
     @staticmethod
     def _pydate_to_pydatetime(s):
@@ -118,4 +251,7 @@ class PyDatetimeConverter(object):
         return s.to_pydatetime()
 
 
-__all__ = ['PyDatetimeConverter']
+# Converters are stateless, share this one instead of creating a new one for each value
+pydatetime_converter = PyDatetimeConverter()
+
+__all__ = ['PyDatetimeConverter', 'pydatetime_converter']
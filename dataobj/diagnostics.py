@@ -0,0 +1,278 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: Apache License
+# File   : diagnostics.py
+# Date   : 2017-08-14 09-40
+# Version: 0.0.1
+# Description: Opt-in slow query log and N+1 query detector, built on `dataobj.instrumentation`.
+
+import collections
+import logging
+import os
+import sys
+import threading
+import warnings
+
+from . import instrumentation
+from .connections import mysql_compiler
+from .exceptions import RepeatedQueryError, RepeatedQueryWarning
+
+__version__ = '0.0.1'
+__author__ = 'Chris'
+
+__all__ = ['RepeatedQueryDetector', 'SlowQueryLog', 'query_shape', 'caller_location', 'plan_problems']
+
+logger = logging.getLogger('dataobj')
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _outside_frame():
+    """
+    First frame outside of this package, None if there isn't any
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        if not os.path.abspath(frame.f_code.co_filename).startswith(_PACKAGE_DIR + os.sep):
+            return frame
+        frame = frame.f_back
+    return None
+
+
+def caller_location():
+    """
+    Return `file:line in function` of the first frame outside of this package
+    """
+    frame = _outside_frame()
+    if frame is None:
+        return '<unknown>'
+    return '{}:{} in {}'.format(os.path.abspath(frame.f_code.co_filename), frame.f_lineno, frame.f_code.co_name)
+
+
+def warn_at_caller(message, category):
+    """
+    Issue a warning from the first frame outside of this package
+
+    The depth of the stack in the package varies, e.g. iterating a query, a fixed `stacklevel` can't be used.
+    """
+    frame = _outside_frame()
+    if frame is None:
+        warnings.warn(message, category, stacklevel=2)
+        return
+
+    module_globals = frame.f_globals
+    warnings.warn_explicit(message, category, frame.f_code.co_filename, frame.f_lineno,
+                           module=module_globals.get('__name__'),
+                           registry=module_globals.setdefault('__warningregistry__', {}),
+                           module_globals=module_globals)
+
+
+def query_shape(model, operation, kwargs):
+    """
+    Shape of a query: everything but the values of the conditions
+    """
+    return (model.__name__,
+            operation,
+            tuple(kwargs.get('select') or ()),
+            tuple(sorted(kwargs.get('where') or ())),
+            tuple(kwargs.get('ascending_order_by') or ()),
+            tuple(kwargs.get('descending_order_by') or ()),
+            kwargs.get('limit') is not None)
+
+
+def _format_where(kwargs):
+    if 'sql' in kwargs:
+        # Statements compiled by the manager already, e.g. bulk operations
+        return kwargs['sql']
+
+    sql, args = mysql_compiler.compile_where(kwargs.get('where'))
+    return '{} {}'.format(sql.strip() or '(no where clause)', args if args else '').strip()
+
+
+def plan_problems(plan):
+    """
+    Find full table scans and filesorts in the rows of an EXPLAIN
+
+    Understand `EXPLAIN QUERY PLAN` of SQLite and `EXPLAIN` of MySQL.
+
+    :return: list of problems, empty if the plan looks fine
+    """
+    problems = []
+    for row in plan:
+        # SQLite: `SCAN user` or `SCAN TABLE user`, scans using an index are fine
+        detail = str(row.get('detail') or '')
+        if detail.startswith('SCAN') and 'INDEX' not in detail:
+            problems.append('full table scan ({})'.format(detail))
+        if 'TEMP B-TREE' in detail:
+            problems.append('filesort ({})'.format(detail))
+
+        # MySQL
+        if str(row.get('type') or '').upper() == 'ALL':
+            problems.append('full table scan (table {})'.format(row.get('table')))
+        if 'Using filesort' in str(row.get('Extra') or ''):
+            problems.append('filesort (table {})'.format(row.get('table')))
+
+    return problems
+
+
+class RepeatedQueryDetector(object):
+    """
+    Detect N+1 queries: the same query shape repeated more than `threshold` times in a scope
+
+    A scope is either the body of a `with` statement, in the thread running it, or,
+    after `install()`, every thread until `reset()` is called in it (e.g. at the end of a web request).
+    Counts are kept per thread.
+
+    Usage:
+    >>> with RepeatedQueryDetector(threshold=10, action='raise'):
+    >>>     for order in Order.objects.all():
+    >>>         User.objects.get(id=order.user_id)   # raise at the 11th query
+    """
+
+    actions = ('warn', 'raise', 'log')
+
+    def __init__(self, threshold=10, action='warn'):
+        if action not in self.actions:
+            raise ValueError('Unknown action `{}`, choices are {}'.format(action, self.actions))
+
+        self.threshold = threshold
+        self.action = action
+        self._local = threading.local()
+        # The receiver is connected while any thread is in a scope, or after `install()`
+        self._lock = threading.Lock()
+        self._users = 0
+        self._installed = False
+
+    def __repr__(self):
+        return '<RepeatedQueryDetector threshold={}, action={}>'.format(self.threshold, self.action)
+
+    def __enter__(self):
+        self.reset()
+        self._local.depth = getattr(self._local, 'depth', 0) + 1
+        self._connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._local.depth -= 1
+        self._disconnect()
+        self.reset()
+
+    def install(self):
+        with self._lock:
+            if self._installed:
+                return self
+            self._installed = True
+        self._connect()
+        return self
+
+    def uninstall(self):
+        with self._lock:
+            if not self._installed:
+                return
+            self._installed = False
+        self._disconnect()
+
+    def _connect(self):
+        with self._lock:
+            self._users += 1
+            if self._users == 1:
+                instrumentation.connect('before_query', self.record)
+
+    def _disconnect(self):
+        with self._lock:
+            self._users -= 1
+            if self._users == 0:
+                instrumentation.disconnect('before_query', self.record)
+
+    def reset(self):
+        """
+        Start a new scope in the current thread
+        """
+        self._local.counts = collections.Counter()
+
+    @property
+    def counts(self):
+        """
+        Counts of query shapes in the current thread
+        """
+        counts = getattr(self._local, 'counts', None)
+        if counts is None:
+            counts = self._local.counts = collections.Counter()
+        return counts
+
+    def record(self, model, table, operation, kwargs, **extra):
+        # Other threads are not in the scope of a `with` statement
+        if not self._installed and not getattr(self._local, 'depth', 0):
+            return
+
+        shape = query_shape(model, operation, kwargs)
+        counts = self.counts
+        counts[shape] += 1
+
+        # Report once per shape and scope
+        if counts[shape] != self.threshold + 1:
+            return
+
+        message = ('Query on `{}` ({}, {}) repeated more than {} times, '
+                   'possible N+1 queries at {}').format(table, operation, _format_where(kwargs),
+                                                       self.threshold, caller_location())
+        if self.action == 'raise':
+            raise RepeatedQueryError(message)
+        elif self.action == 'warn':
+            warn_at_caller(message, RepeatedQueryWarning)
+        else:
+            logger.warning(message)
+
+
+class SlowQueryLog(object):
+    """
+    Log queries and writes slower than `threshold` seconds
+
+    Recent slow queries are kept in `records` as well.
+
+    Usage:
+    >>> slow_log = SlowQueryLog(threshold=0.2).install()
+    """
+
+    def __init__(self, threshold=0.5, include_hydration=False, max_records=100, log=None):
+        self.threshold = threshold
+        self.include_hydration = include_hydration
+        self.records = collections.deque(maxlen=max_records)
+        self._logger = log or logger
+
+    def __repr__(self):
+        return '<SlowQueryLog threshold={}>'.format(self.threshold)
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.uninstall()
+
+    def install(self):
+        instrumentation.connect('after_query', self.record)
+        instrumentation.connect('after_write', self.record)
+        return self
+
+    def uninstall(self):
+        instrumentation.disconnect('after_query', self.record)
+        instrumentation.disconnect('after_write', self.record)
+
+    def record(self, model, table, operation, kwargs, rows=0, sql_time=0.0, hydrate_time=0.0, **extra):
+        used = sql_time + hydrate_time if self.include_hydration else sql_time
+        if used < self.threshold:
+            return
+
+        record = {
+            'model': model.__name__,
+            'table': table,
+            'operation': operation,
+            'where': _format_where(kwargs),
+            'rows': rows,
+            'sql_time': sql_time,
+            'hydrate_time': hydrate_time,
+            'caller': caller_location()
+        }
+        self.records.append(record)
+        self._logger.warning('Slow {operation} on `{table}` ({sql_time:.3f}s SQL, {hydrate_time:.3f}s hydration, '
+                             '{rows} rows): {where} at {caller}'.format(**record))
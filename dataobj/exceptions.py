@@ -37,3 +37,50 @@ class PrimaryKeyNotFoundError(Exception):
 
 class UnknownColumnError(Exception):
     pass
+
+
+class BatchValidationError(ValueError):
+    """
+    Raised by `validate_many`, holds all the failures of a batch
+
+    `errors` is a list of `(index, error)` tuples, `results` is the list of validated values
+    where values at failed indices are left as they were.
+    """
+
+    def __init__(self, param, errors, results=None):
+        self.param = param
+        self.errors = errors
+        self.results = results
+        super().__init__('Validation error on {} value(s) of param `{}`, '
+                         'first error at index {}: {}'.format(len(errors), param,
+                                                              errors[0][0], errors[0][1]))
+
+    @property
+    def indices(self):
+        return [index for index, _ in self.errors]
+
+
+class RepeatedQueryError(Exception):
+    """
+    Raised by `RepeatedQueryDetector` when the same query shape repeats too many times
+    """
+    pass
+
+
+class RepeatedQueryWarning(UserWarning):
+    pass
+
+
+class QueryPlanWarning(UserWarning):
+    pass
+
+
+class WriteBufferFullError(Exception):
+    """
+    Raised when the write-behind buffer is still full after waiting for `block_timeout` seconds
+    """
+    pass
+
+
+class UnindexedQueryWarning(UserWarning):
+    pass
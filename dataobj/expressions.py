@@ -0,0 +1,251 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: Apache License
+# File   : expressions.py
+# Date   : 2017-08-21 10-10
+# Version: 0.0.1
+# Description: Aggregate functions and column expressions computed by the database.
+
+import re
+
+__version__ = '0.0.1'
+__author__ = 'Chris'
+
+__all__ = ['Aggregate', 'Count', 'Sum', 'Avg', 'Min', 'Max', 'Expression', 'F']
+
+_ALIAS = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+class Aggregate(object):
+    """
+    Base class of aggregate functions, used by `DataObjectsManager.aggregate`
+
+    Usage:
+    >>> Order.objects.filter(status=1).aggregate(total=Sum('amount'), n=Count())
+    {'total': 1200, 'n': 3}
+    """
+    function = None
+
+    def __init__(self, field_name, distinct=False):
+        self.field_name = field_name
+        self.distinct = distinct
+
+    def __repr__(self):
+        return '<{} field={}>'.format(self.__class__.__name__, self.field_name)
+
+    def column(self, model, compiler):
+        field = model.__mappings__.get(self.field_name)
+        if field is None:
+            raise ValueError('Field `{}` is not defined in class `{}`'.format(self.field_name, model.__name__))
+        return compiler.quote_name(field.db_column)
+
+    def expression(self, model, compiler):
+        return '{}({}{})'.format(self.function, 'DISTINCT ' if self.distinct else '', self.column(model, compiler))
+
+    def compile(self, model, alias, compiler, partial=False):
+        """
+        :param compiler: `QueryCompiler` of the connection, which quotes the columns and the alias
+        :param partial: compile to partial results of a shard, which are merged by `merge` later
+        :return: list of select expressions
+        """
+        _check_alias(alias)
+        if partial and self.distinct:
+            raise ValueError('`{}` with distinct values can not be merged across shards'.format(self))
+        return ['{} AS {}'.format(self.expression(model, compiler), compiler.quote_name(alias))]
+
+    def merge(self, rows, alias):
+        """
+        Merge the partial results of the shards
+        """
+        raise NotImplementedError
+
+
+class Count(Aggregate):
+    """
+    Count the rows, or the not null values of a field
+    """
+    function = 'COUNT'
+
+    def __init__(self, field_name=None, distinct=False):
+        super().__init__(field_name, distinct)
+
+    def expression(self, model, compiler):
+        if self.field_name is None:
+            return 'COUNT(1)'
+        return super().expression(model, compiler)
+
+    def merge(self, rows, alias):
+        return sum(row[alias] or 0 for row in rows)
+
+
+class Sum(Aggregate):
+    function = 'SUM'
+
+    def merge(self, rows, alias):
+        values = [row[alias] for row in rows if row[alias] is not None]
+        return sum(values) if values else None
+
+
+class Min(Aggregate):
+    function = 'MIN'
+
+    def merge(self, rows, alias):
+        values = [row[alias] for row in rows if row[alias] is not None]
+        return min(values) if values else None
+
+
+class Max(Aggregate):
+    function = 'MAX'
+
+    def merge(self, rows, alias):
+        values = [row[alias] for row in rows if row[alias] is not None]
+        return max(values) if values else None
+
+
+class Avg(Aggregate):
+    function = 'AVG'
+
+    def compile(self, model, alias, compiler, partial=False):
+        if not partial:
+            return super().compile(model, alias, compiler, partial)
+
+        # Averages of the shards can not be merged, sums and counts can
+        _check_alias(alias)
+        if self.distinct:
+            raise ValueError('`{}` with distinct values can not be merged across shards'.format(self))
+
+        column = self.column(model, compiler)
+        return ['SUM({}) AS {}'.format(column, compiler.quote_name('{}__sum'.format(alias))),
+                'COUNT({}) AS {}'.format(column, compiler.quote_name('{}__count'.format(alias)))]
+
+    def merge(self, rows, alias):
+        total = sum(row['{}__sum'.format(alias)] or 0 for row in rows)
+        count = sum(row['{}__count'.format(alias)] or 0 for row in rows)
+        return total / count if count else None
+
+
+def _check_alias(alias):
+    """
+    Aliases are put in SQL, only plain identifiers are accepted
+    """
+    if not isinstance(alias, str) or not _ALIAS.match(alias):
+        raise ValueError('Alias `{}` of an aggregate should be an identifier of letters, '
+                         'digits and underscores'.format(alias))
+
+
+class Expression(object):
+    """
+    Base class of column expressions, combined with the arithmetic operators
+    """
+
+    def _combine(self, other, operator, reverse=False):
+        if reverse:
+            return CombinedExpression(other, operator, self)
+        return CombinedExpression(self, operator, other)
+
+    def __add__(self, other):
+        return self._combine(other, '+')
+
+    def __radd__(self, other):
+        return self._combine(other, '+', reverse=True)
+
+    def __sub__(self, other):
+        return self._combine(other, '-')
+
+    def __rsub__(self, other):
+        return self._combine(other, '-', reverse=True)
+
+    def __mul__(self, other):
+        return self._combine(other, '*')
+
+    def __rmul__(self, other):
+        return self._combine(other, '*', reverse=True)
+
+    def __truediv__(self, other):
+        return self._combine(other, '/')
+
+    def __rtruediv__(self, other):
+        return self._combine(other, '/', reverse=True)
+
+    def resolve(self, model):
+        """
+        Translate field names to columns of the model
+        """
+        raise NotImplementedError
+
+    def as_sql(self, compiler):
+        """
+        :return: `(sql, args)`, with the placeholder of the compiler
+        """
+        raise NotImplementedError
+
+
+def _resolve(value, model):
+    return value.resolve(model) if isinstance(value, Expression) else value
+
+
+def _as_sql(value, compiler):
+    if isinstance(value, Expression):
+        return value.as_sql(compiler)
+    return compiler.placeholder, [value]
+
+
+class F(Expression):
+    """
+    Reference to the value of a field in database, to update columns in place
+
+    The updates are compiled here and executed by `execute_sql(sql, args)` of the connection,
+    which only `SQLiteConnection` implements, not `ConnectionRouter` of dbutil.
+
+    Usage:
+    >>> Article.objects.filter(id=5).update(views=F('views') + 1)
+    >>> article.update(views=F('views') + 1)
+    """
+
+    def __init__(self, field_name):
+        self.field_name = field_name
+
+    def __repr__(self):
+        return "F('{}')".format(self.field_name)
+
+    def resolve(self, model):
+        field = model.__mappings__.get(self.field_name)
+        if field is None:
+            raise ValueError('Field `{}` is not defined in class `{}`'.format(self.field_name, model.__name__))
+        return Column(field.db_column)
+
+
+class Column(Expression):
+    """
+    A column, resolved from `F`
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return 'Column({})'.format(self.name)
+
+    def resolve(self, model):
+        return self
+
+    def as_sql(self, compiler):
+        return compiler.quote_name(self.name), []
+
+
+class CombinedExpression(Expression):
+    def __init__(self, lhs, operator, rhs):
+        self.lhs = lhs
+        self.operator = operator
+        self.rhs = rhs
+
+    def __repr__(self):
+        return '({!r} {} {!r})'.format(self.lhs, self.operator, self.rhs)
+
+    def resolve(self, model):
+        return CombinedExpression(_resolve(self.lhs, model), self.operator, _resolve(self.rhs, model))
+
+    def as_sql(self, compiler):
+        lhs_sql, lhs_args = _as_sql(self.lhs, compiler)
+        rhs_sql, rhs_args = _as_sql(self.rhs, compiler)
+        return '({} {} {})'.format(lhs_sql, self.operator, rhs_sql), lhs_args + rhs_args
\ No newline at end of file
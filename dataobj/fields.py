@@ -8,14 +8,16 @@
 
 import decimal
 import datetime
-import json
+import functools
 import pickle
 import logging
 
-from .exceptions import MissingColumnNameError, MissingFieldNameError
-from .converters import PyDatetimeConverter
+from .exceptions import MissingColumnNameError, MissingFieldNameError, BatchValidationError
+from .converters import pydatetime_converter
+from .jsoncodecs import get_json_codec
 from .validators import (TypeValidator, NotNullValidator,
                          ChoiceValidator, LengthValidator)
+from .validators.batch import validate_each
 
 __version__ = '0.0.1'
 __author__ = 'Chris'
@@ -24,13 +26,22 @@ logger = logging.getLogger(__name__)
 
 
 class BaseField(object):
+    # Whether the model instance should keep the validated output value,
+    # instead of validating the stored value again on every read
+    cache_output = False
+    # Whether `convert_many` converts a column of raw values at once
+    converts_many = False
+
     def __init__(self, db_column=None,
                  primary_key=False, default=None,
                  not_null=False, min_length=None,
                  max_length=None, auto_increment=True,
                  choices=None, validators=None):
         self._db_column = db_column
-        self.field_name = ''
+        self._field_name = ''
+        # Compiled validator chains, see `compile_validators`
+        self._input_chain = None
+        self._output_chain = None
         self.primary_key = primary_key
         self._default = default
         self.not_null = not_null
@@ -38,7 +49,7 @@ class BaseField(object):
         self.max_length = max_length
         self.auto_increment = auto_increment
         self.choices = choices
-        self._validators = list(validators or [])
+        self._validators = _ValidatorList(self, validators or [])
 
         # Setup validators
         if self.primary_key is False and self.not_null is True:
@@ -57,6 +68,15 @@ class BaseField(object):
                                                          self.field_name,
                                                          self.db_column)
 
+    @property
+    def field_name(self):
+        return self._field_name
+
+    @field_name.setter
+    def field_name(self, value):
+        self._field_name = value
+        self._reset_validators()
+
     @property
     def db_column(self):
         return self._db_column or self.field_name
@@ -64,6 +84,7 @@ class BaseField(object):
     @db_column.setter
     def db_column(self, value):
         self._db_column = value
+        self._reset_validators()
 
     @property
     def default(self):
@@ -76,22 +97,80 @@ class BaseField(object):
 
     @property
     def validators(self):
+        """
+        Validators are compiled into chains on first use, they are compiled again
+        after the list is changed or replaced
+        """
         return self._validators
 
+    @validators.setter
+    def validators(self, value):
+        self._validators = _ValidatorList(self, value)
+        self._reset_validators()
+
+    def _reset_validators(self):
+        """
+        Drop the compiled chains, they are compiled again on next use
+        """
+        self._input_chain = None
+        self._output_chain = None
+
+    def convert_many(self, values):
+        """
+        Convert a column of raw values from database before validating them one by one
+        :param values: iterable of raw values
+        :return: list of converted values
+        """
+        return list(values)
+
+    def compile_validators(self):
+        """
+        Compile the validators into two specialised callables, one for input values
+        and another for output values
+
+        Field name and column name are checked once here instead of on every value,
+        `ModelMeta` calls it after the field name is set.
+        """
+        self.__ensure_valid_field_name_column_name()
+        self._input_chain = self._compile_chain(self.db_column)
+        self._output_chain = self._compile_chain(self.field_name)
+
+    def _compile_chain(self, param):
+        steps = []
+        for validator in self._validators:
+            # Drop validators that accept any value unchanged
+            if getattr(validator, 'is_noop', False) is True:
+                continue
+
+            compile_validator = getattr(validator, 'compile', None)
+            if compile_validator is not None:
+                steps.append(compile_validator(param))
+            else:
+                steps.append(functools.partial(validator.validate, param))
+
+        if len(steps) == 0:
+            return _return_value
+
+        if len(steps) == 1:
+            return steps[0]
+
+        def chain(value):
+            for step in steps:
+                value = step(value)
+            return value
+
+        return chain
+
     def validate_input(self, value):
         """
         Validate input value with multiple validators
         :param value: input value
         :return: valid value (maybe conversed after validation)
         """
-        self.__ensure_valid_field_name_column_name()
+        if self._input_chain is None:
+            self.compile_validators()
 
-        valid_value = value
-
-        for validator in self.validators:
-            valid_value = validator.validate(self.db_column, valid_value)
-
-        return valid_value
+        return self._input_chain(value)
 
     def validate_output(self, value):
         """
@@ -99,14 +178,51 @@ class BaseField(object):
         :param value: output value
         :return: valid value
         """
+        if self._output_chain is None:
+            self.compile_validators()
+
+        return self._output_chain(value)
+
+    def validate_many(self, values):
+        """
+        Validate a column of input values at once
+
+        Values failed in a validator are skipped by the following validators,
+        all the failures are raised together in the end.
+        :param values: iterable of input values
+        :return: list of valid values
+        :raise BatchValidationError: `errors` holds `(row index, error)` of every failed value
+        """
         self.__ensure_valid_field_name_column_name()
+        param = self.db_column
+        results = list(values)
+        errors = {}
+
+        for validator in self._validators:
+            if getattr(validator, 'is_noop', False) is True:
+                continue
 
-        valid_value = value
+            indices = [i for i in range(len(results)) if i not in errors]
+            pending = [results[i] for i in indices]
+            validate_many = getattr(validator, 'validate_many', None)
 
-        for validator in self.validators:
-            valid_value = validator.validate(self.field_name, valid_value)
+            try:
+                if validate_many is not None:
+                    validated = validate_many(param, pending)
+                else:
+                    validated = validate_each(validator, param, pending)
+            except BatchValidationError as err:
+                validated = err.results
+                for index, error in err.errors:
+                    errors[indices[index]] = error
 
-        return valid_value
+            for index, value in zip(indices, validated):
+                results[index] = value
+
+        if errors:
+            raise BatchValidationError(param, sorted(errors.items(), key=lambda e: e[0]), results)
+
+        return results
 
     def __ensure_valid_field_name_column_name(self):
         if not self.field_name:
@@ -117,6 +233,58 @@ class BaseField(object):
                                          'set field name and column name first')
 
 
+class _ValidatorList(list):
+    """
+    Validators of a field, changing them drops the compiled chains of the field
+    """
+
+    def __init__(self, field, validators=()):
+        super().__init__(validators)
+        self._field = field
+
+
+def _resetting(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        # Unpickled lists get their items before their field
+        field = getattr(self, '_field', None)
+        if field is not None:
+            field._reset_validators()
+        return result
+
+    return wrapper
+
+
+for _name in ('append', 'extend', 'insert', 'remove', 'pop', 'clear', 'sort', 'reverse',
+              '__setitem__', '__delitem__', '__iadd__', '__imul__'):
+    setattr(_ValidatorList, _name, _resetting(getattr(list, _name)))
+
+
+def _return_value(value):
+    return value
+
+
+def _validate_many_not_none(validate_many, values):
+    """
+    Validate the values except None, which are kept as they are
+    """
+    results = list(values)
+    indices = [i for i, v in enumerate(results) if v is not None]
+
+    try:
+        validated = validate_many([results[i] for i in indices])
+    except BatchValidationError as err:
+        for index, value in zip(indices, err.results):
+            results[index] = value
+        raise BatchValidationError(err.param, [(indices[i], e) for i, e in err.errors], results)
+
+    for index, value in zip(indices, validated):
+        results[index] = value
+
+    return results
+
+
 class IntField(BaseField):
     """
     Map to MySQL int types:
@@ -225,10 +393,22 @@ class BlobField(BaseField):
         self._validators.insert(0, TypeValidator(bytes))
 
 
-class DateField(BaseField):
+class _ConvertManyDatetimeMixin(object):
+    """
+    Convert a column of time values at once, see `PyDatetimeConverter.convert_many`
+    """
+    converts_many = True
+    convert_to = 'datetime'
+
+    def convert_many(self, values):
+        return pydatetime_converter.convert_many(values, self.convert_to)
+
+
+class DateField(_ConvertManyDatetimeMixin, BaseField):
     """
     Map to MySQL date type
     """
+    convert_to = 'date'
 
     def __init__(self, db_column=None, primary_key=False,
                  default=None, not_null=False,
@@ -241,11 +421,11 @@ class DateField(BaseField):
                          auto_increment, choices,
                          validators)
         self._validators.insert(0, TypeValidator(datetime.date,
-                                                 force_converse_handler=lambda v:
-                                                 PyDatetimeConverter().convert(v, 'date')))
+                                                 force_converse_handler=functools.partial(
+                                                     pydatetime_converter.convert, to_what='date')))
 
 
-class DatetimeField(BaseField):
+class DatetimeField(_ConvertManyDatetimeMixin, BaseField):
     """
     Map to MySQL datetime type
     """
@@ -261,14 +441,15 @@ class DatetimeField(BaseField):
                          auto_increment, choices,
                          validators)
         self._validators.insert(0, TypeValidator(datetime.datetime,
-                                                 force_converse_handler=lambda v:
-                                                 PyDatetimeConverter().convert(v, 'datetime')))
+                                                 force_converse_handler=functools.partial(
+                                                     pydatetime_converter.convert, to_what='datetime')))
 
 
-class TimeField(BaseField):
+class TimeField(_ConvertManyDatetimeMixin, BaseField):
     """
     Map to MySQL time type
     """
+    convert_to = 'time'
 
     def __init__(self, db_column=None, primary_key=False,
                  default=None, not_null=False,
@@ -281,11 +462,11 @@ class TimeField(BaseField):
                          auto_increment, choices,
                          validators)
         self._validators.insert(0, TypeValidator(datetime.time,
-                                                 force_converse_handler=lambda v:
-                                                 PyDatetimeConverter().convert(v, 'time')))
+                                                 force_converse_handler=functools.partial(
+                                                     pydatetime_converter.convert, to_what='time')))
 
 
-class TimestampField(BaseField):
+class TimestampField(_ConvertManyDatetimeMixin, BaseField):
     """
     Map to MySQL timestamp type
     """
@@ -301,7 +482,8 @@ class TimestampField(BaseField):
                          auto_increment, choices,
                          validators)
         self._validators.insert(0, TypeValidator(datetime.datetime,
-                                                 error_handler=lambda v: PyDatetimeConverter().convert(v, 'datetime')))
+                                                 error_handler=functools.partial(
+                                                     pydatetime_converter.convert, to_what='datetime')))
 
 
 #
@@ -340,19 +522,25 @@ class BoolField(BaseField):
         except TypeError:
             return 0
 
+    def validate_many(self, values):
+        return [0 if value is None else int(value) for value in super().validate_many(values)]
+
 
 class _JsonSerializeDeserializeMixin(object):
     """
     Serialize or deserialize a value
+
+    Decoded values are cached by the model instance, see `Model.__getattribute__`
     """
+    cache_output = True
 
     def validate_input(self, value):
         if value is None:
             return None
 
         try:
-            return json.dumps(super().validate_input(value), ensure_ascii=False,
-                              default=self._json_dumps_default)
+            return self.json_codec.dumps(super().validate_input(value),
+                                         default=self._json_dumps_default)
         except ValueError:
             logger.error('Invalid value {}, unable to serialize it with JSON encoder'.format(value))
             raise
@@ -362,17 +550,28 @@ class _JsonSerializeDeserializeMixin(object):
             return None
 
         try:
-            return super().validate_output(json.loads(value))
+            # str or bytes from the database driver are both accepted
+            return super().validate_output(self.json_codec.loads(value))
         except ValueError:
             logger.error("Invalid value {}, unable to deserialize it with JSON decoder".format(value))
             raise
 
+    def validate_many(self, values):
+        dumps, default = self.json_codec.dumps, self._json_dumps_default
+        return [None if value is None else dumps(value, default=default)
+                for value in _validate_many_not_none(super().validate_many, values)]
+
+    @property
+    def json_codec(self):
+        return self._json_codec or get_json_codec()
+
 
 class ListField(_JsonSerializeDeserializeMixin, BaseField):
     """
     It means that this field can store a Python list
 
-    Original value must be json SERIALIZABLE
+    Original value must be json SERIALIZABLE, pass `json_codec` to use a custom codec
+    instead of the global one, see `dataobj.jsoncodecs`
 
     Note: Make sure the field in database is string type
     """
@@ -381,13 +580,15 @@ class ListField(_JsonSerializeDeserializeMixin, BaseField):
                  default=None, not_null=False,
                  min_length=None, max_length=None,
                  auto_increment=True, choices=None,
-                 validators=None, json_dumps_default=None):
+                 validators=None, json_dumps_default=None,
+                 json_codec=None):
         super().__init__(db_column, primary_key,
                          default, not_null,
                          min_length, max_length,
                          auto_increment, choices,
                          validators)
         self._json_dumps_default = json_dumps_default
+        self._json_codec = json_codec
         self._validators.insert(0, TypeValidator(list))
 
 
@@ -395,7 +596,8 @@ class DictField(_JsonSerializeDeserializeMixin, BaseField):
     """
     It means that this field can store a Python dict
 
-    Original value must be json SERIALIZABLE
+    Original value must be json SERIALIZABLE, pass `json_codec` to use a custom codec
+    instead of the global one, see `dataobj.jsoncodecs`
 
     Note: Make sure the field in database is string type
     """
@@ -404,20 +606,25 @@ class DictField(_JsonSerializeDeserializeMixin, BaseField):
                  default=None, not_null=False,
                  min_length=None, max_length=None,
                  auto_increment=True, choices=None,
-                 validators=None, json_dumps_default=None):
+                 validators=None, json_dumps_default=None,
+                 json_codec=None):
         super().__init__(db_column, primary_key,
                          default, not_null,
                          min_length, max_length,
                          auto_increment, choices,
                          validators)
         self._json_dumps_default = json_dumps_default
+        self._json_codec = json_codec
         self._validators.insert(0, TypeValidator(dict))
 
 
 class _PickleSerializeDeserializeMixin(object):
     """
     Serialize and deserialize any Python object
+
+    Unpickled values are cached by the model instance, see `Model.__getattribute__`
     """
+    cache_output = True
 
     def validate_input(self, value):
         return pickle.dumps(super().validate_input(value))
@@ -425,6 +632,9 @@ class _PickleSerializeDeserializeMixin(object):
     def validate_output(self, value):
         return super().validate_output(pickle.loads(value))
 
+    def validate_many(self, values):
+        return [pickle.dumps(value) for value in super().validate_many(values)]
+
 
 class PickleField(_PickleSerializeDeserializeMixin, BaseField):
     """
@@ -0,0 +1,86 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: Apache License
+# File   : indexes.py
+# Date   : 2017-08-24 10-20
+# Version: 0.0.1
+# Description: Index definitions of models, declared by `indexes` of `Meta` or reflected from database.
+
+__version__ = '0.0.1'
+__author__ = 'Chris'
+
+__all__ = ['Index']
+
+
+class Index(object):
+    """
+    An index of a model, on one or more fields
+
+    `Meta.indexes` accepts `Index` instances, field names and tuples of field names.
+    The primary key is always indexed, as `PRIMARY`.
+
+    Usage:
+    >>> class User(Model):
+    >>>     ...
+    >>>     class Meta:
+    >>>         indexes = ['name', ('city', 'age'), Index('email', unique=True)]
+    >>> User.__indexes__
+    """
+
+    def __init__(self, *fields, unique=False, name=None):
+        if not fields:
+            raise ValueError('At least one field is required by an index')
+
+        self.fields = tuple(fields)
+        self.unique = unique
+        self.name = name or 'idx_{}'.format('_'.join(fields))
+        # Set when bound to a model
+        self.columns = None
+
+    def __repr__(self):
+        return '<Index name={}, fields={}, unique={}>'.format(self.name, list(self.fields), self.unique)
+
+    def __eq__(self, other):
+        return isinstance(other, Index) and (self.fields, self.unique, self.name) == \
+                                            (other.fields, other.unique, other.name)
+
+    def __hash__(self):
+        return hash((self.fields, self.unique, self.name))
+
+    @classmethod
+    def parse(cls, definition):
+        if isinstance(definition, Index):
+            return definition
+        if isinstance(definition, str):
+            return cls(definition)
+        return cls(*definition)
+
+    def bind(self, model_name, mappings):
+        """
+        Return a copy with the columns of the fields
+        """
+        for field_name in self.fields:
+            if field_name not in mappings:
+                raise ValueError('Field `{}` of index `{}` is not defined in class `{}`'.format(
+                    field_name, self.name, model_name))
+
+        index = Index(*self.fields, unique=self.unique, name=self.name)
+        index.columns = tuple(mappings[f].db_column for f in self.fields)
+        return index
+
+    @property
+    def leading_field(self):
+        """
+        Only the conditions on the first field can use the index alone
+        """
+        return self.fields[0]
+
+
+def find_index(indexes, field_names, unique=None):
+    """
+    Find the first index whose leading field is one of the field names
+    """
+    for index in indexes:
+        if index.leading_field in field_names and (unique is None or index.unique is unique):
+            return index
+    return None
@@ -0,0 +1,187 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: Apache License
+# File   : instrumentation.py
+# Date   : 2017-08-11 10-05
+# Version: 0.0.1
+# Description: Hooks around the database operations of `DataObjectsManager`, and a metrics collector.
+
+import bisect
+import logging
+import threading
+
+__version__ = '0.0.1'
+__author__ = 'Chris'
+
+__all__ = ['EVENTS', 'connect', 'disconnect', 'MetricsCollector']
+
+logger = logging.getLogger('dataobj')
+
+# Receivers are called with keyword arguments:
+# 1. `before_query`, `before_write`: model, table, operation, kwargs
+# 2. `after_query`, `after_write`: same as above, and rows, sql_time, hydrate_time, error
+#
+# `operation` is one of `select`, `count`, `insert`, `update`, `delete` or any bulk operation,
+# `kwargs` are the compiled arguments passed to the connection, `rows` is how many rows were
+# fetched or affected, times are in seconds, `error` is the exception raised by the connection or None.
+EVENTS = ('before_query', 'after_query', 'before_write', 'after_write')
+
+_receivers = {event: [] for event in EVENTS}
+
+
+def connect(event, receiver):
+    """
+    Register a receiver of the given event
+
+    Usage:
+    >>> def log_slow_query(model, operation, sql_time, **kwargs):
+    >>>     ...
+    >>> connect('after_query', log_slow_query)
+    """
+    if event not in _receivers:
+        raise ValueError('Unknown event `{}`, choices are {}'.format(event, EVENTS))
+
+    if receiver not in _receivers[event]:
+        # Copy on write, `send` may be iterating the old list in another thread
+        _receivers[event] = _receivers[event] + [receiver]
+
+
+def disconnect(event, receiver):
+    if event not in _receivers:
+        raise ValueError('Unknown event `{}`, choices are {}'.format(event, EVENTS))
+
+    # Bound methods are new objects on every access, compare by equality
+    _receivers[event] = [r for r in _receivers[event] if r != receiver]
+
+
+def has_receivers(event):
+    return len(_receivers[event]) > 0
+
+
+def send(event, **kwargs):
+    """
+    Call all the receivers of the event, exceptions raised by receivers are propagated
+    """
+    for receiver in _receivers[event]:
+        receiver(**kwargs)
+
+
+class _Histogram(object):
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self):
+        total = 0
+        for count in self.counts:
+            total += count
+            yield total
+
+
+class MetricsCollector(object):
+    """
+    Collect counters and latency histograms per model and operation
+
+    Usage:
+    >>> collector = MetricsCollector().install()
+    >>> ...
+    >>> print(collector.to_prometheus())
+    """
+
+    default_buckets = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets=None, prefix='dataobj'):
+        self._buckets = tuple(sorted(buckets or self.default_buckets))
+        self._prefix = prefix
+        self._lock = threading.Lock()
+        self._operations = {}
+        self._rows = {}
+        self._errors = {}
+        self._histograms = {}
+
+    def __repr__(self):
+        return '<MetricsCollector operations={}>'.format(sum(self._operations.values()))
+
+    def install(self):
+        connect('after_query', self.record)
+        connect('after_write', self.record)
+        return self
+
+    def uninstall(self):
+        disconnect('after_query', self.record)
+        disconnect('after_write', self.record)
+
+    def reset(self):
+        with self._lock:
+            self._operations.clear()
+            self._rows.clear()
+            self._errors.clear()
+            self._histograms.clear()
+
+    def record(self, model, operation, rows=0, sql_time=0.0, hydrate_time=0.0, error=None, **kwargs):
+        key = (model.__name__, operation)
+        with self._lock:
+            self._operations[key] = self._operations.get(key, 0) + 1
+            self._rows[key] = self._rows.get(key, 0) + (rows or 0)
+            if error is not None:
+                self._errors[key] = self._errors.get(key, 0) + 1
+
+            for phase, seconds in (('sql', sql_time), ('hydrate', hydrate_time)):
+                histogram = self._histograms.get(key + (phase,))
+                if histogram is None:
+                    histogram = self._histograms[key + (phase,)] = _Histogram(self._buckets)
+                histogram.observe(seconds)
+
+    def snapshot(self):
+        """
+        :return: dict keyed by `(model name, operation)`
+        """
+        with self._lock:
+            result = {}
+            for key, count in self._operations.items():
+                result[key] = {
+                    'operations': count,
+                    'rows': self._rows.get(key, 0),
+                    'errors': self._errors.get(key, 0),
+                    'sql_time': self._histograms[key + ('sql',)].sum,
+                    'hydrate_time': self._histograms[key + ('hydrate',)].sum
+                }
+            return result
+
+    def to_prometheus(self):
+        """
+        Dump the metrics in Prometheus text exposition format
+        """
+        lines = []
+        with self._lock:
+            for name, help_text, values in (
+                    ('operations_total', 'Number of database operations.', self._operations),
+                    ('rows_total', 'Number of rows fetched or affected.', self._rows),
+                    ('errors_total', 'Number of failed database operations.', self._errors)):
+                name = '{}_{}'.format(self._prefix, name)
+                lines.append('# HELP {} {}'.format(name, help_text))
+                lines.append('# TYPE {} counter'.format(name))
+                for (model, operation), value in sorted(values.items()):
+                    lines.append('{}{{model="{}",operation="{}"}} {}'.format(name, model, operation, value))
+
+            name = '{}_operation_seconds'.format(self._prefix)
+            lines.append('# HELP {} Time spent in SQL and in hydrating rows.'.format(name))
+            lines.append('# TYPE {} histogram'.format(name))
+            for (model, operation, phase), histogram in sorted(self._histograms.items()):
+                labels = 'model="{}",operation="{}",phase="{}"'.format(model, operation, phase)
+                for bucket, count in zip(self._buckets, histogram.cumulative_counts()):
+                    lines.append('{}_bucket{{{},le="{}"}} {}'.format(name, labels, bucket, count))
+                lines.append('{}_bucket{{{},le="+Inf"}} {}'.format(name, labels, histogram.count))
+                lines.append('{}_sum{{{}}} {}'.format(name, labels, histogram.sum))
+                lines.append('{}_count{{{}}} {}'.format(name, labels, histogram.count))
+
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,102 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: Apache License
+# File   : jsoncodecs.py
+# Date   : 2017-08-02 10-12
+# Version: 0.0.1
+# Description: JSON codecs used by the JSON backed fields.
+
+import json
+import sys
+
+__version__ = '0.0.1'
+__author__ = 'Chris'
+
+_LOADS_STR_ONLY = sys.version_info < (3, 6)
+
+__all__ = ['JsonCodec', 'OrjsonCodec', 'get_json_codec',
+           'set_json_codec', 'get_fast_json_codec']
+
+
+class JsonCodec(object):
+    """
+    Codec backed by the standard library `json` module
+
+    A codec is any object which implements `dumps(value, default=None)` returning a str,
+    and `loads(value)` accepting str or bytes.
+    """
+
+    def __repr__(self):
+        return '<JsonCodec>'
+
+    @staticmethod
+    def dumps(value, default=None):
+        return json.dumps(value, ensure_ascii=False, default=default)
+
+    @staticmethod
+    def loads(value):
+        if isinstance(value, memoryview):
+            value = value.tobytes()
+
+        # `json.loads` decodes bytes by itself since Python 3.6
+        if _LOADS_STR_ONLY and isinstance(value, (bytes, bytearray)):
+            value = value.decode('utf-8')
+        return json.loads(value)
+
+
+class OrjsonCodec(object):
+    """
+    Codec backed by `orjson`, raise ImportError if it is not installed
+
+    Output is compact (no spaces after separators) and not ASCII escaped.
+    """
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        # Same as `json.dumps`, keys such as int are converted to str
+        self._option = orjson.OPT_NON_STR_KEYS
+
+    def __repr__(self):
+        return '<OrjsonCodec>'
+
+    def dumps(self, value, default=None):
+        return self._orjson.dumps(value, default=default, option=self._option).decode('utf-8')
+
+    def loads(self, value):
+        return self._orjson.loads(value)
+
+
+_json_codec = JsonCodec()
+
+
+def get_json_codec():
+    """
+    Return the global codec used by fields without a codec of their own
+    """
+    return _json_codec
+
+
+def set_json_codec(codec):
+    """
+    Replace the global codec
+
+    Usage:
+    >>> set_json_codec(get_fast_json_codec())
+    """
+    global _json_codec
+
+    if not (callable(getattr(codec, 'dumps', None)) and callable(getattr(codec, 'loads', None))):
+        raise TypeError('JSON codec must implement `dumps(value, default=None)` and `loads(value)`')
+
+    _json_codec = codec
+
+
+def get_fast_json_codec():
+    """
+    Return the fastest codec available, fallback to the standard library one
+    """
+    try:
+        return OrjsonCodec()
+    except ImportError:
+        return JsonCodec()
@@ -6,18 +6,32 @@
 # Version: 0.0.2
 # Description: description of this file.
 
+import collections
+import json
 import logging
 import pickle
+import time
+import warnings
 
 import copy
 from dbutil import ConnectionRouter
 from dbutil.sqlargs import SQLCondition
 
+from . import diagnostics, instrumentation
+from .connections import mysql_compiler
+from .exceptions import QueryPlanWarning, UnindexedQueryWarning
+from .expressions import Count, Expression
+from .indexes import find_index
+from .utils import json_default
+
 __version__ = '0.0.2'
 __author__ = 'Chris'
 
 logger = logging.getLogger('dataobj')
 
+# Shared by all the managers, JSONEncoder instances are stateless
+_json_encoder = json.JSONEncoder(ensure_ascii=False, default=json_default)
+
 
 class DataObjectsManager(object):
     """
@@ -38,7 +52,8 @@ class DataObjectsManager(object):
             'where': None,
             'limit': None,
             'order_by': None,
-            'descending': False
+            'descending': False,
+            'group_by': None
         }
         # Temporary inner cache to hold some query results for a while
         self._query_results_cache = None
@@ -78,8 +93,8 @@ class DataObjectsManager(object):
         >>> results[:10]
         >>> results[4]
         """
-        self._custom_conn = conn
         o = copy.deepcopy(self)
+        o._custom_conn = conn
         o._query_collector['select'] = list(self._model.__mappings__.keys())
         o._query_collector['where'] = conditions
         o._return_raw_data = False
@@ -91,8 +106,8 @@ class DataObjectsManager(object):
 
         Return the original dict data fetched from database
         """
-        self._custom_conn = conn
         o = copy.deepcopy(self)
+        o._custom_conn = conn
         o._query_collector['select'] = field_names
         o._query_collector['where'] = conditions
         o._return_raw_data = True
@@ -128,6 +143,101 @@ class DataObjectsManager(object):
         o._query_collector['descending'] = descending
         return o
 
+    def group_by(self, *field_names):
+        """
+        Group the rows by field names, used together with `aggregate`
+
+        Usage:
+        >>> model.objects.filter(amount__gt=0).group_by('status').aggregate(total=Sum('amount'))
+        [{'status': 1, 'total': 100}, {'status': 2, 'total': 20}]
+        """
+        for field_name in field_names:
+            self._get_field(field_name)
+
+        o = copy.deepcopy(self)
+        o._query_collector['group_by'] = field_names
+        return o
+
+    def aggregate(self, conn=None, **aggregates):
+        """
+        Compute aggregates in database
+
+        Return a dict of alias to value, or a list of such dicts with the grouped
+        field values if `group_by` was called
+
+        Usage:
+        >>> model.objects.filter(status=1).aggregate(total=Sum('amount'), n=Count())
+        {'total': 1200, 'n': 3}
+        """
+        if not aggregates:
+            raise ValueError('At least one aggregate is required')
+
+        return self._aggregate_now('aggregate', aggregates, conn or self._custom_conn)
+
+    def iterate(self, page_size=500, key=None):
+        """
+        Iterate the results page by page with keyset pagination: `WHERE key > last ORDER BY key LIMIT n`
+
+        Unlike `limit(n, offset)`, the database doesn't skip the rows of the previous pages.
+        The key must be a field with a unique index, by default the field of `order_by` if it's
+        uniquely indexed, or the primary key. The number of rows of `limit` is honoured,
+        an offset can't be skipped without reading the rows, filter by the key instead.
+
+        Usage:
+        >>> for user in model.objects.filter(age__gt=18).iterate(page_size=1000):
+        >>>     print(user)
+        """
+        key_field = self._keyset_field(key)
+        descending = self._query_collector['descending'] is True
+        condition = '{}__{}'.format(key_field.field_name, 'lt' if descending else 'gt')
+        where = dict(self._query_collector['where'] or {})
+        conn = self._custom_conn
+
+        remaining = None
+        limit = self._query_collector['limit']
+        if limit is not None:
+            remaining, offset = limit if isinstance(limit, (tuple, list)) else (limit, 0)
+            if offset:
+                raise ValueError('Keyset pagination can not skip rows by offset, filter by `{}` instead'.format(
+                    key_field.field_name))
+
+        last = None
+        while remaining is None or remaining > 0:
+            if last is not None:
+                where[condition] = last
+
+            size = page_size if remaining is None else min(page_size, remaining)
+            o = copy.deepcopy(self)
+            o._custom_conn = conn
+            o._query_collector['where'] = dict(where)
+            o._query_collector['order_by'] = (key_field.field_name,)
+            o._query_collector['limit'] = (size, 0)
+
+            page = o[:]
+            yield from page
+
+            if len(page) < size:
+                return
+            if remaining is not None:
+                remaining -= size
+            last = page[-1][key_field.field_name]
+
+    def _keyset_field(self, key=None):
+        model = self._model
+        unique_fields = {index.leading_field for index in model.__indexes__
+                         if index.unique and len(index.fields) == 1}
+
+        if key is not None:
+            if key not in unique_fields:
+                raise ValueError('Field `{}` of class `{}` has no unique index, it can not be a key of '
+                                 'keyset pagination'.format(key, model.__name__))
+            return self._get_field(key)
+
+        order_by = self._query_collector['order_by'] or ()
+        if len(order_by) == 1 and order_by[0] in unique_fields:
+            return self._get_field(order_by[0])
+        return model.__primary_field__
+
     def first(self):
         """
         To get the first item from results
@@ -154,16 +264,85 @@ class DataObjectsManager(object):
 
         return None
 
+    def to_dicts(self):
+        """
+        Serialize the results to a list of dicts, same as `dict_data` of each model instance
+
+        Usage:
+        >>> rows = model.objects.filter(id__gt=10).to_dicts()
+        """
+        return list(self._iter_dicts())
+
+    def to_json_lines(self, fp, default=None):
+        """
+        Stream the results to a file-like object, one JSON document per line
+
+        :param fp: file-like object with a `write` method
+        :param default: custom `default` hook of the JSON encoder
+        :return: how many rows were written
+
+        Usage:
+        >>> with open('users.jsonl', 'w') as fp:
+        >>>     model.objects.all().to_json_lines(fp)
+        """
+        encoder = _json_encoder if default is None else json.JSONEncoder(ensure_ascii=False,
+                                                                        default=default)
+        encode = encoder.encode
+        count = 0
+        for row in self._iter_dicts():
+            fp.write(encode(row))
+            fp.write('\n')
+            count += 1
+
+        return count
+
+    def _iter_dicts(self):
+        """
+        Generate dict rows without creating model instances if the results were not fetched yet
+        """
+        if self._query_results_cache is not None:
+            for item in self._query_results_cache:
+                yield item if self._return_raw_data is True else item.dict_data
+            return
+
+        if self._return_raw_data is True:
+            yield from self._select_now(self._custom_conn)
+            return
+
+        field_items = self._model.__field_items__
+        for row in self._select_now(self._custom_conn):
+            d = {}
+            for field_name, field in field_items:
+                value = row.get(field_name)
+                if value is None:
+                    # Same as what `Model.__init__` does with missing values
+                    value = field.validate_output(field.validate_input(field.default))
+                d[field_name] = value
+            yield d
+
     @staticmethod
     def _get_pk_name(model_instance):
         """For pickling attribute"""
         return '{}_pk'.format(model_instance.__class__.__name__)
 
     def dump(self, model_instance, conn=None):
+        """
+        Insert the model instance to database, buffered if write-behind is enabled
+        and no connection is given
+        """
+        write_behind = self._model.__write_behind__
+        if write_behind is not None and conn is None:
+            return write_behind.dump(model_instance)
+
+        return self._dump_now(model_instance, conn)
+
+    def _dump_now(self, model_instance, conn=None):
         """
         Insert the model instance to database immediately
         """
+        conn = self._shard_connection(model_instance, conn)
         primary_field = model_instance.__primary_field__
+        model_instance.encode_cached_values()
 
         # Do not insert primary value when `auto_increment` is enabled
         fields = model_instance.__fields__ if primary_field.auto_increment is True \
@@ -183,6 +362,7 @@ class DataObjectsManager(object):
 
     def _collect_updated_content(self, model_instance):
         """Only fields that were updated with new values will be updated into database"""
+        model_instance.encode_cached_values()
         pk = getattr(model_instance, self._get_pk_name(model_instance), None)
         if pk is None:
             return {field.db_column: model_instance.__dict__[field.field_name] for field in
@@ -192,28 +372,81 @@ class DataObjectsManager(object):
             content = {}
 
             for field in model_instance.__fields__:
-                if old_instance.__dict__[field.field_name] == model_instance.__dict__[field.field_name]:
+                old_value = old_instance.__dict__[field.field_name]
+                if old_value == model_instance.__dict__[field.field_name]:
                     continue
+
+                # Encoding a decoded value again may just normalize it (e.g. JSON spacing)
+                if field.cache_output is True and old_value is not None and \
+                        field.validate_output(old_value) == getattr(model_instance, field.field_name):
+                    continue
+
                 content[field.db_column] = model_instance.__dict__[field.field_name]
 
             return content
 
-    def update(self, model_instance, conn=None):
+    def update(self, model_instance=None, conn=None, **values):
         """
-        Update the model instance in database
+        Update the model instance in database, buffered if write-behind is enabled
+        and no connection is given
+
+        Without a model instance, update the rows matching the filters and return the affected rows.
+        Values may be expressions of `F`, which are computed by the database in one statement.
+        Expressions require a connection implementing `execute_sql(sql, args)`, in this package
+        only `SQLiteConnection` does, `ConnectionRouter` of dbutil raises `RuntimeError`.
+
+        Usage:
+        >>> model.objects.update(model_instance)
+        >>> model.objects.filter(id=5).update(views=F('views') + 1)
         """
+        if model_instance is None:
+            return self._update_filtered(conn or self._custom_conn, values)
+
+        expressions = {}
+        for field_name, value in values.items():
+            if isinstance(value, Expression):
+                expressions[field_name] = value
+            else:
+                setattr(model_instance, field_name, value)
+
+        write_behind = self._model.__write_behind__
+        if expressions:
+            # Expressions can't be merged, apply the pending writes first
+            if write_behind is not None:
+                write_behind.flush()
+            return self._update_now(model_instance, conn, expressions)
+
+        if write_behind is not None and conn is None:
+            return write_behind.update(model_instance)
+
+        return self._update_now(model_instance, conn)
+
+    def _update_now(self, model_instance, conn=None, expressions=None):
+        """
+        Update the model instance in database immediately
+        """
+        conn = self._shard_connection(model_instance, conn)
         primary_field = model_instance.__primary_field__
         value_of_primary_key = model_instance.__dict__.get(primary_field.field_name)
         content = self._collect_updated_content(model_instance)
 
+        if expressions:
+            for field_name, expression in expressions.items():
+                content[self._get_field(field_name).db_column] = expression.resolve(self._model)
+
         if len(content) == 0:
             return True
 
         logger.debug('Update model "{}" with content "{}"'.format(model_instance.__class__.__name__, content))
         where = {primary_field.db_column: value_of_primary_key}
-        result = self._execute(self._model.__table_name__,
-                               conn,
-                               update=content, where=where)
+        if expressions:
+            result = self._execute_compiled_update(self._model.__table_name__, conn, content, where)
+            # The values computed by the database, the ones in memory may be stale
+            self._refresh_fields(model_instance, list(expressions), conn, where)
+        else:
+            result = self._execute(self._model.__table_name__,
+                                   conn,
+                                   update=content, where=where)
         if result is None:
             return False
         else:
@@ -221,31 +454,291 @@ class DataObjectsManager(object):
 
         return True
 
+    def _refresh_fields(self, model_instance, field_names, conn, where):
+        """
+        Select the given fields of the model instance again from the primary
+        """
+        fields = [self._get_field(field_name) for field_name in field_names]
+        rows = list(self._query(self._model.__table_name__, conn or self._model.__connection__,
+                                select=[f.db_column for f in fields], where=where))
+        for field in fields:
+            if rows:
+                setattr(model_instance, field.field_name, rows[0].get(field.db_column))
+            else:
+                # Deleted by others in the meantime, the value is unknown
+                model_instance.__dict__.pop(field.field_name, None)
+
+    def _update_filtered(self, conn, values):
+        """
+        Update the rows matching the filters, return the affected rows
+        """
+        if self._query_collector['where'] is None:
+            raise ValueError('Call `filter` or `all` before updating rows in bulk')
+        if not values:
+            raise ValueError('Nothing to update')
+        if self._query_collector['limit'] is not None or self._query_collector['order_by']:
+            # The update would not be limited, but silently applied to all the matched rows
+            raise ValueError('Updating rows in bulk can not be limited or ordered')
+
+        kwargs, _ = self._compile_query()
+        content = {}
+        for field_name, value in values.items():
+            field = self._get_field(field_name)
+            content[field.db_column] = value.resolve(self._model) if isinstance(value, Expression) \
+                else field.validate_input(value)
+
+        write_behind = self._model.__write_behind__
+        if write_behind is not None:
+            write_behind.flush()
+
+        table = self._model.__table_name__
+        router = self._model.__shard_router__
+        if conn is None and router is not None:
+            return sum(router.map(lambda shard_conn: self._execute_compiled_update(table, shard_conn, content,
+                                                                                   kwargs['where']),
+                                  self._query_shard_names()))
+
+        return self._execute_compiled_update(table, conn, content, kwargs['where'])
+
+    def _execute_compiled_update(self, table, conn, content, where):
+        """
+        Compile the update here, the connection must implement `execute_sql`
+        """
+        conn = self._sql_connection(conn, 'update with expressions')
+        compiler = getattr(conn, 'compiler', mysql_compiler)
+        return self._execute_statements(table, 'update', [compiler.compile_update(table, content, where)], conn)
+
     def delete(self, model_instance, conn=None):
         """
         Delete the model instance from database
         """
+        conn = self._shard_connection(model_instance, conn)
         primary_field = model_instance.__primary_field__
         value_of_primary_key = model_instance.__dict__.get(primary_field.field_name)
 
+        # Pending writes must not recreate the deleted row
+        if self._model.__write_behind__ is not None:
+            self._model.__write_behind__.discard(value_of_primary_key)
+
         result = self._execute(self._model.__table_name__,
                                conn,
                                delete='',
                                where={primary_field.db_column: value_of_primary_key})
         return True if result is not None else False
 
+    def bulk_upsert(self, instances, update_fields=None, batch_size=None, conn=None):
+        """
+        Insert the model instances in batches, update the existing rows with the same primary key
+
+        One `INSERT ... ON DUPLICATE KEY UPDATE` (or `ON CONFLICT ... DO UPDATE` for SQLite)
+        is executed per batch. The connection must implement `execute_sql(sql, args)`,
+        a `RuntimeError` is raised before anything is written otherwise. In this package only
+        `SQLiteConnection` does, `ConnectionRouter` of dbutil doesn't.
+        Primary key values of auto increment rows inserted here are not fetched back.
+
+        The instances are marked as saved only if `update_fields` is None, otherwise
+        their changes of the other fields are still sent by the next `update`.
+
+        :param update_fields: fields updated on duplicate keys, all non primary fields by default
+        :param batch_size: most rows per statement, by default as many as the parameter limit
+                           of the compiler allows, which is never exceeded
+        :return: affected rows reported by the database
+
+        Usage:
+        >>> model.objects.bulk_upsert([model(id=1, name='foo'), model(id=2, name='bar')],
+        >>>                           update_fields=['name'])
+        """
+        instances = list(instances)
+        if not instances:
+            return 0
+
+        if conn is None and self._model.__shard_router__ is not None:
+            return sum(self.bulk_upsert(group, update_fields, batch_size, shard_conn)
+                       for shard_conn, group in self._group_by_shard(instances))
+
+        primary_field = self._model.__primary_field__
+        fields = list(self._model.__mappings__.values())
+        if update_fields is None:
+            update_columns = [field.db_column for field in self._model.__fields__]
+        else:
+            update_columns = [self._get_field(field_name).db_column for field_name in update_fields]
+
+        columns = [field.db_column for field in fields]
+        rows = []
+        for instance in instances:
+            # Values were validated when being set, only the cached decoded values are encoded again
+            instance.encode_cached_values()
+            values = instance.__dict__
+            rows.append([values.get(field.field_name) for field in fields])
+
+        table = self._model.__table_name__
+        conn = self._sql_connection(conn, 'bulk_upsert')
+        compiler = getattr(conn, 'compiler', mysql_compiler)
+        batch_size = compiler.rows_per_statement(len(columns), batch_size)
+        statements = [compiler.compile_upsert(table, columns, rows[i:i + batch_size],
+                                              [primary_field.db_column], update_columns)
+                      for i in range(0, len(rows), batch_size)]
+
+        affected_rows = self._execute_statements(table, 'bulk_upsert', statements, conn)
+
+        # Changes of the fields not updated on duplicate keys are still pending for `update`
+        if update_fields is None:
+            for instance in instances:
+                if instance.__dict__.get(primary_field.field_name) is not None:
+                    setattr(instance, self._get_pk_name(instance), pickle.dumps(instance))
+
+        return affected_rows
+
+    def bulk_update(self, instances, fields=None, batch_size=None, conn=None):
+        """
+        Update the model instances in batches, one `UPDATE ... SET col = CASE pk WHEN ... END` per batch
+
+        Only the changed fields of each instance are updated, or the given fields.
+        Connections without `execute_sql(sql, args)` (e.g. `ConnectionRouter` of dbutil)
+        update the rows one by one instead.
+
+        :param fields: field names to update, the changed fields by default
+        :param batch_size: most rows per statement, limited by the compiler as `bulk_upsert`
+        :return: affected rows reported by the database
+
+        Usage:
+        >>> for user in users:
+        >>>     user.age += 1
+        >>> model.objects.bulk_update(users)
+        """
+        if conn is None and self._model.__shard_router__ is not None:
+            return sum(self.bulk_update(group, fields, batch_size, shard_conn)
+                       for shard_conn, group in self._group_by_shard(instances))
+
+        primary_field = self._model.__primary_field__
+        if fields is not None:
+            fields = [self._get_field(field_name) for field_name in fields]
+
+        rows, updated = [], []
+        for instance in instances:
+            pk = instance.__dict__.get(primary_field.field_name)
+            if pk is None:
+                raise ValueError('Primary key of `{}` is missing, it can not be updated'.format(instance))
+
+            if fields is None:
+                content = self._collect_updated_content(instance)
+            else:
+                instance.encode_cached_values()
+                content = {field.db_column: instance.__dict__.get(field.field_name) for field in fields}
+
+            if content:
+                rows.append((pk, content))
+                updated.append(instance)
+
+        affected_rows = self._bulk_update_rows(rows, batch_size, conn)
+
+        for instance in updated:
+            setattr(instance, self._get_pk_name(instance), pickle.dumps(instance))
+
+        return affected_rows
+
+    def _bulk_update_rows(self, rows, batch_size=None, conn=None):
+        """
+        :param rows: list of `(primary key value, dict of column to value)`
+        """
+        if not rows:
+            return 0
+
+        table = self._model.__table_name__
+        key_column = self._model.__primary_field__.db_column
+        sql_conn = self._get_connection(conn)
+        if not hasattr(sql_conn, 'execute_sql'):
+            affected_rows = 0
+            for pk, content in rows:
+                result = self._execute(table, conn, update=content, where={key_column: pk})
+                affected_rows += result[0] if isinstance(result, (tuple, list)) and result else 0
+            return affected_rows
+
+        compiler = getattr(sql_conn, 'compiler', mysql_compiler)
+        # A key and a value per updated column, and the key again in `IN (...)`
+        batch_size = compiler.rows_per_statement(max(2 * len(content) + 1 for _, content in rows), batch_size)
+        statements = [compiler.compile_bulk_update(table, key_column, rows[i:i + batch_size])
+                      for i in range(0, len(rows), batch_size)]
+        return self._execute_statements(table, 'bulk_update', statements, sql_conn)
+
     def count(self, conn=None):
         """
-        Count how many rows in a table
+        Count how many rows match the filters, or how many groups after `group_by`, -1 if the query failed
 
-        # TO-DO: extend sqlargs package to support MYSQL FUNCTIONS
+        The limit and the ordering of the query are ignored.
         """
+        o = copy.deepcopy(self)
+        o._query_collector['limit'] = None
+        o._query_collector['order_by'] = None
         try:
-            return list(self._query(self._model.__table_name__, conn, select=['COUNT(1) AS cnt']))[0].get('cnt')
+            if o._query_collector['group_by']:
+                return len(o._aggregate_now('count', {'cnt': Count()}, conn or self._custom_conn))
+            return o._aggregate_now('count', {'cnt': Count()}, conn or self._custom_conn)['cnt']
         except Exception as err:
             logger.error(err)
             return -1
 
+    def _aggregate_now(self, operation, aggregates, conn=None):
+        kwargs, _ = self._compile_query()
+        group_fields = [self._get_field(field_name) for field_name in self._query_collector['group_by'] or []]
+        group_columns = [field.db_column for field in group_fields]
+
+        # Partial results of the shards are merged on the client
+        router = self._model.__shard_router__
+        partial = conn is None and router is not None and len(self._query_shard_names()) > 1
+
+        # Shards share one dialect
+        sql_conn = router.shards[router.names[0]] if conn is None and router is not None else conn
+        compiler = getattr(self._get_connection(sql_conn), 'compiler', mysql_compiler)
+        select = list(group_columns)
+        for alias, aggregate in aggregates.items():
+            select.extend(aggregate.compile(self._model, alias, compiler, partial))
+        kwargs['select'] = select
+        if group_columns:
+            kwargs['group_by'] = group_columns
+
+        query_kwargs = kwargs
+        if partial:
+            # Ordering and limit apply to the merged groups
+            query_kwargs = {k: v for k, v in kwargs.items()
+                            if k not in ('limit', 'ascending_order_by', 'descending_order_by')}
+
+        table = self._model.__table_name__
+        self._send_before('before_query', table, operation, query_kwargs)
+        started = time.perf_counter()
+
+        try:
+            rows = list(self._query_routed(table, conn, query_kwargs))
+        except Exception as err:
+            self._send_after('after_query', table, operation, query_kwargs, 0, time.perf_counter() - started,
+                             error=err)
+            raise
+
+        self._send_after('after_query', table, operation, query_kwargs, len(rows), time.perf_counter() - started)
+
+        if partial:
+            groups = collections.OrderedDict()
+            for row in rows:
+                groups.setdefault(tuple(row.get(c) for c in group_columns), []).append(row)
+
+            rows = []
+            for key, group_rows in groups.items():
+                row = dict(zip(group_columns, key))
+                row.update((alias, aggregate.merge(group_rows, alias)) for alias, aggregate in aggregates.items())
+                rows.append(row)
+            rows = self._sort_and_limit(rows, kwargs)
+
+        if not group_fields:
+            return {alias: rows[0].get(alias) if rows else None for alias in aggregates}
+
+        # Translate the group columns to field names
+        results = []
+        for row in rows:
+            result = {field.field_name: field.validate_output(row.get(field.db_column)) for field in group_fields}
+            result.update((alias, row.get(alias)) for alias in aggregates)
+            results.append(result)
+        return results
+
     def _fetch_results(self):
         """
         Check the temporary cache before selecting rows from database
@@ -265,9 +758,11 @@ class DataObjectsManager(object):
             setattr(o, self._get_pk_name(o), pickle.dumps(o))
             yield o
 
-    def _select_now(self, conn=None):
+    def _compile_query(self):
         """
-        Now execute the collected queries and return the query results
+        Translate the collected query to the keyword arguments of `conn.query`
+
+        :return: `(kwargs, selected_columns)`
         """
         # fields to select
         field_names = self._query_collector['select'] or []
@@ -309,8 +804,91 @@ class DataObjectsManager(object):
         else:
             kwargs['ascending_order_by'] = order_by_columns
 
+        return kwargs, selected_columns
+
+    def sql(self, conn=None):
+        """
+        Compile the query to SQL text and parameters, without executing it
+
+        The statement is compiled by the `compiler` of the connection, so it is exactly the one
+        executed by the built-in connections. Connections without a `compiler` (e.g. `ConnectionRouter`
+        of dbutil) build their own SQL, the MySQL statement returned then is an approximation of it.
+
+        Usage:
+        >>> sql, args = model.objects.filter(id__gt=10).order_by('id').sql()
+        """
+        conn = self._get_connection(conn or self._custom_conn or self._first_shard_connection())
+        kwargs, _ = self._compile_query()
+        compiler = getattr(conn, 'compiler', mysql_compiler)
+        return compiler.compile_select(self._model.__table_name__, **kwargs)
+
+    def explain(self, conn=None, warn=True):
+        """
+        Run EXPLAIN for the query and return the rows of the query plan
+
+        A `QueryPlanWarning` is issued if the plan shows a full table scan or a filesort.
+        The connection must implement `explain(sql, args)` or `query_sql(sql, args)`.
+
+        Usage:
+        >>> plan = model.objects.filter(name='Chris').order_by('id').explain()
+        """
+        conn = self._get_connection(conn or self._custom_conn or self._first_shard_connection())
+        sql, args = self.sql(conn)
+
+        if hasattr(conn, 'explain'):
+            plan = conn.explain(sql, args)
+        elif hasattr(conn, 'query_sql'):
+            plan = conn.query_sql('EXPLAIN ' + sql, args)
+        else:
+            raise RuntimeError('Connection `{}` does not support EXPLAIN'.format(conn))
+
+        plan = list(plan)
+        if warn is True:
+            problems = diagnostics.plan_problems(plan)
+            if problems:
+                warnings.warn('Query on `{}` {}: {}'.format(self._model.__table_name__, ', '.join(problems), sql),
+                              QueryPlanWarning, stacklevel=2)
+
+        return plan
+
+    def _select_now(self, conn=None):
+        """
+        Now execute the collected queries and return the query results
+        """
+        kwargs, selected_columns = self._compile_query()
+        if self._model.__warn_unindexed__:
+            self._check_indexes()
+
+        table = self._model.__table_name__
+        instrumented = instrumentation.has_receivers('after_query')
+        self._send_before('before_query', table, 'select', kwargs)
+        started = time.perf_counter()
+
+        try:
+            rows = self._query_routed(table, conn, kwargs)
+            if instrumented:
+                # Fetch all the rows, then the SQL time is measured apart from the hydration
+                rows = list(rows)
+        except Exception as err:
+            self._send_after('after_query', table, 'select', kwargs, 0, time.perf_counter() - started, error=err)
+            raise
+
+        sql_time = time.perf_counter() - started
+        count = 0
+
+        # Convert column by column first, then the validation below only checks the converted values
+        converted_fields = [f for f in self._model.__column_converted_fields__ if f.db_column in selected_columns]
+        if converted_fields:
+            rows = list(rows)
+            for field in converted_fields:
+                column = field.db_column
+                values = field.convert_many(row.get(column) for row in rows)
+                for row, value in zip(rows, values):
+                    if column in row:
+                        row[column] = value
+
         # Translate column to real field names
-        for row in self._query(self._model.__table_name__, conn, **kwargs):
+        for row in rows:
             converted_row = {}
             for column, value in row.items():
                 model_field = self._model.__db_mappings__.get(column)
@@ -318,44 +896,257 @@ class DataObjectsManager(object):
                 if model_field:
                     converted_row[model_field.field_name] = model_field.validate_output(value)
 
+            count += 1
             yield converted_row
 
-        self._custom_conn = None
+        # Hydration time includes the time spent by the consumer of the rows, e.g. creating model instances
+        if instrumented:
+            self._send_after('after_query', table, 'select', kwargs, count, sql_time,
+                             time.perf_counter() - started - sql_time)
+
+    def _check_indexes(self):
+        """
+        Warn once per query shape if no filtered or ordered field leads an index
+        """
+        field_names = frozenset(SQLCondition(k, v).field_name
+                                for k, v in (self._query_collector['where'] or {}).items()) | \
+            frozenset(self._query_collector['order_by'] or ())
+        checked = self._model.__checked_queries__
+        if not field_names or field_names in checked:
+            return
+
+        checked.add(field_names)
+        if find_index(self._model.__indexes__, field_names) is None:
+            diagnostics.warn_at_caller('Query on `{}` by {} can not use any index of {} at {}'.format(
+                self._model.__table_name__, sorted(field_names), [i.name for i in self._model.__indexes__],
+                diagnostics.caller_location()), UnindexedQueryWarning)
+
+    def _send_before(self, event, table, operation, kwargs):
+        if instrumentation.has_receivers(event):
+            instrumentation.send(event, model=self._model, table=table, operation=operation, kwargs=kwargs)
+
+    def _send_after(self, event, table, operation, kwargs, rows, sql_time, hydrate_time=0.0, error=None):
+        if instrumentation.has_receivers(event):
+            instrumentation.send(event, model=self._model, table=table, operation=operation, kwargs=kwargs,
+                                 rows=rows, sql_time=sql_time, hydrate_time=hydrate_time, error=error)
 
     def _execute(self, table, conn=None, **kwargs):
+        operation = next((op for op in ('insert', 'update', 'delete') if op in kwargs), 'execute')
+        self._send_before('before_write', table, operation, kwargs)
+        to_primary = conn is None
+
         conn = self._get_connection(conn)
         try:
             conn.open()
         except AttributeError:
             pass
 
+        started = time.perf_counter()
+
         try:
-            return conn.execute(table, **kwargs)
+            result = conn.execute(table, **kwargs)
         except Exception as err:
+            self._send_after('after_write', table, operation, kwargs, 0, time.perf_counter() - started, error=err)
             raise err
+        else:
+            affected_rows = result[0] if isinstance(result, (tuple, list)) and result else 0
+            self._send_after('after_write', table, operation, kwargs, affected_rows, time.perf_counter() - started)
+            return result
         finally:
+            if to_primary:
+                self._mark_write()
+
             try:
                 conn.close()
             except AttributeError:
                 pass
 
-    def _query(self, table, conn=None, **kwargs):
-        conn = self._get_connection(conn)
+    def _execute_statements(self, table, operation, statements, conn):
+        """
+        Execute compiled `(sql, args)` statements with `conn.execute_sql`
+
+        :return: total affected rows
+        """
+        conn = self._sql_connection(conn, operation)
         try:
             conn.open()
         except AttributeError:
             pass
 
+        affected_rows = 0
         try:
-            return conn.query(table, **kwargs)
-        except Exception as err:
-            raise err
+            for sql, args in statements:
+                kwargs = {'sql': sql, 'args': args}
+                self._send_before('before_write', table, operation, kwargs)
+                started = time.perf_counter()
+
+                try:
+                    result = conn.execute_sql(sql, args)
+                except Exception as err:
+                    self._send_after('after_write', table, operation, kwargs, 0, time.perf_counter() - started,
+                                     error=err)
+                    raise err
+
+                rows = result[0] if isinstance(result, (tuple, list)) and result else 0
+                self._send_after('after_write', table, operation, kwargs, rows, time.perf_counter() - started)
+                affected_rows += rows or 0
         finally:
+            self._mark_write()
+
             try:
                 conn.close()
             except AttributeError:
                 pass
 
+        return affected_rows
+
+    def _sql_connection(self, conn, operation):
+        """
+        Connection executing compiled SQL, required by the statements `execute` can't express
+        """
+        conn = self._get_connection(conn)
+        if not hasattr(conn, 'execute_sql'):
+            raise RuntimeError('`{}` of `{}` requires a connection implementing `execute_sql(sql, args)`, '
+                               'which `{}` does not'.format(operation, self._model.__name__, conn))
+        return conn
+
+    def _get_field(self, field_name):
+        field = self._model.__mappings__.get(field_name)
+        if field is None:
+            raise ValueError('Field `{}` is not defined in class `{}`'.format(field_name, self._model.__name__))
+        return field
+
+    def _mark_write(self):
+        """
+        Start the read-your-writes window of the current thread after a write to the primary
+        """
+        replicas = self._model.__read_replicas__
+        if replicas is not None:
+            replicas.mark_write()
+
+    def _shard_connection(self, model_instance, conn):
+        """
+        Connection of the shard holding the model instance, unless a connection is given
+        """
+        router = self._model.__shard_router__
+        if conn is not None or router is None:
+            return conn
+
+        value = model_instance.__dict__.get(router.shard_key)
+        if value is None:
+            raise ValueError('Shard key `{}` of `{}` is missing'.format(router.shard_key, model_instance))
+        return router.connection_for(value)
+
+    def _group_by_shard(self, instances):
+        """
+        :return: list of `(connection, model instances)`
+        """
+        groups = {}
+        for instance in instances:
+            conn = self._shard_connection(instance, None)
+            groups.setdefault(id(conn), (conn, []))[1].append(instance)
+        return list(groups.values())
+
+    def _query_shard_names(self):
+        """
+        Shards to query, constrained by `eq` or `in` conditions of the shard key
+        """
+        router = self._model.__shard_router__
+        # Same values as the ones stored by `dump`, e.g. '5' is routed as 5 by an `IntField`
+        field = self._get_field(router.shard_key)
+        names = None
+        for k, v in (self._query_collector['where'] or {}).items():
+            sql_cond = SQLCondition(k, v)
+            if sql_cond.field_name != router.shard_key:
+                continue
+
+            if sql_cond.condition == 'eq':
+                matched = {router.shard_for(field.validate_input(v))}
+            elif sql_cond.condition == 'in':
+                matched = {router.shard_for(field.validate_input(x)) for x in v}
+            else:
+                continue
+            names = matched if names is None else names & matched
+
+        if names is None:
+            return router.names
+        return [name for name in router.names if name in names]
+
+    def _first_shard_connection(self):
+        router = self._model.__shard_router__
+        if router is None:
+            return None
+
+        names = self._query_shard_names()
+        return router.shards[names[0] if names else router.names[0]]
+
+    def _query_routed(self, table, conn, kwargs):
+        """
+        Query one connection, or fan out to the shards and merge the rows
+        """
+        router = self._model.__shard_router__
+        if conn is not None or router is None:
+            return self._query(table, conn, **kwargs)
+
+        names = self._query_shard_names()
+        if len(names) == 1:
+            return list(self._query(table, router.shards[names[0]], **kwargs))
+
+        # Every shard returns the rows up to the end of the page, the page is cut after merging
+        limit = kwargs.get('limit')
+        shard_kwargs = dict(kwargs)
+        if limit is not None:
+            how_many, offset = limit if isinstance(limit, (tuple, list)) else (limit, 0)
+            shard_kwargs['limit'] = (how_many + (offset or 0), 0)
+
+        results = router.map(lambda shard_conn: list(self._query(table, shard_conn, **shard_kwargs)), names)
+        return self._sort_and_limit([row for shard_rows in results for row in shard_rows], kwargs)
+
+    @staticmethod
+    def _sort_and_limit(rows, kwargs):
+        """
+        Apply the ordering and limit of the query arguments to rows merged from the shards
+        """
+        order_by = kwargs.get('ascending_order_by') or kwargs.get('descending_order_by')
+        if order_by:
+            # NULL values come first in ascending order, same as MySQL
+            rows.sort(key=lambda row: [(row.get(c) is not None, row.get(c)) for c in order_by],
+                      reverse=not kwargs.get('ascending_order_by'))
+
+        limit = kwargs.get('limit')
+        if limit is not None:
+            how_many, offset = limit if isinstance(limit, (tuple, list)) else (limit, 0)
+            rows = rows[offset or 0:(offset or 0) + how_many]
+        return rows
+
+    def _query(self, table, conn=None, **kwargs):
+        # Route to a replica, unless a connection is given or the primary must be read
+        replicas = self._model.__read_replicas__
+        replica_index = None
+        if conn is None and replicas is not None and not replicas.use_primary():
+            replica_index = replicas.acquire()
+            conn = replicas.replicas[replica_index]
+
+        try:
+            conn = self._get_connection(conn)
+            try:
+                conn.open()
+            except AttributeError:
+                pass
+
+            try:
+                return conn.query(table, **kwargs)
+            except Exception as err:
+                raise err
+            finally:
+                try:
+                    conn.close()
+                except AttributeError:
+                    pass
+        finally:
+            if replica_index is not None:
+                replicas.release(replica_index)
+
     def _get_connection(self, conn):
         conn = conn or self._model.__connection__
 
@@ -401,6 +1192,9 @@ class DataObjectsManager(object):
         for k, v in self.__dict__.items():
             if k == '_query_results_cache':
                 o.__dict__[k] = None
+            elif k == '_custom_conn':
+                # Connections hold sockets and locks, share them
+                o.__dict__[k] = v
             else:
                 o.__dict__[k] = copy.deepcopy(v, memo)
 
@@ -6,19 +6,27 @@
 # Version: 0.0.1
 # Description: description of this file.
 
+import copy
 import logging
 from pprint import pformat
 
 from .exceptions import DuplicatePrimaryKeyError, PrimaryKeyNotFoundError
 from .fields import *
+from .indexes import Index
 from .manager import DataObjectsManager
+from .routing import ReplicaSet
+from .sharding import ShardRouter
 from .utils import camel_to_underscore
+from .writebehind import WriteBehindBuffer
 
 logger = logging.getLogger('dataobj')
 
 __version__ = '0.0.1'
 __author__ = 'Chris'
 
+# Key of the instance `__dict__` which holds decoded values of the fields with `cache_output` enabled
+_DECODED_VALUES = '__decoded_values__'
+
 
 class ModelMeta(type):
     """
@@ -52,6 +60,7 @@ class ModelMeta(type):
 
             # Add field name first
             value.field_name = key
+            value.compile_validators()
             logger.debug('Found mapping field `{}`'.format(value))
 
             mappings[key] = value
@@ -71,16 +80,50 @@ class ModelMeta(type):
 
         attributes['__fields__'] = fields
         attributes['__mappings__'] = mappings
+        # Precomputed (field_name, field) pairs, walked by the serialization hot paths
+        attributes['__field_items__'] = tuple(mappings.items())
+        # Fields converting a whole column of query results at once
+        attributes['__column_converted_fields__'] = tuple(f for f in mappings.values() if f.converts_many)
         attributes['__db_mappings__'] = {f.db_column: f for f in mappings.values()}
         attributes['__primary_field__'] = primary_field
         attributes['__table_name__'] = table_name
+
+        # Indexes declared by `Meta.indexes`, the primary key first
+        meta = attributes.get('Meta')
+        declared_indexes = getattr(meta, 'indexes', None)
+        indexes = [Index(primary_field.field_name, unique=True, name='PRIMARY')]
+        indexes.extend(Index.parse(definition) for definition in declared_indexes or [])
+        attributes['__indexes__'] = tuple(index.bind(name, mappings) for index in indexes)
+        # Warn about queries which can't use any index, only if the indexes are known
+        attributes['__warn_unindexed__'] = getattr(meta, 'warn_unindexed', declared_indexes is not None)
+        # Field names of the queries checked against the indexes already
+        attributes['__checked_queries__'] = set()
         # Connection could be a config with dict type or a server url,
         #  or a callable object that creates a database config,
         # or a object which implements the interfaces defined in `dbutil.connections.IDatabaseConnection`.
-        try:
-            attributes['__connection__'] = getattr(attributes.get('Meta'), 'connection')
-        except AttributeError:
-            attributes['__connection__'] = None
+        attributes['__connection__'] = getattr(meta, 'write_connection', None) or getattr(meta, 'connection', None)
+
+        # Reads go to the replicas if `read_connection` is configured, one connection or a list of them
+        read_connection = getattr(meta, 'read_connection', None)
+        if read_connection:
+            attributes['__read_replicas__'] = ReplicaSet(read_connection,
+                                                         strategy=getattr(meta, 'read_strategy', 'round_robin'),
+                                                         read_your_writes=getattr(meta, 'read_your_writes', 1.0))
+        else:
+            attributes['__read_replicas__'] = None
+
+        # Rows are split across `shards` by the value of the `shard_key` field
+        shard_key = getattr(meta, 'shard_key', None)
+        if shard_key:
+            if shard_key not in mappings:
+                raise ValueError('Shard key `{}` is not defined in class `{}`'.format(shard_key, name))
+            if read_connection or getattr(meta, 'write_behind', None):
+                raise ValueError('Sharding of `{}` can not be used with read replicas or write-behind'.format(name))
+
+            attributes['__shard_router__'] = ShardRouter(shard_key, getattr(meta, 'shards', None),
+                                                         shard_by=getattr(meta, 'shard_by', None))
+        else:
+            attributes['__shard_router__'] = None
 
         # Remove fields from attributes
         for key in mappings:
@@ -90,6 +133,14 @@ class ModelMeta(type):
 
         # INSTALL `DataObjectsManager` to handle db operations
         setattr(model, 'objects', DataObjectsManager(model))
+
+        # Opt-in write-behind buffer: `write_behind = True` or a dict of options of `WriteBehindBuffer`
+        write_behind = getattr(attributes.get('Meta'), 'write_behind', None)
+        if write_behind:
+            options = write_behind if isinstance(write_behind, dict) else {}
+            model.__write_behind__ = WriteBehindBuffer(model, **options)
+        else:
+            model.__write_behind__ = None
         return model
 
     def __contains__(self, field_name):
@@ -153,7 +204,10 @@ class Model(metaclass=ModelMeta):
         """
         field = self.__mappings__.get(key, None)
         if field is not None:
-            self.__dict__[key] = field.validate_input(value)
+            values = self.__dict__
+            values[key] = field.validate_input(value)
+            if field.cache_output is True and _DECODED_VALUES in values:
+                values[_DECODED_VALUES].pop(key, None)
         else:
             self.__dict__[key] = value
 
@@ -165,11 +219,33 @@ class Model(metaclass=ModelMeta):
         :return: validated value
         """
         field = object.__getattribute__(self, '__mappings__').get(item)
-        if field is not None:
-            return field.validate_output(self.__dict__.get(item))
-        else:
+        if field is None:
             return object.__getattribute__(self, item)
 
+        values = object.__getattribute__(self, '__dict__')
+        if field.cache_output is False:
+            return field.validate_output(values.get(item))
+
+        # Decode once, the stored value is encoded again before writing to database
+        decoded = values.get(_DECODED_VALUES)
+        if decoded is None:
+            decoded = values[_DECODED_VALUES] = {}
+
+        try:
+            return decoded[item]
+        except KeyError:
+            value = decoded[item] = field.validate_output(values.get(item))
+            return value
+
+    def __getstate__(self):
+        """
+        Pickle the encoded values only, without the decoded cache
+        """
+        self.encode_cached_values()
+        state = dict(self.__dict__)
+        state.pop(_DECODED_VALUES, None)
+        return state
+
     def __repr__(self):
         return "<{class_name} data={data}>".format(class_name=self.__class__.__name__,
                                                    data=pformat(self.dict_data))
@@ -225,7 +301,30 @@ class Model(metaclass=ModelMeta):
 
     @property
     def dict_data(self):
-        return {k: getattr(self, k) for k in self.__mappings__}
+        """
+        Values of all the fields
+
+        Cached decoded values (e.g. of `ListField`) are shallow copies, adding or removing items
+        doesn't change the model instance, but changing nested objects in place does.
+        """
+        values = self.__dict__
+        decoded = values.get(_DECODED_VALUES) or {}
+        return {k: copy.copy(decoded[k]) if k in decoded else field.validate_output(values.get(k))
+                for k, field in self.__field_items__}
+
+    def encode_cached_values(self):
+        """
+        Encode the cached decoded values again, so that in-place changes
+        (e.g. `model.tags.append('foo')`) are visible to dump and update
+        """
+        values = self.__dict__
+        decoded = values.get(_DECODED_VALUES)
+        if not decoded:
+            return
+
+        mappings = self.__mappings__
+        for field_name, value in decoded.items():
+            values[field_name] = mappings[field_name].validate_input(value)
 
     def dump(self, conn=None):
         """
@@ -236,11 +335,11 @@ class Model(metaclass=ModelMeta):
     def update(self, conn=None, **kwargs):
         """
         Update a model instance and save it to the database
-        """
-        for key, value in kwargs.items():
-            setattr(self, key, value)
 
-        return self.objects.update(self, conn)
+        Values may be expressions such as `F('views') + 1`, computed by the database,
+        which require a connection implementing `execute_sql` (`SQLiteConnection`)
+        """
+        return self.objects.update(self, conn, **kwargs)
 
     def delete(self, conn=None):
         """
@@ -0,0 +1,11 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: Apache License
+# File   : reflected.py
+# Date   : 2017-08-23 10-00
+# Version: 0.0.1
+# Description: Namespace of the models built by `MySQLTableReflector.reflect_model` at runtime,
+#              model instances are pickled by reference to their class.
+
+__version__ = '0.0.1'
+__author__ = 'Chris'
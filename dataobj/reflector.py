@@ -6,29 +6,116 @@
 # Version: 0.0.1
 # Description: Generate a model from the given table automatically
 
+import hashlib
+import json
 import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
 import dataobj
+from . import reflected
+from .indexes import Index
+from .model import Model, ModelMeta
 from .utils import validate_dao_class, underscore_to_camel
 from .fields import *
 
 __version__ = '0.0.1'
 __author__ = 'Chris'
 
-__all__ = ['ReflectedModel', 'MySQLTableReflector']
+__all__ = ['ReflectedModel', 'MySQLTableReflector', 'SchemaCache']
 
 logger = logging.getLogger(__name__)
 
+# `int(11) unsigned`, `decimal(10,2)`, `varchar(64)`, `enum('a','b')`
+_COLUMN_TYPE = re.compile(r'^(\w+)(?:\((\d+)[^)]*\))?')
+
+# Columns of `information_schema.COLUMNS` for the same keys as the rows of `DESC table`
+_COLUMNS_SQL = ('SELECT TABLE_NAME, COLUMN_NAME AS `Field`, COLUMN_TYPE AS `Type`, COLUMN_KEY AS `Key`, '
+                'EXTRA AS `Extra`, IS_NULLABLE AS `Null`, COLUMN_DEFAULT AS `Default` '
+                'FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = {}{} '
+                'ORDER BY TABLE_NAME, ORDINAL_POSITION')
+
+_STATISTICS_SQL = ('SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME, NON_UNIQUE '
+                   'FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = {}{} '
+                   'ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX')
+
 
 class ReflectedModel(object):
-    def __init__(self, name, field_classes, template):
+    def __init__(self, name, field_classes, template, indexes=None):
         self.name = name
         self.field_classes = field_classes
         self.template = template
+        # Index name -> {'columns': [...], 'unique': bool}, read by the bulk reflection only
+        self.indexes = indexes or {}
 
     def __str__(self):
         return self.template
 
 
+class SchemaCache(object):
+    """
+    On-disk snapshot of table definitions, used by `MySQLTableReflector.reflect_models`
+
+    Each table is stored with a checksum of its columns and indexes, only the tables
+    with a different checksum are written again. Use one file per database.
+
+    Usage:
+    >>> cache = SchemaCache('/var/cache/myapp/shop.schema.json')
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._tables = None
+
+    def __repr__(self):
+        return '<SchemaCache path={}>'.format(self.path)
+
+    @property
+    def tables(self):
+        """
+        Dict of table name to `{'checksum': ..., 'columns': [...], 'indexes': {...}}`
+        """
+        if self._tables is None and self.path is None:
+            self._tables = {}
+        elif self._tables is None:
+            try:
+                with open(self.path, encoding='utf-8') as fp:
+                    self._tables = json.load(fp)
+            except FileNotFoundError:
+                self._tables = {}
+        return self._tables
+
+    @staticmethod
+    def checksum(columns, indexes):
+        content = json.dumps([columns, indexes], sort_keys=True, default=str)
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    def update(self, table, columns, indexes):
+        """
+        :return: True if the definition of the table changed
+        """
+        checksum = self.checksum(columns, indexes)
+        entry = self.tables.get(table)
+        if entry is not None and entry['checksum'] == checksum:
+            return False
+
+        # Round trip through JSON, so that cached and fresh entries are identical
+        self.tables[table] = json.loads(json.dumps({'checksum': checksum, 'columns': columns, 'indexes': indexes},
+                                                  default=str))
+        return True
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        # Replace the file at once, readers never see a partial snapshot
+        temp_path = '{}.{}.tmp'.format(self.path, os.getpid())
+        with open(temp_path, 'w', encoding='utf-8') as fp:
+            json.dump(self.tables, fp, ensure_ascii=False, sort_keys=True, default=str)
+        os.replace(temp_path, self.path)
+
+
 class MySQLTableReflector(object):
     """
     Just a handy tool for MySQL to generate a Model class automatically
@@ -79,6 +166,8 @@ class MySQLTableReflector(object):
         validate_dao_class(dao_class)
         self._dao_class = dao_class
         self._type_mappings = {}
+        # Models built by `reflect_models`, reused while the table definition doesn't change
+        self._models = {}
 
     def __repr__(self):
         return '<"{}" object with dao class "{}">'.format(self.__class__.__name__,
@@ -113,12 +202,177 @@ class MySQLTableReflector(object):
                             value is the column in database
         :return: formatted Model class str
         """
-        return self._create_model(table, model_name,
-                                  *self._translate_descriptions_to_fields(self._describe_table(table),
-                                                                          skip_columns or [],
-                                                                          keep_columns or [],
-                                                                          field_name_mappings or {},
-                                                                          field_type_mappings or {}))
+        args = (self._describe_table(table),
+                skip_columns or [],
+                keep_columns or [],
+                field_name_mappings or {},
+                field_type_mappings or {})
+        # Secondary indexes are not listed by `DESC`
+        indexes = self._describe_indexes(tables=[table]).get(table, {})
+        fields, field_classes = self._translate_descriptions_to_fields(*args)
+        model = self._create_model(table, model_name, fields, field_classes,
+                                   self._index_definitions(indexes, self._column_specs(*args)))
+        model.indexes = indexes
+        return model
+
+    def reflect_all(self, database=None, tables=None, model_names=None, **kwargs):
+        """
+        Generate Model classes of many tables with two queries of `information_schema`,
+        instead of one `DESC` per table
+
+        :param database: database name, the current database by default
+        :param tables: table names to be reflected, all the tables by default
+        :param model_names: dict of table name to custom model name
+        :param kwargs: other arguments of `reflect`, applied to every table
+        :return: dict of table name to `ReflectedModel`
+        """
+        model_names = model_names or {}
+        descriptions = self._describe_tables(database, tables)
+        indexes = self._describe_indexes(database, tables)
+
+        models = {}
+        for table, table_descriptions in descriptions.items():
+            args = (table_descriptions,
+                    kwargs.get('skip_columns') or [],
+                    kwargs.get('keep_columns') or [],
+                    kwargs.get('field_name_mappings') or {},
+                    kwargs.get('field_type_mappings') or {})
+            fields, field_classes = self._translate_descriptions_to_fields(*args)
+            model = self._create_model(table, model_names.get(table, ''), fields, field_classes,
+                                       self._index_definitions(indexes.get(table, {}), self._column_specs(*args)))
+            model.indexes = indexes.get(table, {})
+            models[table] = model
+
+        return models
+
+    def reflect_databases(self, databases, max_workers=None, **kwargs):
+        """
+        Reflect the tables of several databases in parallel
+
+        :return: dict of database name to the result of `reflect_all`
+        """
+        databases = list(databases)
+        if not databases:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=max_workers or len(databases)) as executor:
+            futures = {database: executor.submit(self.reflect_all, database, **kwargs) for database in databases}
+            return {database: future.result() for database, future in futures.items()}
+
+    def reflect_model(self, table, model_name='', connection=None, cache=None, refresh=False, **kwargs):
+        """
+        Build a Model class of the table at runtime
+
+        :param connection: `Meta.connection` of the model
+        :param cache: `SchemaCache`, the table is only read from database if it's not cached
+        :param refresh: read the table definition from database even if it's cached
+        :param kwargs: other arguments of `reflect`
+        :return: Model class
+
+        Usage:
+        >>> User = reflector.reflect_model('user', connection=db_config, cache=SchemaCache('shop.json'))
+        >>> User.objects.get(id=1)
+        """
+        model_names = {table: model_name} if model_name else None
+        return self.reflect_models([table], model_names, connection, cache, refresh, **kwargs)[table]
+
+    def reflect_models(self, tables=None, model_names=None, connection=None, cache=None, refresh=False,
+                       database=None, **kwargs):
+        """
+        Build Model classes of many tables at runtime
+
+        Tables missing from the cache are read with one bulk query of `information_schema`.
+        With `refresh`, all the tables are read again, and only the models of the changed tables are rebuilt.
+
+        :param tables: table names, all the cached tables (or all the tables of the database) by default
+        :return: dict of table name to Model class
+        """
+        model_names = model_names or {}
+        # Without a cache file, the snapshot only lives in memory
+        cache = cache if cache is not None else SchemaCache(None)
+
+        if refresh or not cache.tables:
+            # `None` means all the tables
+            to_read, read = tables, True
+        else:
+            to_read = [table for table in tables or [] if table not in cache.tables]
+            read = len(to_read) > 0
+
+        if read:
+            descriptions = self._describe_tables(database, to_read)
+            indexes = self._describe_indexes(database, to_read)
+            changed = [table for table, columns in descriptions.items()
+                       if cache.update(table, columns, indexes.get(table, {}))]
+
+            if changed and cache.path is not None:
+                logger.info('Schema of tables {} changed, saved to `{}`'.format(changed, cache.path))
+                cache.save()
+
+        models = {}
+        for table in (tables if tables is not None else sorted(cache.tables)):
+            entry = cache.tables.get(table)
+            if entry is None:
+                raise ValueError('Table `{}` does not exist'.format(table))
+            models[table] = self._get_or_build_model(table, model_names.get(table, ''), entry, connection, kwargs)
+
+        return models
+
+    def _get_or_build_model(self, table, model_name, entry, connection, kwargs):
+        key = (table, model_name, entry['checksum'], id(connection), repr(sorted(kwargs.items())))
+        model = self._models.get(key)
+        if model is None:
+            specs = self._column_specs(entry['columns'],
+                                       kwargs.get('skip_columns') or [],
+                                       kwargs.get('keep_columns') or [],
+                                       kwargs.get('field_name_mappings') or {},
+                                       kwargs.get('field_type_mappings') or {})
+            model = self._models[key] = self._build_model(table, model_name, specs, connection,
+                                                          self._index_definitions(entry['indexes'], specs))
+        return model
+
+    @staticmethod
+    def _index_definitions(indexes, specs):
+        """
+        Translate reflected indexes to `Index` of field names, skip the primary key
+        and the indexes on columns which are not reflected
+        """
+        fields = {kwargs['db_column'] or field_name: field_name for field_name, _, kwargs in specs}
+        definitions = []
+        for name, index in sorted(indexes.items()):
+            if name == 'PRIMARY' or not all(column in fields for column in index['columns']):
+                continue
+            definitions.append(Index(*[fields[column] for column in index['columns']],
+                                     unique=index['unique'], name=name))
+        return definitions
+
+    @staticmethod
+    def _build_model(table, model_name, specs, connection, indexes=None):
+        model_name = model_name or underscore_to_camel(table)
+
+        existing = getattr(reflected, model_name, None)
+        if existing is not None and existing.__table_name__ != table:
+            raise ValueError('Model `{}` of table `{}` was reflected already'.format(model_name,
+                                                                                   existing.__table_name__))
+
+        attributes = {'__module__': reflected.__name__, '__qualname__': model_name}
+        for field_name, field_class, kwargs in specs:
+            field = field_class(**kwargs)
+            field.field_name = field_name
+            if kwargs['default'] is not None:
+                # Defaults like `CURRENT_TIMESTAMP` are computed by the database
+                try:
+                    field.validate_input(kwargs['default'])
+                except (TypeError, ValueError):
+                    field = field_class(**dict(kwargs, default=None))
+            attributes[field_name] = field
+
+        attributes['Meta'] = type('Meta', (), {'table_name': table, 'connection': connection,
+                                               'indexes': indexes or []})
+        model = ModelMeta(model_name, (Model,), attributes)
+
+        # Instances are pickled by reference to their class
+        setattr(reflected, model_name, model)
+        return model
 
     @classmethod
     def get_type_mappings(cls):
@@ -142,10 +396,61 @@ class MySQLTableReflector(object):
     def _describe_table(self, table):
         return self._dao_class().query('DESC {}'.format(table), None)
 
+    @staticmethod
+    def _schema_conditions(database, tables):
+        schema = '%s' if database else 'DATABASE()'
+        args = [database] if database else []
+        if tables:
+            tables = list(tables)
+            return schema, ' AND TABLE_NAME IN ({})'.format(', '.join(['%s'] * len(tables))), args + tables
+        return schema, '', args
+
+    def _describe_tables(self, database=None, tables=None):
+        """
+        :return: dict of table name to rows like the ones of `DESC table`
+        """
+        schema, table_condition, args = self._schema_conditions(database, tables)
+        descriptions = {}
+        for row in self._dao_class().query(_COLUMNS_SQL.format(schema, table_condition), args or None):
+            row = dict(row)
+            descriptions.setdefault(row.pop('TABLE_NAME'), []).append(row)
+        return descriptions
+
+    def _describe_indexes(self, database=None, tables=None):
+        """
+        :return: dict of table name to dict of index name to `{'columns': [...], 'unique': bool}`
+        """
+        schema, table_condition, args = self._schema_conditions(database, tables)
+        indexes = {}
+        for row in self._dao_class().query(_STATISTICS_SQL.format(schema, table_condition), args or None):
+            index = indexes.setdefault(row['TABLE_NAME'], {}).setdefault(
+                row['INDEX_NAME'], {'columns': [], 'unique': not int(row['NON_UNIQUE'])})
+            index['columns'].append(row['COLUMN_NAME'])
+        return indexes
+
     def _translate_descriptions_to_fields(self, descriptions, skip_columns, keep_columns, field_name_mappings,
                                           field_type_mappings):
         fields = []
         field_classes = []
+
+        for field_name, field_class, kwargs in self._column_specs(descriptions, skip_columns, keep_columns,
+                                                                  field_name_mappings, field_type_mappings):
+            kwargs = dict(kwargs, db_column="'{}'".format(kwargs['db_column']) if kwargs['db_column'] else '')
+            kwargs = ', '.join('{}={}'.format(k, kwargs[k]) for k in sorted(kwargs) if kwargs[k])
+            field = '{field_name} = {field_class}({kwargs})'.format(
+                field_name=field_name,
+                field_class=field_class.__name__,
+                kwargs=kwargs)
+            fields.append(field)
+            field_classes.append(field_class)
+
+        return fields, field_classes
+
+    def _column_specs(self, descriptions, skip_columns, keep_columns, field_name_mappings, field_type_mappings):
+        """
+        :return: list of `(field_name, field_class, keyword arguments of the field)`
+        """
+        specs = []
         reversed_mappings = dict((v, k) for k, v in field_name_mappings.items())
 
         for column in descriptions:
@@ -156,12 +461,9 @@ class MySQLTableReflector(object):
             if keep_columns and column_name not in keep_columns:
                 continue
 
-            type_with_size = column.get('Type')
-            column_type, *size = type_with_size.split('(')
-            try:
-                column_size = int(''.join(size).strip(')'))
-            except:
-                column_size = None
+            matched = _COLUMN_TYPE.match(column.get('Type').lower())
+            column_type = matched.group(1)
+            column_size = int(matched.group(2)) if matched.group(2) else None
 
             column_default = column.get('Default')
             is_primary_key = column.get('Key') == 'PRI'
@@ -177,25 +479,18 @@ class MySQLTableReflector(object):
                 field_class = self.get_type_mappings().get(column_type)
 
             kwargs = {
-                'db_column': "'{}'".format(column_name) if column_name in reversed_mappings else '',
+                'db_column': column_name if column_name in reversed_mappings else None,
                 'primary_key': is_primary_key,
                 'auto_increment': auto_increment,
                 'not_null': not_null,
                 'default': column_default,
                 'max_length': column_size
             }
+            specs.append((field_name, field_class, kwargs))
 
-            kwargs = ', '.join('{}={}'.format(k, kwargs[k]) for k in sorted(kwargs) if kwargs[k])
-            field = '{field_name} = {field_class}({kwargs})'.format(
-                field_name=field_name,
-                field_class=field_class.__name__,
-                kwargs=kwargs)
-            fields.append(field)
-            field_classes.append(field_class)
-
-        return fields, field_classes
+        return specs
 
-    def _create_model(self, table, model_name, fields, field_classes):
+    def _create_model(self, table, model_name, fields, field_classes, indexes=None):
         assert isinstance(model_name, str)
         model_name = underscore_to_camel(table) if not model_name else model_name
         model_templates = ["class {model_name}(Model):".format(model_name=model_name)]
@@ -211,6 +506,11 @@ class MySQLTableReflector(object):
         model_templates.append("    class Meta:\n"
                                "        table_name = '{}'\n"
                                "        dao_class = {}".format(table, self._dao_class.__name__))
+        if indexes:
+            model_templates.append('        indexes = [{}]'.format(', '.join(
+                "Index({}{}, name='{}')".format(', '.join("'{}'".format(f) for f in index.fields),
+                                               ', unique=True' if index.unique else '', index.name)
+                for index in indexes)))
         model_templates.append('')
 
         return ReflectedModel(model_name, field_classes, '\n'.join(model_templates))
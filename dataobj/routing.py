@@ -0,0 +1,121 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: Apache License
+# File   : routing.py
+# Date   : 2017-08-17 10-30
+# Version: 0.0.1
+# Description: Route reads of a model to replicas, and writes to the primary connection.
+
+import contextlib
+import itertools
+import threading
+import time
+
+__version__ = '0.0.1'
+__author__ = 'Chris'
+
+__all__ = ['ReplicaSet', 'use_primary']
+
+# Per thread state: depth of `use_primary` blocks
+_local = threading.local()
+
+
+@contextlib.contextmanager
+def use_primary():
+    """
+    Read from the primary connections of all the models inside the block
+
+    Usage:
+    >>> with use_primary():
+    >>>     user = User.objects.get(id=1)
+    """
+    _local.primary_depth = getattr(_local, 'primary_depth', 0) + 1
+    try:
+        yield
+    finally:
+        _local.primary_depth -= 1
+
+
+class ReplicaSet(object):
+    """
+    Read replicas of a model, configured by `read_connection` of `Meta`
+
+    Each replica is anything accepted as `Meta.connection`.
+    Strategies to pick a replica:
+    1. `round_robin`: one after another
+    2. `least_loaded`: the replica with the fewest queries in progress
+
+    After a write, the same thread reads from the primary for `read_your_writes` seconds,
+    so that it doesn't miss its own writes because of replication lag.
+
+    Usage:
+    >>> class User(Model):
+    >>>     ...
+    >>>     class Meta:
+    >>>         write_connection = primary
+    >>>         read_connection = [replica1, replica2]
+    >>>         read_strategy = 'least_loaded'
+    >>>         read_your_writes = 1.0
+    """
+
+    strategies = ('round_robin', 'least_loaded')
+
+    def __init__(self, replicas, strategy='round_robin', read_your_writes=1.0):
+        if strategy not in self.strategies:
+            raise ValueError('Unknown strategy `{}`, choices are {}'.format(strategy, self.strategies))
+
+        if not isinstance(replicas, (list, tuple)):
+            replicas = [replicas]
+        if not replicas:
+            raise ValueError('At least one replica is required')
+
+        self.replicas = list(replicas)
+        self.strategy = strategy
+        self.read_your_writes = read_your_writes
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self._in_flight = [0] * len(self.replicas)
+        self._local = threading.local()
+
+    def __repr__(self):
+        return '<ReplicaSet replicas={}, strategy={}>'.format(len(self.replicas), self.strategy)
+
+    def __len__(self):
+        return len(self.replicas)
+
+    def mark_write(self):
+        """
+        Called after a write by the current thread
+        """
+        self._local.last_write = time.monotonic()
+
+    def use_primary(self):
+        """
+        Whether the current thread should read from the primary now
+        """
+        if getattr(_local, 'primary_depth', 0) > 0:
+            return True
+
+        last_write = getattr(self._local, 'last_write', None)
+        return last_write is not None and time.monotonic() - last_write < self.read_your_writes
+
+    def acquire(self):
+        """
+        Pick a replica, `release` it after the query
+
+        :return: index of the replica
+        """
+        with self._lock:
+            start = next(self._counter) % len(self.replicas)
+            if self.strategy == 'round_robin':
+                index = start
+            else:
+                # Ties are broken by the round robin order
+                index = min(range(start, start + len(self.replicas)),
+                            key=lambda i: self._in_flight[i % len(self.replicas)]) % len(self.replicas)
+            self._in_flight[index] += 1
+            return index
+
+    def release(self, index):
+        with self._lock:
+            self._in_flight[index] -= 1
@@ -0,0 +1,90 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: Apache License
+# File   : sharding.py
+# Date   : 2017-08-18 10-15
+# Version: 0.0.1
+# Description: Split the rows of a model across several databases by a shard key.
+
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+__version__ = '0.0.1'
+__author__ = 'Chris'
+
+__all__ = ['ShardRouter']
+
+
+class ShardRouter(object):
+    """
+    Map values of the shard key to shards, configured by `shard_key` and `shards` of `Meta`
+
+    `shards` is a dict of shard name to connection, or a list of connections named by index.
+    Shards are ordered by index, or by name for a dict.
+    `shard_by(value)` returns the shard name of a shard key value, by default integers are
+    taken modulo the number of shards, and other values are hashed with CRC32 first.
+
+    Usage:
+    >>> class Order(Model):
+    >>>     ...
+    >>>     class Meta:
+    >>>         shard_key = 'user_id'
+    >>>         shards = [shard0_config, shard1_config]
+    >>>         shard_by = lambda user_id: user_id // 1000000
+    """
+
+    def __init__(self, shard_key, shards, shard_by=None, max_workers=None):
+        if not shards:
+            raise ValueError('At least one shard is required')
+
+        if isinstance(shards, (list, tuple)):
+            names = list(range(len(shards)))
+            shards = dict(enumerate(shards))
+        else:
+            # Sorted by the names themselves, the default mapping must not depend on the order of a dict
+            try:
+                names = sorted(shards)
+            except TypeError:
+                names = sorted(shards, key=repr)
+
+        self.shard_key = shard_key
+        self.shards = dict(shards)
+        self.names = names
+        self._shard_by = shard_by or self._default_shard_by
+        self._max_workers = max_workers or len(self.shards)
+        self._executor = None
+
+    def __repr__(self):
+        return '<ShardRouter shard_key={}, shards={}>'.format(self.shard_key, self.names)
+
+    def _default_shard_by(self, value):
+        if not isinstance(value, int):
+            value = zlib.crc32(str(value).encode('utf-8'))
+        return self.names[value % len(self.names)]
+
+    def shard_for(self, value):
+        """
+        :return: name of the shard holding rows with the shard key value
+        """
+        name = self._shard_by(value)
+        if name not in self.shards:
+            raise ValueError('Shard `{}` of `{}={!r}` is not configured'.format(name, self.shard_key, value))
+        return name
+
+    def connection_for(self, value):
+        return self.shards[self.shard_for(value)]
+
+    def map(self, func, names):
+        """
+        Call `func(connection)` of the shards concurrently
+
+        :return: results in the order of `names`
+        """
+        if len(names) == 1:
+            return [func(self.shards[names[0]])]
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers)
+
+        futures = [self._executor.submit(func, self.shards[name]) for name in names]
+        return [future.result() for future in futures]
@@ -6,6 +6,8 @@
 # Version: 0.0.1
 # Description: description of this file.
 
+import datetime
+import decimal
 import hashlib
 import pickle
 import warnings
@@ -48,6 +50,21 @@ def get_object_fingerprint(obj, hash_method='md5'):
     return method(pickle.dumps(obj)).hexdigest()
 
 
+def json_default(value):
+    """
+    `default` hook for JSON encoders, handles the types our fields output
+
+    :return: JSON serializable value
+    """
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+
+    raise TypeError('Object of type `{}` is not JSON serializable'.format(type(value).__name__))
+
+
 def validate_dao_class(c):
     """
     Check the dao class is valid or not
@@ -6,3 +6,4 @@ from .phone import PhoneNumberValidator
 from .pytype import TypeValidator
 from .qq import QQNumberValidator
 from .choice import ChoiceValidator
+from .regex import RegexValidator
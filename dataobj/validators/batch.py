@@ -0,0 +1,44 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: Apache License
+# File   : batch.py
+# Date   : 2017-08-07 10-32
+# Version: 0.0.1
+# Description: Helpers of the `validate_many` methods of validators.
+
+from ..exceptions import BatchValidationError
+
+__version__ = '0.0.1'
+__author__ = 'Chris'
+
+
+def validate_indices(validator, param, values, indices):
+    """
+    Run `validator.validate` on the values at the given indices only, others are valid already
+
+    Error handlers are applied as usual, the remaining errors are raised all at once.
+
+    :param values: list of values
+    :param indices: indices of values that didn't pass the fast check of the validator
+    :return: list of validated values
+    """
+    results = list(values)
+    errors = []
+    for index in indices:
+        try:
+            results[index] = validator.validate(param, values[index])
+        except (TypeError, ValueError) as err:
+            errors.append((index, err))
+
+    if errors:
+        raise BatchValidationError(param, errors, results)
+
+    return results
+
+
+def validate_each(validator, param, values):
+    """
+    Fallback for validators without a `validate_many` method
+    """
+    values = list(values)
+    return validate_indices(validator, param, values, range(len(values)))
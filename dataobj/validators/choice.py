@@ -7,14 +7,36 @@
 # Description: description of this file.
 
 
+from .batch import validate_indices
+
 __version__ = '0.0.1'
 __author__ = 'Chris'
 
 
 class ChoiceValidator(object):
-    def __init__(self, choices=None, error_handler=None):
+    """
+    Check the value is one of the choices
+
+    Hashable choices are kept in a frozenset, so large choice sets are checked in constant time.
+    `mapping` accepts extra values and replaces them with the canonical ones,
+    e.g. `{'cn': 'CN', 'China': 'CN'}`
+    """
+
+    def __init__(self, choices=None, error_handler=None, mapping=None):
         self._choices = choices or []
         self._error_handler = error_handler
+        self._mapping = dict(mapping or {})
+
+        hashable_choices = []
+        self._unhashable_choices = []
+        for choice in self._choices:
+            try:
+                hash(choice)
+            except TypeError:
+                self._unhashable_choices.append(choice)
+            else:
+                hashable_choices.append(choice)
+        self._hashable_choices = frozenset(hashable_choices)
 
     def __repr__(self):
         return '<ChoiceValidator choices={}>'.format(self._choices)
@@ -23,7 +45,17 @@ class ChoiceValidator(object):
         if value is None:
             return value
 
-        if value in self._choices:
+        try:
+            if value in self._hashable_choices:
+                return value
+
+            if value in self._mapping:
+                return self._mapping[value]
+        except TypeError:
+            # Unhashable value
+            pass
+
+        if value in self._unhashable_choices:
             return value
 
         if self._error_handler and callable(self._error_handler):
@@ -31,3 +63,14 @@ class ChoiceValidator(object):
 
         raise ValueError('Choice validation error on param `{}={}`, '
                          'available choices are `{}`'.format(param, value, self._choices))
+
+    def validate_many(self, param, values):
+        values = list(values)
+        choices, mapping = self._hashable_choices, self._mapping
+        try:
+            indices = [i for i, v in enumerate(values) if v is not None and (v not in choices or v in mapping)]
+        except TypeError:
+            # Some values are unhashable, let `validate` handle them
+            indices = [i for i, v in enumerate(values) if v is not None]
+
+        return validate_indices(self, param, values, indices)
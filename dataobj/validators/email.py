@@ -8,30 +8,19 @@
 
 import re
 
+from .regex import RegexValidator
+
 __version__ = '0.0.1'
 __author__ = 'Chris'
 
 
-class EmailValidator(object):
-    def __init__(self, error_handler=None):
-        self._error_handler = error_handler
+class EmailValidator(RegexValidator):
+    pattern = re.compile(r'^[_a-z0-9-]+(\.[_a-z0-9-]+)*@[a-z0-9-]+(\.[a-z0-9-]+)*(\.[a-z]{2,4})$')
+    error_message = 'Email validation error on param `{}={}`'
 
     def __repr__(self):
         return '<EmailValidator>'
 
-    def validate(self, param, value):
-        if value is None:
-            return value
-
-        pattern = '^[_a-z0-9-]+(\.[_a-z0-9-]+)*@[a-z0-9-]+(\.[a-z0-9-]+)*(\.[a-z]{2,4})$'
-        if re.match(pattern, value):
-            return value
-
-        if self._error_handler and callable(self._error_handler):
-            return self._error_handler(value)
-
-        raise ValueError('Email validation error on param `{}={}`'.format(param, value))
-
 
 if __name__ == '__main__':
     v = EmailValidator(None)
@@ -7,6 +7,8 @@
 # Description: description of this file.
 
 
+from .batch import validate_indices
+
 __version__ = '0.0.1'
 __author__ = 'Chris'
 
@@ -21,6 +23,13 @@ class LengthValidator(object):
         return '<LengthValidator min_len={}, max_len={}>'.format(self._min_length,
                                                                  self._max_length)
 
+    @property
+    def is_noop(self):
+        """
+        No length limits at all, any value passes
+        """
+        return self._min_length <= 0 and self._max_length == float('inf')
+
     def validate(self, param, value):
         if value is None:
             return value
@@ -41,6 +50,24 @@ class LengthValidator(object):
                                                               self._min_length,
                                                               self._max_length))
 
+    def validate_many(self, param, values):
+        values = list(values)
+        min_length, max_length = self._min_length, self._max_length
+        indices = []
+        for index, value in enumerate(values):
+            if value is None:
+                continue
+
+            try:
+                length = len(value)
+            except:
+                length = 0
+
+            if not min_length <= length <= max_length:
+                indices.append(index)
+
+        return validate_indices(self, param, values, indices)
+
 
 if __name__ == '__main__':
     v = LengthValidator(1, 3, error_handler=lambda x: x[:3])
@@ -6,6 +6,8 @@
 # Version: 0.0.1
 # Description: description of this file.
 
+from .batch import validate_indices
+
 __version__ = '0.0.1'
 __author__ = 'Chris'
 
@@ -23,6 +25,10 @@ class NotNullValidator(object):
         # Empty list(or dict, set etc..) is not NULL, just empty.
         return value if value is not None else self._error(param, value)
 
+    def validate_many(self, param, values):
+        values = list(values)
+        return validate_indices(self, param, values, [i for i, v in enumerate(values) if v is None])
+
     def _error(self, param, value):
         if self._error_handler and callable(self._error_handler):
             return self._error_handler(value)
@@ -8,31 +8,19 @@
 
 import re
 
+from .regex import RegexValidator
+
 __version__ = '0.0.1'
 __author__ = 'Chris'
 
 
-class PhoneNumberValidator(object):
-    def __init__(self, error_handler=None):
-        self._error_handler = error_handler
+class PhoneNumberValidator(RegexValidator):
+    pattern = re.compile(r'0?(13|14|15|18)[0-9]{9}')
+    error_message = 'Phone number validation error on param `{}={}`'
 
     def __repr__(self):
         return '<PhoneNumberValidator>'
 
-    def validate(self, param, value):
-        if value is None:
-            return value
-
-        pattern = r'0?(13|14|15|18)[0-9]{9}'
-
-        if re.match(pattern, value):
-            return value
-
-        if self._error_handler and callable(self._error_handler):
-            return self._error_handler(value)
-
-        raise ValueError('Phone number validation error on param `{}={}`'.format(param, value))
-
 
 if __name__ == '__main__':
     v = PhoneNumberValidator()
@@ -6,6 +6,10 @@
 # Version: 0.0.1
 # Description: description of this file.
 
+import functools
+
+from .batch import validate_indices
+
 __version__ = '0.0.1'
 __author__ = 'Chris'
 
@@ -14,8 +18,10 @@ class TypeValidator(object):
     def __init__(self, expected_type, force_converse_handler=None,
                  error_handler=None):
         self._expected_type = expected_type
-        self._force_converse_handler = force_converse_handler
-        self._error_handler = error_handler or force_converse_handler
+        # Non-callable handlers are ignored, check it once here rather than on every value
+        self._force_converse_handler = force_converse_handler if callable(force_converse_handler) else None
+        error_handler = error_handler or force_converse_handler
+        self._error_handler = error_handler if callable(error_handler) else None
 
     def __repr__(self):
         return '<TypeValidator expected_type={}>'.format(self._expected_type)
@@ -25,17 +31,48 @@ class TypeValidator(object):
             return value
 
         try:
-            if self._force_converse_handler and callable(self._force_converse_handler):
+            if self._force_converse_handler is not None:
                 return self._force_converse_handler(value)
             else:
                 return self.converse(value)
         except Exception:
-            if self._error_handler and callable(self._error_handler):
+            if self._error_handler is not None:
                 return self._error_handler(value)
 
         raise TypeError('Type validation error on param `{}={}`,'
                         ' expected type `{}`, got type `{}`'.format(param, value, self._expected_type, type(value)))
 
+    def compile(self, param):
+        """
+        Specialise `validate` for the given param
+
+        Values which are already instances of the expected type are returned at once,
+        unless a force converse handler is set.
+        """
+        validate = self.validate
+        if self._force_converse_handler is not None:
+            return functools.partial(validate, param)
+
+        expected_type = self._expected_type
+
+        def validate_type(value):
+            if isinstance(value, expected_type):
+                return value
+            return validate(param, value)
+
+        return validate_type
+
+    def validate_many(self, param, values):
+        values = list(values)
+        if self._force_converse_handler is not None:
+            # Every value is converted by the handler
+            indices = [i for i, v in enumerate(values) if v is not None]
+        else:
+            expected_type = self._expected_type
+            indices = [i for i, v in enumerate(values) if v is not None and not isinstance(v, expected_type)]
+
+        return validate_indices(self, param, values, indices)
+
     def converse(self, value):
         if isinstance(value, self._expected_type):
             return value
@@ -0,0 +1,60 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: Apache License
+# File   : regex.py
+# Date   : 2017-08-08 09-47
+# Version: 0.0.1
+# Description: description of this file.
+
+import re
+
+from .batch import validate_indices
+
+__version__ = '0.0.1'
+__author__ = 'Chris'
+
+
+class RegexValidator(object):
+    """
+    Validate a str value by matching a regular expression from the beginning
+
+    Subclasses define a compiled `pattern` at class level, which can be replaced
+    per instance by passing `pattern` (str or compiled pattern).
+
+    `error_handler` comes first, same as the email, phone and QQ number validators
+    always accepted, and `pattern` is keyword only.
+
+    Usage:
+    >>> RegexValidator(pattern=r'^[0-9]+$')
+    >>> EmailValidator(error_handler, pattern=r'^[^@]+@[^@]+$')
+    """
+    pattern = None
+    error_message = 'Regex validation error on param `{}={}`'
+
+    def __init__(self, error_handler=None, *, pattern=None):
+        self._regex = re.compile(pattern) if pattern is not None else self.pattern
+        if self._regex is None:
+            raise ValueError('Missing pattern of `{}`'.format(self.__class__.__name__))
+
+        self._error_handler = error_handler
+
+    def __repr__(self):
+        return '<RegexValidator pattern={}>'.format(self._regex.pattern)
+
+    def validate(self, param, value):
+        if value is None:
+            return value
+
+        if self._regex.match(value):
+            return value
+
+        if self._error_handler and callable(self._error_handler):
+            return self._error_handler(value)
+
+        raise ValueError(self.error_message.format(param, value))
+
+    def validate_many(self, param, values):
+        values = list(values)
+        match = self._regex.match
+        return validate_indices(self, param, values,
+                                [i for i, v in enumerate(values) if v is not None and not match(v)])
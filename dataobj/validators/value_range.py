@@ -7,6 +7,8 @@
 # Description: description of this file.
 
 
+from .batch import validate_indices
+
 __version__ = '0.0.1'
 __author__ = 'Chris'
 
@@ -32,3 +34,21 @@ class ValueRangeValidator(object):
             return self._error_handler
 
         raise ValueError('Value range validation error on param `{}={}`'.format(param, value))
+
+    def validate_many(self, param, values):
+        values = list(values)
+        min_value, max_value = self._min_value, self._max_value
+        indices = []
+        for index, value in enumerate(values):
+            if value is None:
+                continue
+
+            try:
+                if min_value <= value <= max_value:
+                    continue
+            except TypeError:
+                pass
+
+            indices.append(index)
+
+        return validate_indices(self, param, values, indices)
@@ -0,0 +1,239 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: Apache License
+# File   : writebehind.py
+# Date   : 2017-08-16 10-20
+# Version: 0.0.1
+# Description: Write-behind buffer, which coalesces dump and update calls of a model
+#              and writes them in batches from a background thread.
+
+import atexit
+import logging
+import pickle
+import threading
+import weakref
+
+from .exceptions import WriteBufferFullError
+
+__version__ = '0.0.1'
+__author__ = 'Chris'
+
+__all__ = ['WriteBehindBuffer']
+
+logger = logging.getLogger('dataobj')
+
+
+class WriteBehindBuffer(object):
+    """
+    Buffer the inserts and updates of a model, enabled by the `write_behind` option of `Meta`
+
+    1. Repeated updates of the same primary key are merged, the latest values win
+    2. Pending writes are flushed when `flush_size` is reached, every `flush_interval`
+        seconds, when `flush()` is called, and at interpreter exit
+    3. Writers block when `max_size` primary keys are pending, until the buffer is drained,
+        `WriteBufferFullError` is raised after `block_timeout` seconds
+    4. Rows without a primary key value are inserted at once, their id is needed
+    5. Buffered inserts are written as upserts (`bulk_upsert`), an existing row with the same
+        primary key is overwritten, and a flush retried after a partial failure writes the same rows
+
+    Failed writes are put back and stay pending, behind the writes buffered since.
+    Errors of the background flushes are logged and retried every `flush_interval` seconds,
+    errors of `flush()` and `close()` are raised.
+
+    Usage:
+    >>> class Counter(Model):
+    >>>     ...
+    >>>     class Meta:
+    >>>         write_behind = {'flush_interval': 0.5, 'max_size': 10000}
+    >>> counter.update(hits=counter.hits + 1)   # returns at once
+    >>> Counter.__write_behind__.flush()
+    """
+
+    def __init__(self, model, max_size=10000, flush_size=1000, flush_interval=1.0,
+                 batch_size=None, block_timeout=None):
+        if flush_size > max_size:
+            raise ValueError('`flush_size` should not be greater than `max_size`')
+
+        self._model = model
+        self.max_size = max_size
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.block_timeout = block_timeout
+
+        # Primary key value -> model instance to insert
+        self._inserts = {}
+        # Primary key value -> dict of column to value
+        self._updates = {}
+        # Primary key values with pending inserts or updates
+        self._pending = set()
+        self._condition = threading.Condition()
+        # Flushes are serialized, so that writes are applied in order
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+    def __repr__(self):
+        return '<WriteBehindBuffer model={}, pending={}>'.format(self._model.__name__, len(self))
+
+    def __len__(self):
+        return len(self._pending)
+
+    @property
+    def _manager(self):
+        return self._model.objects
+
+    def dump(self, model_instance):
+        primary_field = self._model.__primary_field__
+        pk = model_instance.__dict__.get(primary_field.field_name)
+        if pk is None:
+            return self._manager._dump_now(model_instance)
+
+        with self._condition:
+            self._wait_for_room(pk)
+            self._inserts[pk] = model_instance
+            self._pending.add(pk)
+            self._notify_if_needed()
+
+        return True
+
+    def update(self, model_instance):
+        manager = self._manager
+        primary_field = self._model.__primary_field__
+        pk = model_instance.__dict__.get(primary_field.field_name)
+        if pk is None:
+            return manager._update_now(model_instance)
+
+        content = manager._collect_updated_content(model_instance)
+        if len(content) == 0:
+            return True
+
+        with self._condition:
+            self._wait_for_room(pk)
+            self._updates.setdefault(pk, {}).update(content)
+            self._pending.add(pk)
+            self._notify_if_needed()
+
+        # Same as a successful update, following updates only send the new changes
+        setattr(model_instance, manager._get_pk_name(model_instance), pickle.dumps(model_instance))
+        return True
+
+    def discard(self, pk):
+        """
+        Drop the pending writes of a primary key, e.g. before deleting the row
+
+        Waits for the flush in progress, which may be writing the row.
+        """
+        with self._flush_lock, self._condition:
+            self._inserts.pop(pk, None)
+            self._updates.pop(pk, None)
+            self._pending.discard(pk)
+            self._condition.notify_all()
+
+    def flush(self):
+        """
+        Write all the pending inserts and updates now, errors are raised
+        and the failed writes are kept to be flushed again
+        """
+        with self._flush_lock:
+            with self._condition:
+                inserts, self._inserts = self._inserts, {}
+                updates, self._updates = self._updates, {}
+                self._pending = set()
+                self._condition.notify_all()
+
+            try:
+                self._write(list(inserts.values()), updates)
+            except Exception:
+                self._restore(inserts, updates)
+                raise
+
+    def _restore(self, inserts, updates):
+        """
+        Put the failed writes back, behind the writes buffered since
+        """
+        with self._condition:
+            for pk, model_instance in inserts.items():
+                self._inserts.setdefault(pk, model_instance)
+            for pk, content in updates.items():
+                content = dict(content)
+                content.update(self._updates.get(pk, {}))
+                self._updates[pk] = content
+            self._pending.update(inserts)
+            self._pending.update(updates)
+
+    def close(self):
+        """
+        Stop the background thread and flush the pending writes
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+
+    def _wait_for_room(self, pk):
+        """
+        Called with the condition locked, block until the buffer is not full
+        """
+        if self._closed:
+            raise RuntimeError('Write-behind buffer of `{}` is closed'.format(self._model.__name__))
+
+        self._ensure_thread()
+        if pk in self._pending:
+            # Merged, the buffer doesn't grow
+            return
+
+        if not self._condition.wait_for(lambda: len(self) < self.max_size, self.block_timeout):
+            raise WriteBufferFullError('Write-behind buffer of `{}` is full, {} rows are pending'.format(
+                self._model.__name__, len(self)))
+
+    def _notify_if_needed(self):
+        if len(self) >= self.flush_size:
+            self._condition.notify_all()
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+
+        # Do not keep the buffer alive just for the exit hook
+        ref = weakref.ref(self)
+        atexit.register(lambda: ref() is not None and ref().close())
+
+        self._thread = threading.Thread(target=self._run, name='dataobj-write-behind-{}'.format(self._model.__name__))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._closed and len(self) < self.flush_size:
+                    self._condition.wait(self.flush_interval)
+                if self._closed:
+                    return
+
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Failed to flush the write-behind buffer of `{}`, {} rows are pending'.format(
+                    self._model.__name__, len(self)))
+
+                # Retry later, even if the buffer is full
+                with self._condition:
+                    if not self._closed:
+                        self._condition.wait(self.flush_interval)
+
+    def _write(self, inserts, updates):
+        manager = self._manager
+        conn = manager._get_connection(None)
+        if hasattr(conn, 'execute_sql'):
+            if inserts:
+                manager.bulk_upsert(inserts, batch_size=self.batch_size)
+        else:
+            for model_instance in inserts:
+                manager._dump_now(model_instance)
+
+        # Updated row by row by connections without `execute_sql`
+        manager._bulk_update_rows(list(updates.items()), self.batch_size)
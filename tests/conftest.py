@@ -13,3 +13,12 @@ import pytest
 def converter():
     from dataobj.converters import PyDatetimeConverter
     return PyDatetimeConverter()
+
+
+@pytest.fixture
+def users():
+    """
+    Model instances of the rows of the SQLite user table, filled again for every test
+    """
+    from sqlite_models import dump_users
+    return dump_users()
@@ -0,0 +1,61 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : sqlite_models.py
+# Date   : 2017-08-10 14-20
+# Version: 0.1
+# Description: Models of the SQLite tests, defined at module level so that they can be pickled.
+
+import datetime
+
+from dataobj import Model, IntField, StrField, ListField, DatetimeField
+from dataobj.connections import SQLiteConnection
+
+conn = SQLiteConnection()
+conn.executescript("""
+CREATE TABLE user (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    age INTEGER,
+    addr TEXT,
+    tags TEXT,
+    register_at TEXT
+);
+""")
+
+
+class User(Model):
+    id = IntField(primary_key=True)
+    name = StrField(not_null=True)
+    age = IntField()
+    address = StrField(db_column='addr')
+    tags = ListField(default=list)
+    register_at = DatetimeField()
+
+    class Meta:
+        table_name = 'user'
+        connection = conn
+
+
+def dump_users():
+    """
+    Fill the user table with the same four rows
+    """
+    conn.execute_sql('DELETE FROM user')
+    users = [User(name=name, age=age, address='Beijing', register_at=datetime.datetime(2017, 8, 10, 10, age or 0))
+             for name, age in [('Chris', 20), ('Foo_bar', 30), ('Lee', 40), ('Null', None)]]
+    for user in users:
+        assert user.dump() is True
+    return users
+
+
+class ExecuteOnlyConnection(object):
+    """
+    Implements `execute` and `query` only, same as `ConnectionRouter` of dbutil
+    """
+
+    def execute(self, table, **kwargs):
+        return conn.execute(table, **kwargs)
+
+    def query(self, table, **kwargs):
+        return conn.query(table, **kwargs)
@@ -0,0 +1,73 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : test_aggregates.py
+# Date   : 2017-08-21 11-00
+# Version: 0.1
+# Description: description of this file.
+
+import pytest
+
+from dataobj import Count, Sum, Avg, Min, Max
+from dataobj.connections import SQLiteConnection, mysql_compiler, sqlite_compiler
+from sqlite_models import User
+
+pytestmark = pytest.mark.usefixtures('users')
+
+
+def test_aggregate_ok():
+    assert User.objects.all().aggregate(n=Count(), ages=Count('age'), total=Sum('age'), avg=Avg('age'),
+                                        youngest=Min('age'), oldest=Max('age')) == {
+        'n': 4, 'ages': 3, 'total': 90, 'avg': 30.0, 'youngest': 20, 'oldest': 40}
+    assert User.objects.filter(age__gt=20).aggregate(total=Sum('age')) == {'total': 70}
+    assert User.objects.filter(age__gt=20).count() == 2
+
+
+def test_count_ignores_limit_and_order():
+    assert User.objects.all().order_by('age').limit(2, 2).count() == 4
+    assert User.objects.filter(age__gt=20).limit(1).count() == 2
+    # Number of groups
+    assert User.objects.all().group_by('address').count() == 1
+
+
+def test_filter_connection_not_kept():
+    other = SQLiteConnection()
+    other.executescript('CREATE TABLE user (id INTEGER PRIMARY KEY, name TEXT, age INTEGER, addr TEXT, '
+                        'tags TEXT, register_at TEXT)')
+    query = User.objects.filter(conn=other, id=5)
+    assert query.count() == 0
+
+    # The root manager still uses the connection of the model
+    assert User.objects.count() == 4
+    assert User.objects.aggregate(n=Count()) == {'n': 4}
+    assert len(list(User.objects.all())) == 4
+    # The query keeps its connection, evaluated again
+    assert list(query) == [] and query.count() == 0
+
+
+def test_group_by_ok(users):
+    users[0].update(address='Shanghai')
+    results = User.objects.all().group_by('address').order_by('address').aggregate(n=Count(), total=Sum('age'))
+    assert results == [{'address': 'Beijing', 'n': 3, 'total': 70},
+                       {'address': 'Shanghai', 'n': 1, 'total': 20}]
+
+
+def test_aggregate_unknown_field_failed():
+    with pytest.raises(ValueError):
+        User.objects.all().aggregate(total=Sum('weight'))
+
+    with pytest.raises(ValueError):
+        User.objects.all().group_by('weight')
+
+
+def test_aggregate_quoted():
+    assert Sum('address').compile(User, 'order', mysql_compiler) == ['SUM(`addr`) AS `order`']
+    assert Avg('age').compile(User, 'avg', sqlite_compiler, partial=True) == ['SUM("age") AS "avg__sum"',
+                                                                             'COUNT("age") AS "avg__count"']
+    # Reserved words
+    assert User.objects.all().aggregate(order=Count(), group=Sum('age')) == {'order': 4, 'group': 90}
+
+
+def test_aggregate_alias_failed():
+    with pytest.raises(ValueError, match='identifier'):
+        User.objects.all().aggregate(**{'n FROM user; --': Count()})
@@ -0,0 +1,137 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : test_bulk.py
+# Date   : 2017-08-15 10-30
+# Version: 0.1
+# Description: description of this file.
+
+import pytest
+
+from dataobj import Model, IntField
+from dataobj.connections import mysql_compiler, sqlite_compiler
+from sqlite_models import conn, User, ExecuteOnlyConnection
+
+pytestmark = pytest.mark.usefixtures('users')
+
+
+def test_bulk_upsert_ok(users):
+    chris = User.objects.get(id=users[0].id)
+    chris.age = 22
+    chris.address = 'Shanghai'
+    new_users = [User(name='New{}'.format(i), age=i) for i in range(5)]
+
+    assert User.objects.bulk_upsert([chris] + new_users, update_fields=['age'], batch_size=2) > 0
+    assert User.objects.count() == 9
+
+    assert User.objects.get(id=chris.id).address == 'Beijing'
+    assert User.objects.get(id=chris.id).age == 22
+    assert [u.age for u in User.objects.filter(name__startswith='New').order_by('id')] == list(range(5))
+
+    # The address was not upserted, it's still pending
+    assert chris.update() is True
+    assert User.objects.get(id=chris.id).address == 'Shanghai'
+
+
+def test_bulk_upsert_unknown_field_failed(users):
+    with pytest.raises(ValueError):
+        User.objects.bulk_upsert(users, update_fields=['nickname'])
+
+
+@pytest.mark.parametrize('compiler, update_columns, expected', [
+    (mysql_compiler, ['name'],
+     'INSERT INTO `user` (`id`, `name`) VALUES (%s, %s), (%s, %s) ON DUPLICATE KEY UPDATE `name` = VALUES(`name`)'),
+    (mysql_compiler, [],
+     'INSERT INTO `user` (`id`, `name`) VALUES (%s, %s), (%s, %s) ON DUPLICATE KEY UPDATE `id` = `id`'),
+    (sqlite_compiler, ['name'],
+     'INSERT INTO "user" ("id", "name") VALUES (?, ?), (?, ?) ON CONFLICT ("id") DO UPDATE SET "name" = excluded."name"'),
+    (sqlite_compiler, [],
+     'INSERT INTO "user" ("id", "name") VALUES (?, ?), (?, ?) ON CONFLICT ("id") DO NOTHING'),
+])
+def test_compile_upsert(compiler, update_columns, expected):
+    sql, args = compiler.compile_upsert('user', ['id', 'name'], [[1, 'a'], [2, 'b']], ['id'], update_columns)
+    assert sql == expected
+    assert args == [1, 'a', 2, 'b']
+
+
+def test_bulk_update_ok(users):
+    users[0].age = 50
+    users[1].address = 'Shanghai'
+    users[1].tags.append('python')
+
+    assert User.objects.bulk_update(users, batch_size=1) == 2
+    assert [(u.age, u.address, u.tags) for u in User.objects.all().order_by('id')] == [
+        (50, 'Beijing', []), (30, 'Shanghai', ['python']), (40, 'Beijing', []), (None, 'Beijing', [])]
+
+    # Nothing changed since the bulk update
+    assert User.objects.bulk_update(users) == 0
+
+
+def test_bulk_update_fields_ok(users):
+    for user in users:
+        user.name = user.name.upper()
+        user.age = 1
+
+    assert User.objects.bulk_update(users, fields=['name']) == 4
+    assert [(u.name, u.age) for u in User.objects.all().order_by('id')] == [
+        ('CHRIS', 20), ('FOO_BAR', 30), ('LEE', 40), ('NULL', None)]
+
+
+def test_bulk_update_without_execute_sql(users):
+    for user in users:
+        user.age = 1
+    assert User.objects.bulk_update(users, conn=ExecuteOnlyConnection()) == 4
+    assert User.objects.filter(age=1).count() == 4
+
+
+def test_bulk_upsert_without_execute_sql_failed(users):
+    with pytest.raises(RuntimeError, match='execute_sql'):
+        User.objects.bulk_upsert([User(id=100, name='New')], conn=ExecuteOnlyConnection())
+    assert User.objects.count() == 4
+
+
+WIDE_COLUMNS = ['c{}'.format(i) for i in range(70)]
+conn.executescript('CREATE TABLE wide (id INTEGER PRIMARY KEY, {});'.format(
+    ', '.join('{} INTEGER'.format(column) for column in WIDE_COLUMNS)))
+
+# 71 columns, 500 rows in one statement would exceed any parameter limit of SQLite
+Wide = type('Wide', (Model,), dict({column: IntField() for column in WIDE_COLUMNS},
+                                   id=IntField(primary_key=True), __module__=__name__,
+                                   Meta=type('Meta', (), {'table_name': 'wide', 'connection': conn})))
+
+
+def test_bulk_write_wide_model_within_parameter_limit(monkeypatch):
+    parameters = []
+    execute_sql = conn.execute_sql
+
+    def counting_execute_sql(sql, args):
+        parameters.append(len(args))
+        return execute_sql(sql, args)
+
+    monkeypatch.setattr(conn, 'execute_sql', counting_execute_sql)
+
+    rows = [Wide(id=i, **{column: i for column in WIDE_COLUMNS}) for i in range(1, 501)]
+    assert Wide.objects.bulk_upsert(rows) == 500
+    assert max(parameters) <= 999
+    assert Wide.objects.count() == 500
+
+    del parameters[:]
+    for row in rows:
+        for column in WIDE_COLUMNS:
+            setattr(row, column, -row.id)
+    assert Wide.objects.bulk_update(rows, batch_size=500) == 500
+    assert max(parameters) <= 999
+    assert Wide.objects.get(id=500).c69 == -500
+
+
+def test_rows_per_statement():
+    assert sqlite_compiler.rows_per_statement(71) == 14
+    assert sqlite_compiler.rows_per_statement(3, batch_size=10) == 10
+    assert sqlite_compiler.rows_per_statement(2000) == 1
+
+
+def test_compile_bulk_update():
+    sql, args = sqlite_compiler.compile_bulk_update('user', 'id', [(1, {'name': 'a', 'age': 2}), (2, {'age': 3})])
+    assert sql == ('UPDATE "user" SET "name" = CASE "id" WHEN ? THEN ? ELSE "name" END, '
+                   '"age" = CASE "id" WHEN ? THEN ? WHEN ? THEN ? ELSE "age" END WHERE "id" IN (?, ?)')
+    assert args == [1, 'a', 1, 2, 2, 3, 1, 2]
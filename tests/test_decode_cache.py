@@ -0,0 +1,58 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : test_decode_cache.py
+# Date   : 2017-08-08 16-10
+# Version: 0.1
+# Description: description of this file.
+
+import pickle
+
+import pytest
+
+from sqlite_models import User
+
+pytestmark = pytest.mark.usefixtures('users')
+
+
+def test_cached_output_decoded_once(users, monkeypatch):
+    field = User.__mappings__['tags']
+    decoded = []
+    validate_output = field.validate_output
+
+    def _validate_output(value):
+        decoded.append(value)
+        return validate_output(value)
+
+    monkeypatch.setattr(field, 'validate_output', _validate_output)
+    user = User.objects.get(id=users[0].id)
+    del decoded[:]
+    for _ in range(3):
+        assert user.tags == []
+    assert len(decoded) == 1
+
+
+def test_cached_output_mutation_updated(users):
+    user = User.objects.get(id=users[0].id)
+    user.tags.append('python')
+    assert user.update() is True
+    assert User.objects.get(id=user.id).tags == ['python']
+
+    # Nothing changed since
+    assert User.objects._collect_updated_content(user) == {}
+
+
+def test_cached_output_pickled(users):
+    user = User.objects.get(id=users[0].id)
+    user.tags.append('python')
+    restored = pickle.loads(pickle.dumps(user))
+
+    assert restored.tags == ['python']
+    assert restored.dict_data == user.dict_data
+
+
+def test_dict_data_copied(users):
+    user = User.objects.get(id=users[0].id)
+    user.tags.append('python')
+    user.dict_data['tags'].append('sql')
+    assert user.tags == ['python']
@@ -0,0 +1,141 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : test_diagnostics.py
+# Date   : 2017-08-14 14-30
+# Version: 0.1
+# Description: description of this file.
+
+import threading
+
+import pytest
+
+from dataobj import Model, IntField, StrField
+from dataobj import instrumentation
+from dataobj.connections import SQLiteConnection
+from dataobj.diagnostics import RepeatedQueryDetector, SlowQueryLog, plan_problems
+from dataobj.exceptions import RepeatedQueryError, RepeatedQueryWarning, QueryPlanWarning
+
+conn = SQLiteConnection()
+conn.executescript("""
+CREATE TABLE diag_user (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, email TEXT);
+CREATE INDEX idx_diag_user_name ON diag_user (name);
+INSERT INTO diag_user (name) VALUES ('a'), ('b'), ('c'), ('d');
+""")
+
+
+class DiagUser(Model):
+    id = IntField(primary_key=True)
+    name = StrField()
+    email = StrField()
+
+    class Meta:
+        table_name = 'diag_user'
+        connection = conn
+
+
+def test_repeated_queries_raise():
+    with pytest.raises(RepeatedQueryError, match='repeated more than 2 times'):
+        with RepeatedQueryDetector(threshold=2, action='raise'):
+            for user in DiagUser.objects.all():
+                DiagUser.objects.get(id=user.id)
+
+
+def test_repeated_queries_warn():
+    with pytest.warns(RepeatedQueryWarning, match='test_diagnostics.py'):
+        with RepeatedQueryDetector(threshold=2):
+            for i in range(1, 5):
+                DiagUser.objects.get(id=i)
+
+
+def test_different_shapes_ok():
+    with RepeatedQueryDetector(threshold=1, action='raise') as detector:
+        DiagUser.objects.get(id=1)
+        DiagUser.objects.get(name='a')
+        DiagUser.objects.filter(id__gt=1).order_by('id').first()
+
+    assert len(detector.counts) == 0
+
+
+def test_repeated_queries_scoped_per_thread():
+    detector = RepeatedQueryDetector(threshold=1, action='raise')
+    entered, done = threading.Event(), threading.Event()
+    errors = []
+
+    def scoped():
+        try:
+            with detector:
+                entered.set()
+                assert done.wait(5)
+                DiagUser.objects.get(id=1)
+        except Exception as err:
+            errors.append(err)
+
+    thread = threading.Thread(target=scoped)
+    thread.start()
+    assert entered.wait(5)
+    try:
+        # Out of the scope, not counted
+        for _ in range(3):
+            DiagUser.objects.get(id=1)
+    finally:
+        done.set()
+        thread.join()
+
+    assert errors == []
+    assert len(detector.counts) == 0
+
+
+def test_repeated_queries_nested_scopes():
+    detector = RepeatedQueryDetector(threshold=1, action='raise')
+    with detector:
+        with detector:
+            pass
+        # Still connected in the outer scope
+        with pytest.raises(RepeatedQueryError):
+            for i in range(2):
+                DiagUser.objects.get(id=i)
+
+    assert not instrumentation.has_receivers('before_query')
+
+
+def test_slow_query_log():
+    with SlowQueryLog(threshold=0) as slow_log:
+        DiagUser.objects.filter(id__gt=2).first()
+
+    record = slow_log.records[-1]
+    assert record['operation'] == 'select'
+    assert record['where'] == 'WHERE `id` > %s [2]'
+    assert 'test_diagnostics.py' in record['caller']
+
+
+def test_sql_ok():
+    sql, args = DiagUser.objects.filter(id__gt=1).order_by('id', descending=True).limit(2).sql()
+    assert sql == 'SELECT "id", "name", "email" FROM "diag_user" WHERE "id" > ? ORDER BY "id" DESC LIMIT ? OFFSET ?'
+    assert args == [1, 2, 0]
+
+
+def test_explain_indexed_ok(recwarn):
+    plan = DiagUser.objects.filter(name='a').explain()
+    assert plan and 'idx_diag_user_name' in plan[-1]['detail']
+    assert not recwarn.list
+
+
+def test_explain_full_scan_warn():
+    with pytest.warns(QueryPlanWarning, match='full table scan'):
+        DiagUser.objects.filter(name__endswith='a').explain()
+
+    with pytest.warns(QueryPlanWarning, match='filesort'):
+        DiagUser.objects.filter(id__gt=1).order_by('email').explain()
+
+
+@pytest.mark.parametrize('plan, expected', [
+    ([{'detail': 'SEARCH user USING INTEGER PRIMARY KEY (rowid=?)'}], []),
+    ([{'detail': 'SCAN user USING COVERING INDEX idx_name'}], []),
+    ([{'detail': 'SCAN TABLE user'}], ['full table scan (SCAN TABLE user)']),
+    ([{'table': 'user', 'type': 'ref', 'Extra': 'Using where'}], []),
+    ([{'table': 'user', 'type': 'ALL', 'Extra': 'Using where; Using filesort'}],
+     ['full table scan (table user)', 'filesort (table user)']),
+])
+def test_plan_problems(plan, expected):
+    assert plan_problems(plan) == expected
@@ -0,0 +1,67 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : test_expressions.py
+# Date   : 2017-08-21 15-30
+# Version: 0.1
+# Description: description of this file.
+
+import pytest
+
+from dataobj import Sum, F
+from dataobj.connections import sqlite_compiler
+from sqlite_models import conn, User, ExecuteOnlyConnection
+
+pytestmark = pytest.mark.usefixtures('users')
+
+
+def test_update_with_expression_ok(users):
+    user = users[0]
+    assert user.update(age=F('age') + 1, address='Shanghai') is True
+    assert user.age == 21
+
+    # Another writer updated the row in the meantime, the increment is not lost
+    conn.execute_sql('UPDATE user SET age = age + 10 WHERE id = ?', [user.id])
+    assert user.update(age=F('age') * 2) is True
+    assert (User.objects.get(id=user.id).age, User.objects.get(id=user.id).address) == (62, 'Shanghai')
+    # Selected again after the update, instead of computed from the stale value
+    assert user.age == 62
+
+    user.age = 70
+    assert user.update() is True
+    assert User.objects.get(id=user.id).age == 70
+
+
+def test_filtered_update_ok():
+    assert User.objects.filter(age__gte=30).update(age=F('age') - 10, address='Hangzhou') == 2
+    assert [(u.age, u.address) for u in User.objects.all().order_by('id')] == [
+        (20, 'Beijing'), (20, 'Hangzhou'), (30, 'Hangzhou'), (None, 'Beijing')]
+
+    assert User.objects.all().update(age=1 + F('age')) == 4
+    assert User.objects.all().aggregate(total=Sum('age')) == {'total': 73}
+
+    with pytest.raises(ValueError):
+        User.objects.update(age=1)
+
+
+def test_filtered_update_limited_failed():
+    with pytest.raises(ValueError):
+        User.objects.filter(age__gte=30).limit(1).update(age=F('age') + 1)
+
+    with pytest.raises(ValueError):
+        User.objects.all().order_by('age').update(age=1)
+    assert [u.age for u in User.objects.all().order_by('id')] == [20, 30, 40, None]
+
+
+def test_update_with_expression_without_execute_sql_failed(users):
+    with pytest.raises(RuntimeError, match='execute_sql'):
+        users[0].update(conn=ExecuteOnlyConnection(), age=F('age') + 1)
+    with pytest.raises(RuntimeError, match='execute_sql'):
+        User.objects.filter(id=users[0].id).update(conn=ExecuteOnlyConnection(), age=F('age') + 1)
+    assert User.objects.get(id=users[0].id).age == 20
+
+
+def test_compile_update_expression():
+    expression = ((F('age') + 1) * F('address')).resolve(User)
+    assert sqlite_compiler.compile_update('user', {'age': expression}, {'id': 3}) == (
+        'UPDATE "user" SET "age" = (("age" + ?) * "addr") WHERE "id" = ?', [1, 3])
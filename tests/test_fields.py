@@ -0,0 +1,64 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : test_fields.py
+# Date   : 2017-08-07 15-20
+# Version: 0.1
+# Description: description of this file.
+
+import pytest
+
+from dataobj.exceptions import BatchValidationError
+from dataobj.fields import IntField, ListField, BoolField
+from dataobj.validators import ValueRangeValidator
+
+
+def _named(field, name='value'):
+    field.field_name = name
+    return field
+
+
+class TestValidateMany(object):
+    def test_validate_many_ok(self):
+        field = _named(IntField(not_null=True, validators=[ValueRangeValidator(1, 10)]))
+        assert field.validate_many(['1', 2, 10]) == [1, 2, 10]
+
+    def test_validate_many_failed_reports_all_rows(self):
+        field = _named(IntField(not_null=True, choices=[1, 2, 3]))
+        with pytest.raises(BatchValidationError) as err:
+            field.validate_many([1, None, 'abc', 4, 2])
+
+        assert err.value.indices == [1, 2, 3]
+        assert err.value.param == 'value'
+
+    def test_validate_many_same_as_validate_input(self):
+        field = _named(ListField(max_length=2))
+        values = [[1], None, (1, 2), []]
+        assert field.validate_many(values) == [field.validate_input(v) for v in values]
+
+    def test_validate_many_bool_field(self):
+        field = _named(BoolField())
+        values = [True, False, None, 1]
+        assert field.validate_many(values) == [field.validate_input(v) for v in values]
+
+
+class TestCompiledValidators(object):
+    def test_assign_validators_recompiled(self):
+        field = _named(IntField())
+        assert field.validate_input(100) == 100
+
+        field.validators = list(field.validators) + [ValueRangeValidator(1, 10)]
+        with pytest.raises(ValueError):
+            field.validate_input(100)
+
+    def test_mutate_validators_recompiled(self):
+        field = _named(IntField())
+        assert field.validate_input(100) == 100
+
+        field.validators.append(ValueRangeValidator(1, 10))
+        with pytest.raises(ValueError):
+            field.validate_input(100)
+
+        del field.validators[-1]
+        assert field.validate_input(100) == 100
+        assert isinstance(field.validators, list)
@@ -0,0 +1,40 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : test_hydration.py
+# Date   : 2017-08-13 11-30
+# Version: 0.1
+# Description: description of this file.
+
+import datetime
+
+import pytest
+
+from sqlite_models import User
+
+pytestmark = pytest.mark.usefixtures('users')
+
+
+def test_column_converted_hydration(monkeypatch):
+    from dataobj.converters import pydatetime_converter
+
+    n = pydatetime_converter.vectorize_threshold * 2
+    expected = [datetime.datetime(2017, 8, 10, i % 24, i % 60) if i % 5 else None for i in range(n)]
+    User.objects.bulk_upsert([User(id=1000 + i, name='user{}'.format(i), register_at=value)
+                              for i, value in enumerate(expected)])
+
+    field = User.__mappings__['register_at']
+    columns = []
+    convert_many = field.convert_many
+
+    def _convert_many(values):
+        values = list(values)
+        columns.append(values)
+        return convert_many(values)
+
+    monkeypatch.setattr(field, 'convert_many', _convert_many)
+    users = list(User.objects.filter(id__gte=1000).order_by('id'))
+
+    # One column of all the rows converted at once
+    assert [len(column) for column in columns] == [n]
+    assert [u.register_at for u in users] == expected
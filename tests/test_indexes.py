@@ -0,0 +1,91 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : test_indexes.py
+# Date   : 2017-08-24 15-30
+# Version: 0.1
+# Description: description of this file.
+
+import warnings
+
+import pytest
+
+from dataobj import Model, IntField, StrField, Index
+from dataobj.connections import SQLiteConnection
+from dataobj.exceptions import UnindexedQueryWarning
+
+conn = SQLiteConnection()
+conn.executescript('CREATE TABLE indexed_user (id INTEGER PRIMARY KEY, name TEXT, city TEXT, age INTEGER, '
+                   'mail TEXT UNIQUE)')
+
+
+class IndexedUser(Model):
+    id = IntField(primary_key=True, auto_increment=False)
+    name = StrField()
+    city = StrField()
+    age = IntField()
+    email = StrField(db_column='mail')
+
+    class Meta:
+        table_name = 'indexed_user'
+        connection = conn
+        indexes = ['name', ('city', 'age'), Index('email', unique=True)]
+
+
+IndexedUser.objects.bulk_upsert([IndexedUser(id=i, name='user{}'.format(i), city='Shanghai', age=20 + i,
+                                             email='user{}@example.com'.format(i)) for i in range(1, 8)])
+
+
+def test_indexes_ok():
+    assert [(i.name, i.fields, i.columns, i.unique) for i in IndexedUser.__indexes__] == [
+        ('PRIMARY', ('id',), ('id',), True),
+        ('idx_name', ('name',), ('name',), False),
+        ('idx_city_age', ('city', 'age'), ('city', 'age'), False),
+        ('idx_email', ('email',), ('mail',), True)]
+    assert IndexedUser.__warn_unindexed__ is True
+
+
+def test_index_unknown_field_failed():
+    with pytest.raises(ValueError):
+        class BadIndexUser(Model):
+            id = IntField(primary_key=True)
+
+            class Meta:
+                indexes = ['name']
+
+
+def test_unindexed_query_warning():
+    IndexedUser.__checked_queries__.clear()
+    with warnings.catch_warnings(record=True) as records:
+        warnings.simplefilter('always')
+        list(IndexedUser.objects.filter(city='Shanghai', age__gt=21))
+        list(IndexedUser.objects.filter(age__gt=21))
+        # Warned once per query shape
+        list(IndexedUser.objects.filter(age__gt=22))
+
+    assert [r.category for r in records] == [UnindexedQueryWarning]
+    assert "['age']" in str(records[0].message)
+    # Attributed to the caller, not to the package
+    assert records[0].filename == __file__
+    assert IndexedUser.__checked_queries__ == {frozenset(['city', 'age']), frozenset(['age'])}
+
+
+def test_iterate_ok():
+    users = list(IndexedUser.objects.filter(city='Shanghai').iterate(page_size=3))
+    assert [u.id for u in users] == list(range(1, 8))
+
+    users = list(IndexedUser.objects.order_by('email', descending=True).iterate(page_size=2))
+    assert [u.id for u in users] == list(range(7, 0, -1))
+
+
+def test_iterate_limited():
+    users = list(IndexedUser.objects.all().limit(5).iterate(page_size=2))
+    assert [u.id for u in users] == list(range(1, 6))
+
+    with pytest.raises(ValueError):
+        list(IndexedUser.objects.all().limit(5, 2).iterate())
+
+
+def test_iterate_not_unique_key_failed():
+    with pytest.raises(ValueError):
+        list(IndexedUser.objects.iterate(key='name'))
@@ -0,0 +1,87 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : test_instrumentation.py
+# Date   : 2017-08-11 15-10
+# Version: 0.1
+# Description: description of this file.
+
+import pytest
+
+from dataobj import Model, IntField, StrField
+from dataobj import instrumentation
+from dataobj.connections import SQLiteConnection
+from dataobj.instrumentation import MetricsCollector
+
+conn = SQLiteConnection()
+conn.executescript('CREATE TABLE metric_user (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT)')
+
+
+class MetricUser(Model):
+    id = IntField(primary_key=True)
+    name = StrField()
+
+    class Meta:
+        table_name = 'metric_user'
+        connection = conn
+
+
+@pytest.fixture
+def events():
+    events = []
+
+    def receiver(event):
+        return lambda **kwargs: events.append((event, kwargs))
+
+    receivers = {event: receiver(event) for event in instrumentation.EVENTS}
+    for event, r in receivers.items():
+        instrumentation.connect(event, r)
+    yield events
+    for event, r in receivers.items():
+        instrumentation.disconnect(event, r)
+
+
+def test_hooks_ok(events):
+    MetricUser(name='Chris').dump()
+    list(MetricUser.objects.filter(name='Chris'))
+
+    assert [(e, kwargs['operation']) for e, kwargs in events] == [('before_write', 'insert'),
+                                                                  ('after_write', 'insert'),
+                                                                  ('before_query', 'select'),
+                                                                  ('after_query', 'select')]
+    after_query = events[-1][1]
+    assert after_query['model'] is MetricUser
+    assert after_query['table'] == 'metric_user'
+    assert list(after_query['kwargs']['where'].values()) == ['Chris']
+    assert after_query['rows'] >= 1
+    assert after_query['error'] is None
+
+
+def test_connect_unknown_event_failed():
+    with pytest.raises(ValueError):
+        instrumentation.connect('after_everything', lambda **kwargs: None)
+
+
+def test_metrics_collector_ok():
+    collector = MetricsCollector().install()
+    try:
+        MetricUser(name='Lee').dump()
+        MetricUser.objects.count()
+    finally:
+        collector.uninstall()
+
+    snapshot = collector.snapshot()
+    assert snapshot[('MetricUser', 'insert')]['operations'] == 1
+    assert snapshot[('MetricUser', 'count')]['rows'] == 1
+
+    text = collector.to_prometheus()
+    assert 'dataobj_operations_total{model="MetricUser",operation="insert"} 1' in text
+    assert 'dataobj_operation_seconds_count{model="MetricUser",operation="count",phase="sql"} 1' in text
+
+
+def test_metrics_collector_uninstall_ok():
+    collector = MetricsCollector().install()
+    collector.uninstall()
+
+    assert not instrumentation.has_receivers('after_query')
+    assert not instrumentation.has_receivers('after_write')
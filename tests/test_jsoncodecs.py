@@ -0,0 +1,80 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : test_jsoncodecs.py
+# Date   : 2017-08-02 11-20
+# Version: 0.1
+# Description: description of this file.
+
+import datetime
+import decimal
+
+import pytest
+
+from dataobj.fields import ListField, DictField
+from dataobj.jsoncodecs import (JsonCodec, get_json_codec,
+                                set_json_codec, get_fast_json_codec)
+from dataobj.utils import json_default
+
+
+@pytest.fixture(params=['std', 'fast'])
+def codec(request):
+    return JsonCodec() if request.param == 'std' else get_fast_json_codec()
+
+
+@pytest.mark.parametrize('value',
+                         [[1, 2, 3],
+                          {'name': '中文', 'tags': ['a', 'b']},
+                          []])
+def test_round_trip_ok(codec, value):
+    encoded = codec.dumps(value)
+    assert isinstance(encoded, str)
+    assert codec.loads(encoded) == value
+
+
+def test_loads_bytes_ok(codec):
+    assert codec.loads('{"name": "中文"}'.encode('utf-8')) == {'name': '中文'}
+
+
+def test_set_invalid_codec_failed():
+    with pytest.raises(TypeError):
+        set_json_codec(object())
+
+
+def test_global_codec_used_by_fields():
+    class UpperCodec(JsonCodec):
+        @staticmethod
+        def dumps(value, default=None):
+            return JsonCodec.dumps(value, default).upper()
+
+    field = ListField()
+    field.field_name = 'tags'
+    old_codec = get_json_codec()
+    set_json_codec(UpperCodec())
+    try:
+        assert field.validate_input(['a']) == '["A"]'
+    finally:
+        set_json_codec(old_codec)
+
+    assert field.validate_input(['a']) == '["a"]'
+
+
+def test_field_codec_ok():
+    field = DictField(json_codec=get_fast_json_codec())
+    field.field_name = 'payload'
+    assert field.validate_output(field.validate_input({'a': 1})) == {'a': 1}
+    assert field.validate_output(b'{"a": 1}') == {'a': 1}
+
+
+@pytest.mark.parametrize('value, expected',
+                         [(datetime.datetime(2017, 8, 2, 11, 20, 5), '2017-08-02T11:20:05'),
+                          (datetime.date(2017, 8, 2), '2017-08-02'),
+                          (datetime.time(11, 20), '11:20:00'),
+                          (decimal.Decimal('9.50'), '9.50')])
+def test_json_default_ok(value, expected):
+    assert json_default(value) == expected
+
+
+def test_json_default_unknown_type_failed():
+    with pytest.raises(TypeError):
+        json_default(object())
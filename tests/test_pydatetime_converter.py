@@ -88,3 +88,55 @@ def test_convert_failed_invalid_conversion_type(converter, tp):
 def test_convert_failed_invalid_time_format_etc(converter, tm):
     with pytest.raises(ValueError):
         converter.convert(tm, 'datetime')
+
+
+@pytest.mark.parametrize('tm, wanted',
+                         [
+                             ("2018-08-08 01:02:03.000004",
+                              datetime.datetime(year=2018, month=8, day=8, hour=1, minute=2, second=3, microsecond=4)),
+                             ("2018-08-08 01:02",
+                              datetime.datetime(year=2018, month=8, day=8, hour=1, minute=2)),
+                             ("Aug 8 2018", datetime.datetime(year=2018, month=8, day=8)),
+                             ("2018/08/08", datetime.datetime(year=2018, month=8, day=8)),
+                             ("10:20:30.000001",
+                              datetime.datetime.now().replace(hour=10, minute=20, second=30, microsecond=1)),
+                         ], ids=["microseconds string", "minutes string",
+                                 "dateutil string", "slash date string", "time string"])
+def test_convert_to_datetime_without_fromisoformat_ok(converter, monkeypatch, tm, wanted):
+    # Fixed formats are parsed with `strptime` before Python 3.7
+    import dataobj.converters
+    monkeypatch.setattr(dataobj.converters, '_fromisoformat', None)
+    monkeypatch.setattr(dataobj.converters, '_time_fromisoformat', None)
+    assert converter.convert(tm, 'datetime') == wanted
+
+
+def test_shared_converter_ok():
+    from dataobj.converters import pydatetime_converter
+    assert pydatetime_converter.convert("2018-08-08 10:20:30", 'time') == datetime.time(hour=10, minute=20, second=30)
+
+
+@pytest.mark.parametrize('tm, wanted',
+                         [
+                             (pd.Timedelta(hours=10, minutes=20),
+                              datetime.datetime.now().replace(hour=10, minute=20, second=0, microsecond=0)),
+                             ("0 days 10:20:30",
+                              datetime.datetime.now().replace(hour=10, minute=20, second=30, microsecond=0)),
+                         ], ids=["pandas Timedelta type", "timedelta string"])
+def test_convert_pandas_timedelta_ok(converter, tm, wanted):
+    assert converter.convert(tm, 'datetime') == wanted
+
+
+@pytest.mark.parametrize('values',
+                         [
+                             ["2018-08-%02d 10:20:30" % (i % 28 + 1) for i in range(100)] + [None, "Aug 8 2018"],
+                             ["0 days 10:20:%02d" % (i % 60) for i in range(100)],
+                             ["2018-08-08", datetime.date(year=2018, month=8, day=8), None],
+                         ], ids=["datetime strings with outliers", "timedelta strings", "mixed types"])
+@pytest.mark.parametrize('to_what', ['date', 'datetime', 'time'])
+def test_convert_many_ok(converter, values, to_what):
+    assert converter.convert_many(values, to_what) == [converter.convert(v, to_what) for v in values]
+
+
+def test_convert_many_failed_invalid_time_format(converter):
+    with pytest.raises(ValueError):
+        converter.convert_many(["2012-13-12"] * 100, 'datetime')
@@ -0,0 +1,137 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : test_reflector.py
+# Date   : 2017-08-22 14-40
+# Version: 0.1
+# Description: description of this file.
+
+from dataobj.reflector import MySQLTableReflector, SchemaCache
+
+COLUMNS = [
+    {'TABLE_NAME': 'user', 'Field': 'id', 'Type': 'int(11) unsigned', 'Key': 'PRI', 'Extra': 'auto_increment',
+     'Null': 'NO', 'Default': None},
+    {'TABLE_NAME': 'user', 'Field': 'name', 'Type': 'varchar(64)', 'Key': 'MUL', 'Extra': '',
+     'Null': 'YES', 'Default': None},
+    {'TABLE_NAME': 'order_item', 'Field': 'id', 'Type': 'bigint(20)', 'Key': 'PRI', 'Extra': '',
+     'Null': 'NO', 'Default': None},
+    {'TABLE_NAME': 'order_item', 'Field': 'price', 'Type': 'decimal(10,2)', 'Key': '', 'Extra': '',
+     'Null': 'YES', 'Default': None},
+]
+
+STATISTICS = [
+    {'TABLE_NAME': 'user', 'INDEX_NAME': 'PRIMARY', 'COLUMN_NAME': 'id', 'NON_UNIQUE': 0},
+    {'TABLE_NAME': 'user', 'INDEX_NAME': 'idx_name', 'COLUMN_NAME': 'name', 'NON_UNIQUE': 1},
+]
+
+
+class FakeDao(object):
+    queries = []
+
+    def execute(self, sql, args):
+        pass
+
+    def query(self, sql, args):
+        self.queries.append((sql, args))
+        if 'COLUMNS' in sql:
+            return [dict(row) for row in COLUMNS]
+        if 'STATISTICS' in sql:
+            return STATISTICS
+        if sql.startswith('DESC '):
+            return [dict(row) for row in COLUMNS if row['TABLE_NAME'] == sql.split()[1]]
+        raise AssertionError('Unexpected query {}'.format(sql))
+
+
+def setup_function(function):
+    FakeDao.queries = []
+
+
+def test_reflect_all_ok():
+    models = MySQLTableReflector(FakeDao).reflect_all(model_names={'user': 'UserModel'})
+
+    assert len(FakeDao.queries) == 2
+    assert all('TABLE_SCHEMA = DATABASE()' in sql and args is None for sql, args in FakeDao.queries)
+    assert sorted(models) == ['order_item', 'user']
+
+    user = models['user']
+    assert user.name == 'UserModel'
+    assert '    id = IntField(auto_increment=True, max_length=11, not_null=True, primary_key=True)' in user.template
+    assert user.indexes == {'PRIMARY': {'columns': ['id'], 'unique': True},
+                            'idx_name': {'columns': ['name'], 'unique': False}}
+    assert "        indexes = [Index('name', name='idx_name')]" in user.template
+    assert 'price = FloatField(max_length=10)' in models['order_item'].template
+
+
+def test_reflect_ok():
+    user = MySQLTableReflector(FakeDao).reflect('user')
+
+    assert [sql.split()[0] for sql, _ in FakeDao.queries] == ['DESC', 'SELECT']
+    assert 'TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN (%s)' in FakeDao.queries[1][0]
+    assert FakeDao.queries[1][1] == ['user']
+    assert user.indexes == {'PRIMARY': {'columns': ['id'], 'unique': True},
+                            'idx_name': {'columns': ['name'], 'unique': False}}
+    assert "        indexes = [Index('name', name='idx_name')]" in user.template
+
+
+def test_reflect_filtered_tables():
+    MySQLTableReflector(FakeDao).reflect_all('shop', tables=['user'])
+    sql, args = FakeDao.queries[0]
+    assert 'TABLE_SCHEMA = %s AND TABLE_NAME IN (%s)' in sql
+    assert args == ['shop', 'user']
+
+
+def test_reflect_databases_ok():
+    results = MySQLTableReflector(FakeDao).reflect_databases(['shop', 'blog'], skip_columns=['price'])
+    assert sorted(results) == ['blog', 'shop']
+    assert len(FakeDao.queries) == 4
+    assert 'price' not in results['shop']['order_item'].template
+
+
+def test_reflect_model_ok():
+    from dataobj.connections import SQLiteConnection
+
+    conn = SQLiteConnection()
+    conn.executescript("CREATE TABLE order_item (id INTEGER PRIMARY KEY, price REAL);"
+                       "INSERT INTO order_item VALUES (1, 9.5)")
+
+    OrderItem = MySQLTableReflector(FakeDao).reflect_model('order_item', connection=conn)
+    assert OrderItem.__name__ == 'OrderItem'
+    assert OrderItem.__primary_field__.auto_increment is False
+
+    item = OrderItem.objects.get(id=1)
+    assert item.price == 9.5
+    assert item.update(price=10.0) is True
+    assert OrderItem.objects.get(id=1).price == 10.0
+
+
+def test_reflect_models_cached(tmpdir):
+    path = str(tmpdir.join('schema.json'))
+    reflector = MySQLTableReflector(FakeDao)
+
+    models = reflector.reflect_models(cache=SchemaCache(path))
+    assert sorted(models) == ['order_item', 'user']
+    assert len(FakeDao.queries) == 2
+
+    # Loaded from the file, without querying the database
+    reflector = MySQLTableReflector(FakeDao)
+    User = reflector.reflect_model('user', model_name='CachedUser', cache=SchemaCache(path))
+    assert len(FakeDao.queries) == 2
+    assert [(i.name, i.fields, i.unique) for i in User.__indexes__] == [('PRIMARY', ('id',), True),
+                                                                        ('idx_name', ('name',), False)]
+    assert User.__table_name__ == 'user'
+    assert sorted(User.__mappings__) == ['id', 'name']
+
+    # Refreshed, only the changed table is rebuilt
+    cached = reflector.reflect_models(model_names={'user': 'CachedUser'}, cache=SchemaCache(path))
+    COLUMNS.append({'TABLE_NAME': 'user', 'Field': 'age', 'Type': 'int(11)', 'Key': '', 'Extra': '',
+                    'Null': 'YES', 'Default': '0'})
+    try:
+        refreshed = reflector.reflect_models(model_names={'user': 'CachedUser'}, cache=SchemaCache(path),
+                                             refresh=True)
+    finally:
+        COLUMNS.pop()
+
+    assert refreshed['order_item'] is cached['order_item']
+    assert refreshed['user'] is not cached['user']
+    assert refreshed['user'].__mappings__['age'].default == '0'
+    assert 'age' in SchemaCache(path).tables['user']['columns'][-1]['Field']
@@ -0,0 +1,85 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : test_routing.py
+# Date   : 2017-08-17 15-10
+# Version: 0.1
+# Description: description of this file.
+
+import time
+
+import pytest
+
+from dataobj import Model, IntField, StrField
+from dataobj.connections import SQLiteConnection
+from dataobj.routing import ReplicaSet, use_primary
+
+SCHEMA = 'CREATE TABLE route_user (id INTEGER PRIMARY KEY, name TEXT)'
+
+# Not replicated, each database tells where a query was routed to
+primary, replica1, replica2 = SQLiteConnection(), SQLiteConnection(), SQLiteConnection()
+for conn in [primary, replica1, replica2]:
+    conn.executescript(SCHEMA)
+
+
+class RouteUser(Model):
+    id = IntField(primary_key=True)
+    name = StrField()
+
+    class Meta:
+        table_name = 'route_user'
+        write_connection = primary
+        read_connection = [replica1, replica2]
+        read_your_writes = 0.2
+
+
+@pytest.fixture(autouse=True)
+def databases():
+    for i, conn in enumerate([primary, replica1, replica2]):
+        conn.execute_sql('DELETE FROM route_user')
+        conn.execute_sql('INSERT INTO route_user (id, name) VALUES (1, ?)', ['db{}'.format(i)])
+
+    # Fresh round robin position and read-your-writes window
+    replicas = RouteUser.__read_replicas__
+    RouteUser.__read_replicas__ = ReplicaSet(replicas.replicas, strategy=replicas.strategy,
+                                             read_your_writes=replicas.read_your_writes)
+    yield
+    RouteUser.__read_replicas__ = replicas
+
+
+def test_reads_round_robin():
+    assert [RouteUser.objects.get(id=1).name for _ in range(4)] == ['db1', 'db2', 'db1', 'db2']
+
+
+def test_read_your_writes():
+    user = RouteUser.objects.get(id=1)
+    user.update(name='db0')
+    assert RouteUser.objects.get(id=1).name == 'db0'
+    assert RouteUser.objects.count() == 1
+
+    time.sleep(0.2)
+    assert RouteUser.objects.get(id=1).name in ('db1', 'db2')
+
+
+def test_use_primary_and_explicit_connection():
+    with use_primary():
+        assert RouteUser.objects.get(id=1).name == 'db0'
+    assert RouteUser.objects.get(id=1).name == 'db1'
+
+    assert RouteUser.objects.get(id=1, conn=replica2).name == 'db2'
+
+
+def test_least_loaded():
+    replicas = ReplicaSet(['a', 'b', 'c'], strategy='least_loaded')
+    busy = replicas.acquire()
+    picked = [replicas.acquire() for _ in range(2)]
+    assert busy not in picked
+
+    for index in [busy] + picked:
+        replicas.release(index)
+    assert replicas._in_flight == [0, 0, 0]
+
+
+def test_unknown_strategy_failed():
+    with pytest.raises(ValueError):
+        ReplicaSet(['a'], strategy='random')
@@ -0,0 +1,38 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : test_serialization.py
+# Date   : 2017-08-07 10-40
+# Version: 0.1
+# Description: description of this file.
+
+import datetime
+import io
+import json
+
+import pytest
+
+from sqlite_models import User
+
+pytestmark = pytest.mark.usefixtures('users')
+
+
+def test_to_dicts_ok(users):
+    query = User.objects.filter(age__gte=30).order_by('id')
+    rows = query.to_dicts()
+    assert rows == [u.dict_data for u in query]
+    assert rows[0]['register_at'] == datetime.datetime(2017, 8, 10, 10, 30)
+    assert rows[0]['tags'] == []
+
+    assert User.objects.filter_with_field_names(None, 'name', age=20).to_dicts() == [{'name': 'Chris'}]
+
+
+def test_to_json_lines_ok(users):
+    fp = io.StringIO()
+    assert User.objects.all().order_by('id').limit(2).to_json_lines(fp) == 2
+
+    lines = fp.getvalue().splitlines()
+    assert len(lines) == 2 and fp.getvalue().endswith('\n')
+    row = json.loads(lines[1])
+    assert row == {'id': users[1].id, 'name': 'Foo_bar', 'age': 30, 'address': 'Beijing', 'tags': [],
+                   'register_at': '2017-08-10T10:30:00'}
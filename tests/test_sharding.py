@@ -0,0 +1,153 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : test_sharding.py
+# Date   : 2017-08-18 15-30
+# Version: 0.1
+# Description: description of this file.
+
+import pytest
+
+from dataobj import Model, IntField, Count, Sum, Avg, Max
+from dataobj.connections import SQLiteConnection
+from dataobj.sharding import ShardRouter
+
+shards = [SQLiteConnection(), SQLiteConnection()]
+for shard in shards:
+    shard.executescript('CREATE TABLE shard_order (id INTEGER PRIMARY KEY, user_id INTEGER, amount INTEGER)')
+
+
+class ShardOrder(Model):
+    # Ids are unique across the shards, not generated by each of them
+    id = IntField(primary_key=True, auto_increment=False)
+    user_id = IntField()
+    amount = IntField()
+
+    class Meta:
+        table_name = 'shard_order'
+        shard_key = 'user_id'
+        shards = shards
+
+
+many_shards = [SQLiteConnection() for _ in range(11)]
+for shard in many_shards:
+    shard.executescript('CREATE TABLE shard_order (id INTEGER PRIMARY KEY, user_id INTEGER, amount INTEGER)')
+
+
+class ManyShardOrder(Model):
+    id = IntField(primary_key=True, auto_increment=False)
+    user_id = IntField()
+    amount = IntField()
+
+    class Meta:
+        table_name = 'shard_order'
+        shard_key = 'user_id'
+        shards = many_shards
+
+
+@pytest.fixture(autouse=True)
+def orders():
+    for shard in shards:
+        shard.execute_sql('DELETE FROM shard_order')
+
+    orders = [ShardOrder(id=i, user_id=i % 4, amount=i * 10) for i in range(1, 9)]
+    for order in orders:
+        assert order.dump() is True
+    return orders
+
+
+def rows_in(shard):
+    return [row['id'] for row in shard.query_sql('SELECT id FROM shard_order ORDER BY id')]
+
+
+def test_dump_routed():
+    # Even user ids go to the first shard
+    assert rows_in(shards[0]) == [2, 4, 6, 8]
+    assert rows_in(shards[1]) == [1, 3, 5, 7]
+
+
+def test_update_and_delete_routed(orders):
+    assert orders[0].update(amount=1) is True
+    assert orders[1].delete() is True
+
+    assert ShardOrder.objects.get(user_id=1, id=1).amount == 1
+    assert rows_in(shards[0]) == [4, 6, 8]
+
+
+def test_fan_out_merged():
+    assert ShardOrder.objects.count() == 8
+    assert [o.id for o in ShardOrder.objects.all().order_by('amount', descending=True).limit(3, 1)] == [7, 6, 5]
+    assert [o.id for o in ShardOrder.objects.filter(user_id__in=[1, 2]).order_by('id')] == [1, 2, 5, 6]
+    assert [o.id for o in ShardOrder.objects.filter(amount__gt=60).order_by('id')] == [7, 8]
+
+
+def test_constrained_query_single_shard():
+    assert [o.id for o in ShardOrder.objects.filter(user_id=3).order_by('id')] == [3, 7]
+    assert ShardOrder.objects.filter(user_id=3).sql()[1] == [3]
+
+
+def test_shard_key_converted():
+    # Routed by the field value, the same as the stored rows
+    assert ShardOrder.objects.filter(user_id='2')._query_shard_names() == [0]
+    assert [o.id for o in ShardOrder.objects.filter(user_id__in=['0', '2']).order_by('id')] == [2, 4, 6, 8]
+
+
+def test_bulk_operations_grouped(orders):
+    for order in orders:
+        order.amount = 0
+    assert ShardOrder.objects.bulk_update(orders) == 8
+    assert ShardOrder.objects.bulk_upsert([ShardOrder(id=9, user_id=5, amount=0)]) == 1
+    assert sum(o.amount for o in ShardOrder.objects.all()) == 0
+    assert rows_in(shards[1])[-1] == 9
+
+
+def test_missing_shard_key_failed():
+    with pytest.raises(ValueError):
+        ShardOrder(id=10).dump()
+
+
+def test_shard_router_ok():
+    router = ShardRouter('name', {'a': 'conn-a', 'b': 'conn-b'})
+    assert router.shard_for('foo') == router.shard_for('foo')
+    assert router.connection_for(3) == 'conn-b'
+
+    with pytest.raises(ValueError):
+        ShardRouter('name', ['conn'], shard_by=lambda value: 'missing').shard_for(1)
+
+
+def test_many_shards_in_order():
+    router = ShardRouter('user_id', ['conn{}'.format(i) for i in range(12)])
+    assert router.names == list(range(12))
+    assert [router.connection_for(value) for value in (2, 10, 11, 14)] == ['conn2', 'conn10', 'conn11', 'conn2']
+
+    router = ShardRouter('user_id', {i: 'conn{}'.format(i) for i in reversed(range(12))})
+    assert router.names == list(range(12))
+    assert router.connection_for(10) == 'conn10'
+
+
+def test_many_shards_routed():
+    for shard in many_shards:
+        shard.execute_sql('DELETE FROM shard_order')
+
+    for i in range(22):
+        assert ManyShardOrder(id=i, user_id=i, amount=i).dump() is True
+
+    # The row of user 10 lives in the 11th database
+    rows = many_shards[10].query_sql('SELECT user_id FROM shard_order ORDER BY id')
+    assert rows == [{'user_id': 10}, {'user_id': 21}]
+    assert ManyShardOrder.objects.get(user_id=10).id == 10
+
+
+def test_aggregate_merged():
+    assert ShardOrder.objects.all().aggregate(n=Count(), total=Sum('amount'), avg=Avg('amount'),
+                                              top=Max('amount')) == {'n': 8, 'total': 360, 'avg': 45.0, 'top': 80}
+
+    results = ShardOrder.objects.filter(id__gt=2).group_by('user_id').order_by('user_id', descending=True) \
+        .limit(2).aggregate(total=Sum('amount'))
+    assert results == [{'user_id': 3, 'total': 100}, {'user_id': 2, 'total': 60}]
+
+    with pytest.raises(ValueError):
+        ShardOrder.objects.all().aggregate(users=Count('user_id', distinct=True))
+
+    # A single shard computes distinct values itself
+    assert ShardOrder.objects.filter(user_id=1).aggregate(users=Count('user_id', distinct=True)) == {'users': 1}
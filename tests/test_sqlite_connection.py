@@ -0,0 +1,61 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : test_sqlite_connection.py
+# Date   : 2017-08-10 14-20
+# Version: 0.1
+# Description: description of this file.
+
+import datetime
+
+import pytest
+
+from sqlite_models import User
+
+pytestmark = pytest.mark.usefixtures('users')
+
+
+def test_dump_ok(users):
+    assert all(user.id is not None for user in users)
+    assert User.objects.count() == 4
+
+
+def test_get_ok(users):
+    user = User.objects.get(id=users[0].id)
+    assert user.name == 'Chris'
+    assert user.address == 'Beijing'
+    assert user.register_at == datetime.datetime(2017, 8, 10, 10, 20)
+
+
+@pytest.mark.parametrize('conditions, names',
+                         [({'age__gt': 20}, ['Foo_bar', 'Lee']),
+                          ({'age__lte': 30}, ['Chris', 'Foo_bar']),
+                          ({'age__ne': 20}, ['Foo_bar', 'Lee']),
+                          ({'name__contains': 'o_'}, ['Foo_bar']),
+                          ({'name__contains': '_'}, ['Foo_bar']),
+                          ({'name__startswith': 'L'}, ['Lee']),
+                          ({'name__endswith': 's'}, ['Chris']),
+                          ({'age__isnull': True}, ['Null']),
+                          ({'age__isnull': False, 'name__ne': 'Lee'}, ['Chris', 'Foo_bar'])])
+def test_filter_ok(conditions, names):
+    assert [u.name for u in User.objects.filter(**conditions).order_by('id')] == names
+
+
+def test_order_by_and_limit_ok():
+    users = User.objects.filter(age__isnull=False).order_by('age', descending=True).limit(2, 1)
+    assert [u.name for u in users] == ['Foo_bar', 'Chris']
+
+
+def test_update_ok(users):
+    user = users[0]
+    user.tags.append('python')
+    assert user.update(age=21) is True
+
+    user = User.objects.get(id=user.id)
+    assert user.age == 21
+    assert user.tags == ['python']
+
+
+def test_delete_ok(users):
+    assert users[-1].delete() is True
+    assert User.objects.count() == 3
@@ -13,6 +13,8 @@ from dataobj.validators import EmailValidator
 
 from dataobj.validators.choice import ChoiceValidator
 
+from dataobj.validators import TypeValidator
+
 
 class TestChoiceValidator(object):
     @pytest.mark.parametrize('value',
@@ -160,7 +162,121 @@ class TestLengthValidator(object):
         validator = LengthValidator(min_length=5, max_length=12, error_handler=err_handler)
         validator.validate('value', value)
 
+    def test_is_noop_without_length_specified(self):
+        assert LengthValidator().is_noop is True
+        assert LengthValidator(min_length=1).is_noop is False
+        assert LengthValidator(max_length=10).is_noop is False
+
+
+class TestTypeValidator(object):
+    @pytest.mark.parametrize('value, wanted',
+                             [(1, 1),
+                              ('2', 2),
+                              (3.0, 3),
+                              (None, None)])
+    def test_compiled_validate_ok(self, value, wanted):
+        validate = TypeValidator(int).compile('value')
+        assert validate(value) == wanted
+
+    def test_compiled_validate_failed(self):
+        validate = TypeValidator(int).compile('value')
+        with pytest.raises(TypeError, match='Type validation error on param `value=abc`'):
+            validate('abc')
+
+    def test_compiled_validate_with_force_converse_handler(self):
+        validate = TypeValidator(int, force_converse_handler=lambda v: v * 2).compile('value')
+        assert validate(2) == 4
+
 
 class TestNotNullValidator(object):
     def test_validate_ok(self):
         pass
+
+
+class TestValidateMany(object):
+    @pytest.mark.parametrize('validator, values, wanted',
+                             [(TypeValidator(int), [1, '2', None], [1, 2, None]),
+                              (LengthValidator(max_length=3), ['a', 'abc', None], ['a', 'abc', None]),
+                              (ChoiceValidator(choices=[1, '2']), [1, '2', None], [1, '2', None]),
+                              (EmailValidator(), ['xyz@163.com', None], ['xyz@163.com', None])],
+                             ids=['type', 'length', 'choice', 'email'])
+    def test_validate_many_ok(self, validator, values, wanted):
+        assert validator.validate_many('value', values) == wanted
+
+    @pytest.mark.parametrize('validator, values, indices',
+                             [(TypeValidator(int), [1, 'abc', 3, 'x'], [1, 3]),
+                              (LengthValidator(max_length=3), ['abcd', 'abc', 'abcde'], [0, 2]),
+                              (ChoiceValidator(choices=[1, '2']), [2, 1, '1'], [0, 2]),
+                              (EmailValidator(), ['xyz@', 'xyz@163.com', 'mail.com'], [0, 2])],
+                             ids=['type', 'length', 'choice', 'email'])
+    def test_validate_many_failed(self, validator, values, indices):
+        from dataobj.exceptions import BatchValidationError
+
+        with pytest.raises(BatchValidationError) as err:
+            validator.validate_many('value', values)
+
+        assert err.value.indices == indices
+        assert err.value.results == values
+
+    def test_validate_many_with_error_handler(self):
+        validator = LengthValidator(max_length=3, error_handler=lambda v: v[:3])
+        assert validator.validate_many('value', ['abcd', 'ab']) == ['abc', 'ab']
+
+
+class TestRegexValidators(object):
+    @pytest.mark.parametrize('value', ['mail@Chris.COM', 'xyz@163.com'])
+    def test_custom_pattern_ok(self, value):
+        validator = EmailValidator(pattern=r'^[^@]+@[^@]+$')
+        assert validator.validate('value', value) == value
+
+    def test_custom_pattern_failed(self):
+        from dataobj.validators import RegexValidator
+
+        validator = RegexValidator(pattern=r'^\d+$')
+        with pytest.raises(ValueError, match='Regex validation error on param `value=12a`'):
+            validator.validate('value', '12a')
+
+    def test_same_arguments_ok(self):
+        from dataobj.validators import RegexValidator, PhoneNumberValidator, QQNumberValidator
+
+        def handler(v):
+            return 'handled'
+
+        for cls in (EmailValidator, PhoneNumberValidator, QQNumberValidator):
+            assert cls(handler, pattern=r'^\d+$').validate('value', 'abc') == 'handled'
+        assert RegexValidator(handler, pattern=r'^\d+$').validate('value', 'abc') == 'handled'
+
+        with pytest.raises(ValueError):
+            # A pattern is required by the base class
+            RegexValidator()
+
+    def test_phone_and_qq_validate_many(self):
+        from dataobj.exceptions import BatchValidationError
+        from dataobj.validators import PhoneNumberValidator, QQNumberValidator
+
+        assert PhoneNumberValidator().validate_many('phone', ['18801444657', None]) == ['18801444657', None]
+        with pytest.raises(BatchValidationError) as err:
+            QQNumberValidator().validate_many('qq', ['10001', 'abc', '0123'])
+        assert err.value.indices == [1, 2]
+
+
+class TestChoiceValidatorLargeChoices(object):
+    def test_validate_with_unhashable_choices(self):
+        validator = ChoiceValidator(choices=[1, [2, 3], {'a': 1}])
+        assert validator.validate('value', [2, 3]) == [2, 3]
+        assert validator.validate('value', {'a': 1}) == {'a': 1}
+        with pytest.raises(ValueError, match='Choice validation error'):
+            validator.validate('value', [4])
+
+    @pytest.mark.parametrize('value, wanted',
+                             [('CN', 'CN'), ('cn', 'CN'), ('China', 'CN'), ('US', 'US')])
+    def test_validate_with_mapping(self, value, wanted):
+        validator = ChoiceValidator(choices=['CN', 'US'], mapping={'cn': 'CN', 'China': 'CN'})
+        assert validator.validate('value', value) == wanted
+
+    def test_validate_many_with_mapping(self):
+        codes = ['C{:05d}'.format(i) for i in range(10000)]
+        validator = ChoiceValidator(choices=codes, mapping={'first': 'C00000'})
+        assert validator.validate_many('value', ['C09999', 'first', None]) == ['C09999', 'C00000', None]
+        with pytest.raises(ValueError):
+            validator.validate_many('value', ['C10000', [1]])
@@ -0,0 +1,183 @@
+# -*-coding: utf-8-*-
+# Author : Christopher Lee
+# License: MIT License
+# File   : test_writebehind.py
+# Date   : 2017-08-16 15-00
+# Version: 0.1
+# Description: description of this file.
+
+import threading
+import time
+
+import pytest
+
+from dataobj import Model, IntField, StrField
+from dataobj.connections import SQLiteConnection
+from dataobj.exceptions import WriteBufferFullError
+
+conn = SQLiteConnection()
+conn.executescript('CREATE TABLE counter (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, hits INTEGER)')
+
+
+class Counter(Model):
+    id = IntField(primary_key=True)
+    name = StrField()
+    hits = IntField(default=0)
+
+    class Meta:
+        connection = conn
+        write_behind = {'flush_interval': 60, 'flush_size': 50, 'max_size': 100, 'block_timeout': 0.1}
+
+
+@pytest.fixture(autouse=True)
+def buffer():
+    buffer = Counter.__write_behind__
+    yield buffer
+    buffer.flush()
+    conn.execute_sql('DELETE FROM counter')
+
+
+def hits_in_db(pk):
+    return conn.query_sql('SELECT hits FROM counter WHERE id = ?', [pk])[0]['hits']
+
+
+def test_updates_coalesced(buffer):
+    counter = Counter(name='page')
+    assert counter.dump() is True
+    # Inserted at once, the id is needed
+    assert counter.id is not None
+
+    for _ in range(10):
+        assert counter.update(hits=counter.hits + 1) is True
+
+    assert len(buffer) == 1
+    assert hits_in_db(counter.id) == 0
+
+    buffer.flush()
+    assert len(buffer) == 0
+    assert hits_in_db(counter.id) == 10
+
+
+def test_inserts_buffered(buffer):
+    counters = [Counter(id=i, name='c{}'.format(i)) for i in range(1, 6)]
+    for counter in counters:
+        counter.dump()
+    counters[0].update(hits=3)
+
+    assert Counter.objects.count() == 0
+    buffer.flush()
+    assert Counter.objects.count() == 5
+    assert hits_in_db(1) == 3
+
+
+def test_delete_discards_pending(buffer):
+    counter = Counter(name='page')
+    counter.dump()
+    counter.update(hits=5)
+    assert counter.delete() is True
+
+    assert len(buffer) == 0
+    buffer.flush()
+    assert Counter.objects.count() == 0
+
+
+def test_flush_size_ok(buffer):
+    flushed = threading.Event()
+    write = buffer._write
+
+    def _write(inserts, updates):
+        write(inserts, updates)
+        flushed.set()
+
+    buffer._write = _write
+    try:
+        for i in range(1, 51):
+            Counter(id=i).dump()
+        assert flushed.wait(5)
+    finally:
+        del buffer._write
+
+    assert Counter.objects.count() == 50
+
+
+def test_buffer_full_failed(buffer):
+    # Hold the flush lock, then nothing is drained
+    with buffer._flush_lock:
+        with pytest.raises(WriteBufferFullError):
+            for i in range(1, 102):
+                Counter(id=i).dump()
+
+
+def test_delete_during_flush(buffer):
+    counter = Counter(id=1, name='page')
+    counter.dump()
+
+    writing = threading.Event()
+    write = buffer._write
+
+    def _write(inserts, updates):
+        writing.set()
+        # The delete is called in the meantime, it must wait for the row to be written
+        time.sleep(0.2)
+        write(inserts, updates)
+
+    buffer._write = _write
+    try:
+        flusher = threading.Thread(target=buffer.flush)
+        flusher.start()
+        assert writing.wait(5)
+        assert counter.delete() is True
+        flusher.join()
+    finally:
+        del buffer._write
+
+    assert Counter.objects.count() == 0
+
+
+def test_failed_flush_kept(buffer):
+    Counter(id=1, name='page').dump()
+
+    def _write(inserts, updates):
+        raise RuntimeError('Database is down')
+
+    buffer._write = _write
+    try:
+        with pytest.raises(RuntimeError):
+            buffer.flush()
+    finally:
+        del buffer._write
+
+    assert len(buffer) == 1
+    buffer.flush()
+    assert Counter.objects.count() == 1
+
+
+def test_failed_background_flush_retried(buffer, monkeypatch):
+    monkeypatch.setattr(buffer, 'flush_interval', 0.05)
+    attempts = []
+    done = threading.Event()
+    write = buffer._write
+
+    def _write(inserts, updates):
+        attempts.append(len(inserts))
+        if len(attempts) == 1:
+            raise RuntimeError('Database is down')
+        write(inserts, updates)
+        done.set()
+
+    monkeypatch.setattr(buffer, '_write', _write)
+    for i in range(1, 51):
+        Counter(id=i).dump()
+
+    assert done.wait(5)
+    assert attempts == [50, 50]
+    assert Counter.objects.count() == 50
+
+
+def test_buffered_insert_upserted(buffer):
+    conn.execute_sql("INSERT INTO counter (id, name, hits) VALUES (1, 'old', 5)")
+    Counter(id=1, name='new').dump()
+    buffer.flush()
+
+    # Written as an upsert, the existing row is overwritten
+    assert conn.query_sql('SELECT name, hits FROM counter WHERE id = 1') == [{'name': 'new', 'hits': 0}]